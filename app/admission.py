@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a provider call would wait longer than the queue deadline."""
+
+    def __init__(self, provider: str, retry_after: float, reason: str):
+        self.provider = provider
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"{provider} is overloaded: {reason}")
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class ProviderLimiter:
+    """Concurrency limit plus a bounded wait queue in front of one provider.
+
+    Up to ``max_concurrency`` calls run at once; the rest wait in FIFO order.
+    A call is rejected up front when the queue is full or when its expected
+    wait, estimated from the queue position and a moving average of recent
+    call durations, exceeds ``max_wait_seconds``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait_seconds: float,
+        initial_service_seconds: float,
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_wait_seconds = max_wait_seconds
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._avg_service_seconds = max(0.001, initial_service_seconds)
+        self._active = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds_seen = 0.0
+
+    def expected_wait(self, queue_position: int) -> float:
+        """Estimated seconds until a call at ``queue_position`` (1-based) gets a slot."""
+        if self._active < self.max_concurrency and self._waiting == 0:
+            return 0.0
+        return queue_position / self.max_concurrency * self._avg_service_seconds
+
+    async def acquire(self) -> float:
+        """Wait for a slot, or raise AdmissionRejected; returns when the slot was granted."""
+        queue_position = self._waiting + 1
+        expected_wait = self.expected_wait(queue_position)
+        if expected_wait > 0:
+            if self._waiting >= self.max_queue:
+                self._reject(expected_wait, f"queue is full ({self.max_queue} waiting)")
+            if expected_wait > self.max_wait_seconds:
+                self._reject(
+                    expected_wait,
+                    f"expected wait {expected_wait:.1f}s exceeds {self.max_wait_seconds:.1f}s",
+                )
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        admitted_at = time.perf_counter()
+        waited = admitted_at - queued_at
+        self._admitted += 1
+        self._total_wait_seconds += waited
+        self._max_wait_seconds_seen = max(self._max_wait_seconds_seen, waited)
+        self._active += 1
+        return admitted_at
+
+    def release(self, admitted_at: float):
+        """Free the slot granted at ``admitted_at`` and update the service-time average."""
+        self._active -= 1
+        self._semaphore.release()
+        elapsed = time.perf_counter() - admitted_at
+        self._avg_service_seconds = 0.8 * self._avg_service_seconds + 0.2 * elapsed
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        admitted_at = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(admitted_at)
+
+    def _reject(self, expected_wait: float, reason: str):
+        self._rejected += 1
+        logger.warning("Rejecting %s call: %s", self.name, reason)
+        raise AdmissionRejected(self.name, expected_wait, reason)
+
+    def get_stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queue_depth": self._waiting,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "avg_wait_seconds": self._total_wait_seconds / self._admitted if self._admitted else 0.0,
+            "max_wait_seconds_seen": self._max_wait_seconds_seen,
+            "avg_service_seconds": self._avg_service_seconds,
+            "expected_wait_seconds": self.expected_wait(self._waiting + 1),
+        }
@@ -0,0 +1,66 @@
+import json
+import zlib
+from typing import Any, Dict, Union
+
+# Payload formats, recorded after the normalization version in the cache's
+# schema_version column ("v1:zd1"). Rows without a format are legacy JSON.
+LEGACY_FORMAT = "json"
+PAYLOAD_FORMAT = "zd1"
+
+# Preset dictionary for "zd1". Extractions are a few hundred bytes, too
+# short for zlib to find repeats on its own, so it is primed with the field
+# names and common values. Changing it requires a new format id.
+_ZDICT_V1 = (
+    b'"extension":null,"type":"primary"},{"number":"+1 '
+    b'"type":"mobile"},"type":"secondary"},"type":"work"},'
+    b'"address":{"unit":"street":"city":"state":"postal_code":"country":"US"},'
+    b'"job_type":"scheduled_date":"appointment_time":"notes":'
+    b'"extracted_at":"20'
+    b'@gmail.com","@yahoo.com","@hotmail.com","@outlook.com",'
+    b'"email":"company_name":"client_name":"phone_numbers":[{"number":"+1 '
+)
+
+
+def _compact(value: Any) -> Any:
+    """Drop None values and empty lists; the model's defaults restore them."""
+    if isinstance(value, dict):
+        return {
+            key: _compact(item)
+            for key, item in value.items()
+            if item is not None and item != []
+        }
+    if isinstance(value, list):
+        return [_compact(item) for item in value]
+    return value
+
+
+def encode_extraction(extraction_data: Dict) -> bytes:
+    """Serialize an extraction for storage, without the ``raw_text`` copy of the input."""
+    data = _compact({key: value for key, value in extraction_data.items() if key != "raw_text"})
+    body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    compressor = zlib.compressobj(level=9, wbits=-15, zdict=_ZDICT_V1)
+    return compressor.compress(body) + compressor.flush()
+
+
+def decode_extraction(payload: Union[bytes, str], payload_format: str, raw_text: str) -> Dict:
+    """Inverse of :func:`encode_extraction`; ``raw_text`` is the text being looked up."""
+    if payload_format == LEGACY_FORMAT:
+        data = json.loads(payload)
+    elif payload_format == PAYLOAD_FORMAT:
+        decompressor = zlib.decompressobj(wbits=-15, zdict=_ZDICT_V1)
+        data = json.loads(decompressor.decompress(payload) + decompressor.flush())
+    else:
+        raise ValueError(f"Unknown cache payload format: {payload_format}")
+    data["raw_text"] = raw_text
+    return data
+
+
+def schema_version(normalization_version: str) -> str:
+    return f"{normalization_version}:{PAYLOAD_FORMAT}"
+
+
+def payload_format(schema_version_value: str) -> str:
+    """The payload format recorded in a row's schema_version."""
+    if ":" not in schema_version_value:
+        return LEGACY_FORMAT
+    return schema_version_value.rpartition(":")[2]
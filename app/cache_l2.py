@@ -0,0 +1,346 @@
+import abc
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class L2Error(Exception):
+    """The shared cache answered with an error."""
+
+
+class L2Backend(abc.ABC):
+    """A cache shared by all instances, holding opaque byte values.
+
+    Implementations raise :class:`L2Error` or ``OSError`` (timeouts
+    included) on any failure; :class:`SharedCacheTier` decides how to
+    degrade. They are called from several threads at once.
+    """
+
+    name = "none"
+
+    @abc.abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Values for ``keys`` in order, None where missing."""
+
+    @abc.abstractmethod
+    def set_many(self, items: List[Tuple[str, bytes]], ttl_seconds: int):
+        """Store ``items``, each expiring after ``ttl_seconds``."""
+
+    def close(self):
+        pass
+
+
+def _encode_command(args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif isinstance(arg, int):
+            arg = str(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(reader):
+    """One RESP2 reply, or a command sent as an array, read from ``reader``.
+
+    Error replies are returned as :class:`L2Error`, not raised.
+    """
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the shared cache")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        return L2Error(body.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("Connection closed by the shared cache")
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        return None if length < 0 else [read_reply(reader) for _ in range(length)]
+    raise L2Error(f"Unexpected reply from the shared cache: {line[:40]!r}")
+
+
+class _RespConnection:
+    def __init__(self, address: Tuple[str, int], timeout_seconds: float):
+        self._socket = socket.create_connection(address, timeout=timeout_seconds)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._socket.makefile("rb")
+
+    def pipeline(self, commands) -> List:
+        """Send all commands in one write and read their replies in order."""
+        self._socket.sendall(b"".join(_encode_command(command) for command in commands))
+        return [read_reply(self._reader) for _ in commands]
+
+    def close(self):
+        try:
+            self._reader.close()
+            self._socket.close()
+        except OSError:
+            pass
+
+
+class RedisBackend(L2Backend):
+    """Redis, or anything speaking its protocol, at ``redis://[user:password@]host:port/db``.
+
+    Speaks RESP2 over plain sockets, so no client library is needed. Idle
+    connections are pooled and every command batch is pipelined.
+    """
+
+    name = "redis"
+    max_idle_connections = 16
+
+    def __init__(self, url: str, timeout_seconds: float):
+        parsed = urlparse(url)
+        self._address = (parsed.hostname or "localhost", parsed.port or 6379)
+        self._username = unquote(parsed.username) if parsed.username else None
+        self._password = unquote(parsed.password) if parsed.password else None
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._timeout_seconds = timeout_seconds
+        self._lock = threading.Lock()
+        self._idle: List[_RespConnection] = []
+        self._pid = os.getpid()
+
+    def _acquire(self) -> _RespConnection:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Sockets inherited over fork belong to the parent.
+                self._idle = []
+                self._pid = os.getpid()
+            if self._idle:
+                return self._idle.pop()
+
+        connection = _RespConnection(self._address, self._timeout_seconds)
+        handshake = []
+        if self._password:
+            handshake.append(("AUTH", self._username, self._password) if self._username else ("AUTH", self._password))
+        if self._db:
+            handshake.append(("SELECT", self._db))
+        try:
+            self._check(connection.pipeline(handshake))
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _release(self, connection: _RespConnection):
+        with self._lock:
+            if self._pid == os.getpid() and len(self._idle) < self.max_idle_connections:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    @staticmethod
+    def _check(replies: List) -> List:
+        for reply in replies:
+            if isinstance(reply, L2Error):
+                raise reply
+        return replies
+
+    def _execute(self, commands) -> List:
+        connection = self._acquire()
+        try:
+            replies = connection.pipeline(commands)
+        except Exception:
+            # The stream may be half read; never reuse it.
+            connection.close()
+            raise
+        self._release(connection)
+        return self._check(replies)
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        return self._execute([("MGET", *keys)])[0]
+
+    def set_many(self, items: List[Tuple[str, bytes]], ttl_seconds: int):
+        if items:
+            self._execute([("SET", key, value, "EX", max(1, ttl_seconds)) for key, value in items])
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+L2_BACKENDS = {"redis": RedisBackend}
+
+
+def make_l2_backend(url: str, timeout_seconds: float) -> L2Backend:
+    scheme = urlparse(url).scheme
+    try:
+        backend = L2_BACKENDS[scheme]
+    except KeyError:
+        raise ValueError(f"Unknown shared cache backend: {scheme or url}") from None
+    return backend(url, timeout_seconds)
+
+
+class SharedCacheTier:
+    """Reads and write-through for an :class:`L2Backend` that never hold up a request.
+
+    Reads use the backend's short timeout. After any failure the tier is
+    skipped for ``retry_seconds`` and every lookup goes on as a miss.
+    Writes are queued and sent in pipelined batches by a background thread;
+    when the queue is full, or the tier is down, they are dropped, since the
+    local tiers already hold the entry.
+    """
+
+    write_batch_size = 100
+
+    def __init__(self, backend: L2Backend, ttl_seconds: int, retry_seconds: float, max_queued: int, key_prefix: str):
+        self.backend = backend
+        self._ttl_seconds = max(1, int(ttl_seconds))
+        self._retry_seconds = max(0.0, retry_seconds)
+        self._max_queued = max(1, max_queued)
+        self._key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._skipped = 0
+        self._writes = 0
+        self._write_drops = 0
+        self._reset_writer()
+
+    def _reset_writer(self):
+        self._queue: "queue.Queue[Tuple[str, bytes]]" = queue.Queue(self._max_queued)
+        self._writer: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._reset_writer()
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, error: Exception):
+        with self._lock:
+            self._errors += 1
+            was_available = self.available
+            self._down_until = time.monotonic() + self._retry_seconds
+        if was_available:
+            logger.warning(
+                "Shared cache (%s) unavailable, skipping it for %.0fs: %s",
+                self.backend.name, self._retry_seconds, error,
+            )
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """Values found for ``keys``; empty whenever the tier is down or fails."""
+        if not keys:
+            return {}
+        if not self.available:
+            with self._lock:
+                self._skipped += len(keys)
+            return {}
+        try:
+            values = self.backend.get_many([self._key_prefix + key for key in keys])
+        except (L2Error, OSError) as e:
+            self._failed(e)
+            return {}
+        found = {key: value for key, value in zip(keys, values) if value is not None}
+        with self._lock:
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, value: bytes):
+        """Queue a write; never blocks."""
+        if not self.available:
+            with self._lock:
+                self._write_drops += 1
+            return
+        try:
+            self._queue.put_nowait((self._key_prefix + key, value))
+        except queue.Full:
+            with self._lock:
+                self._write_drops += 1
+            return
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._stopping = False
+                self._writer = threading.Thread(target=self._write_loop, name="shared-cache-write", daemon=True)
+                self._writer.start()
+
+    def _next_batch(self, timeout: Optional[float]) -> List[Tuple[str, bytes]]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.write_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch: List[Tuple[str, bytes]]):
+        if not self.available:
+            with self._lock:
+                self._write_drops += len(batch)
+            return
+        try:
+            self.backend.set_many(batch, self._ttl_seconds)
+        except (L2Error, OSError) as e:
+            self._failed(e)
+            with self._lock:
+                self._write_drops += len(batch)
+            return
+        with self._lock:
+            self._writes += len(batch)
+
+    def _write_loop(self):
+        while not self._stopping:
+            batch = self._next_batch(timeout=0.5)
+            if batch:
+                self._write_batch(batch)
+
+    def close(self, timeout_seconds: float = 2.0):
+        """Send what is still queued, for at most ``timeout_seconds``."""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._stopping = True
+            writer.join(timeout=1.0)
+        deadline = time.monotonic() + timeout_seconds
+        while time.monotonic() < deadline:
+            batch = self._next_batch(timeout=0)
+            if not batch:
+                break
+            self._write_batch(batch)
+        self.backend.close()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": True,
+                "backend": self.backend.name,
+                "available": self.available,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "errors": self._errors,
+                "skipped_lookups": self._skipped,
+                "writes": self._writes,
+                "write_drops": self._write_drops,
+                "queued_writes": self._queue.qsize(),
+            }
@@ -0,0 +1,181 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: rebuilds are not coordinated, which is only wasteful
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Layout: header, then ``count`` index records sorted by key, then the
+# entries. An entry is "schema_version\nfingerprint\ncreated_at\n" and the
+# payload as stored in SQLite (see app/cache_codec.py).
+MAGIC = b"CIFMMAP2"
+_HEADER = struct.Struct("<8sI")
+_INDEX = struct.Struct("<32sQI")
+_KEY_BYTES = 32
+
+
+def build_mapped_snapshot(path: str, rows: Iterable[Tuple[str, bytes, str, str, str]]) -> int:
+    """Write ``(cache_key, payload, schema_version, fingerprint, created_at)`` rows to ``path``; returns the count.
+
+    The file is written next to ``path`` and moved over it, so processes
+    that have the old file mapped keep reading it until they remap.
+    """
+    entries = sorted(
+        (
+            bytes.fromhex(cache_key),
+            f"{version}\n{fingerprint}\n{created_at}\n".encode("utf-8")
+            + (payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)),
+        )
+        for cache_key, payload, version, fingerprint, created_at in rows
+    )
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    offset = _HEADER.size + _INDEX.size * len(entries)
+    try:
+        with open(temporary, "wb") as handle:
+            handle.write(_HEADER.pack(MAGIC, len(entries)))
+            for key, entry in entries:
+                handle.write(_INDEX.pack(key, offset, len(entry)))
+                offset += len(entry)
+            for _, entry in entries:
+                handle.write(entry)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return len(entries)
+
+
+class MappedSnapshot:
+    """Read-only, sorted-hash file of cache entries, memory-mapped.
+
+    Every worker maps the same file, so its pages live once in the OS page
+    cache however many processes read it. Lookups are a binary search over
+    the fixed-size index. The file is checked for replacement at most every
+    ``check_interval_seconds`` and remapped when it changed; readers of the
+    old mapping are unaffected.
+    """
+
+    def __init__(self, path: str, check_interval_seconds: float = 1.0):
+        self.path = path
+        self._check_interval_seconds = check_interval_seconds
+        self._lock = threading.Lock()
+        # (mapping, entry count), swapped as one so readers see a matching pair
+        self._view: Tuple[Optional[mmap.mmap], int] = (None, 0)
+        self._identity: Optional[Tuple[int, int, int]] = None
+        self._next_check = 0.0
+        self._remaps = 0
+
+    def _current(self) -> Tuple[Optional[mmap.mmap], int]:
+        if time.monotonic() >= self._next_check:
+            with self._lock:
+                if time.monotonic() >= self._next_check:
+                    self._next_check = time.monotonic() + self._check_interval_seconds
+                    self._refresh()
+        return self._view
+
+    def _refresh(self):
+        """Map the file if it was replaced since the last check; the caller holds ``self._lock``."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._view, self._identity = (None, 0), None
+            return
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self._identity:
+            return
+        try:
+            with open(self.path, "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count = _HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or _HEADER.size + count * _INDEX.size > len(mapped):
+                raise ValueError("not a mapped cache snapshot")
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("Mapped cache snapshot %s unusable: %s", self.path, e)
+            self._view = (None, 0)
+        else:
+            # The previous map is not closed: other threads may still be
+            # reading it, and it is released with its last reference.
+            self._view = (mapped, count)
+            self._remaps += 1
+        self._identity = identity
+
+    def get(self, cache_key: str) -> Optional[Tuple[str, str, str, bytes]]:
+        """``(schema_version, fingerprint, created_at, payload)`` for a key, or None."""
+        mapped, count = self._current()
+        if mapped is None:
+            return None
+        key = bytes.fromhex(cache_key)
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            start = _HEADER.size + middle * _INDEX.size
+            probe = mapped[start:start + _KEY_BYTES]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                _, offset, length = _INDEX.unpack_from(mapped, start)
+                version, fingerprint, created_at, payload = mapped[offset:offset + length].split(b"\n", 3)
+                return version.decode("utf-8"), fingerprint.decode("utf-8"), created_at.decode("utf-8"), payload
+        return None
+
+    def age_seconds(self) -> Optional[float]:
+        try:
+            return max(0.0, time.time() - os.stat(self.path).st_mtime)
+        except FileNotFoundError:
+            return None
+
+    def rebuild_lock(self):
+        """A held exclusive lock on the rebuild, or None if another process holds it."""
+        return _RebuildLock.acquire(f"{self.path}.lock")
+
+    def get_stats(self) -> Dict:
+        mapped, count = self._current()
+        return {
+            "enabled": True,
+            "path": self.path,
+            "entries": count,
+            "bytes": len(mapped) if mapped is not None else 0,
+            "remaps": self._remaps,
+        }
+
+
+class _RebuildLock:
+    def __init__(self, handle):
+        self._handle = handle
+
+    @classmethod
+    def acquire(cls, path: str) -> Optional["_RebuildLock"]:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handle = open(path, "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return None
+        return cls(handle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # Closing the file releases the lock.
+        self._handle.close()
@@ -0,0 +1,245 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# value, size in bytes
+Entry = Tuple[Any, int]
+
+_HALVE = bytes(value >> 1 for value in range(256))
+# Each of the four rows indexes with its own 16 bits of the key's hash.
+_ROWS = 4
+_MAX_WIDTH = 1 << 16
+
+
+class LRUPolicy:
+    """Least recently used entries within a byte budget."""
+
+    name = "lru"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self.bytes_used = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Entry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Like :meth:`get`, without counting as a use of the entry."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any, size: int):
+        self.pop(key)
+        if size > self.max_bytes:
+            self.evictions += 1
+            return
+        self._entries[key] = (value, size)
+        self.bytes_used += size
+        while self.bytes_used > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes_used -= evicted_size
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.bytes_used -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def get_stats(self) -> Dict:
+        return {"policy": self.name, "entries": len(self), "bytes": self.bytes_used, "evictions": self.evictions}
+
+
+class FrequencySketch:
+    """Approximate recent access counts: a count-min sketch of 4-bit counters.
+
+    Every counter is halved after ``10 * width`` increments, so popularity
+    fades and a burst long ago does not outweigh steady recent use.
+    """
+
+    def __init__(self, width: int):
+        self._width = min(_MAX_WIDTH, 1 << max(4, (max(1, width) - 1).bit_length()))
+        self._mask = self._width - 1
+        self._rows = [bytearray(self._width) for _ in range(_ROWS)]
+        self._sample_size = 10 * self._width
+        self._additions = 0
+
+    def _indexes(self, key: Hashable) -> Tuple[int, int, int, int]:
+        spread = hash(key)
+        mask = self._mask
+        return spread & mask, (spread >> 16) & mask, (spread >> 32) & mask, (spread >> 48) & mask
+
+    def increment(self, key: Hashable):
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < 15:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            for row in self._rows:
+                row[:] = row.translate(_HALVE)
+            self._additions //= 2
+
+    def frequency(self, key: Hashable) -> int:
+        first, second, third, fourth = self._indexes(key)
+        rows = self._rows
+        return min(rows[0][first], rows[1][second], rows[2][third], rows[3][fourth])
+
+
+class WTinyLFUPolicy:
+    """Window TinyLFU within a byte budget, resistant to one-off scans.
+
+    New entries go to a small LRU window. Entries leaving the window only
+    enter the main area, a segmented LRU (probation and protected), if they
+    have been asked for more often than the entries they would displace,
+    as estimated by a :class:`FrequencySketch` over all lookups. A bulk
+    backfill of texts seen once therefore churns the window and probation
+    but leaves the entries that keep coming back alone.
+    """
+
+    name = "tinylfu"
+
+    def __init__(
+        self,
+        max_bytes: int,
+        window_fraction: float = 0.01,
+        protected_fraction: float = 0.8,
+        expected_entry_bytes: int = 512,
+    ):
+        self.max_bytes = max(0, max_bytes)
+        self.evictions = 0
+        self._window_max = max(1, int(self.max_bytes * window_fraction))
+        self._main_max = max(0, self.max_bytes - self._window_max)
+        self._protected_max = int(self._main_max * protected_fraction)
+        self._window: "OrderedDict[Hashable, Entry]" = OrderedDict()
+        self._probation: "OrderedDict[Hashable, Entry]" = OrderedDict()
+        self._protected: "OrderedDict[Hashable, Entry]" = OrderedDict()
+        self._window_bytes = 0
+        self._probation_bytes = 0
+        self._protected_bytes = 0
+        self._sketch = FrequencySketch(max(64, self.max_bytes // max(1, expected_entry_bytes)))
+
+    @property
+    def bytes_used(self) -> int:
+        return self._window_bytes + self._probation_bytes + self._protected_bytes
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._window or key in self._probation or key in self._protected
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        self._sketch.increment(key)
+        for segment in (self._window, self._protected):
+            entry = segment.get(key)
+            if entry is not None:
+                segment.move_to_end(key)
+                return entry[0]
+        entry = self._probation.pop(key, None)
+        if entry is None:
+            return None
+        self._probation_bytes -= entry[1]
+        self._protected[key] = entry
+        self._protected_bytes += entry[1]
+        while self._protected_bytes > self._protected_max:
+            demoted_key, demoted = self._protected.popitem(last=False)
+            self._protected_bytes -= demoted[1]
+            self._probation[demoted_key] = demoted
+            self._probation_bytes += demoted[1]
+        return entry[0]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Like :meth:`get`, without counting as an access or promoting the entry."""
+        for segment in (self._window, self._probation, self._protected):
+            entry = segment.get(key)
+            if entry is not None:
+                return entry[0]
+        return None
+
+    def put(self, key: Hashable, value: Any, size: int):
+        """Add or replace an entry; lookups, not writes, count as accesses."""
+        self.pop(key)
+        self._window[key] = (value, size)
+        self._window_bytes += size
+        while self._window_bytes > self._window_max:
+            candidate_key, candidate = self._window.popitem(last=False)
+            self._window_bytes -= candidate[1]
+            self._admit(candidate_key, candidate)
+
+    def _admit(self, key: Hashable, entry: Entry):
+        size = entry[1]
+        if size > self._main_max:
+            self.evictions += 1
+            return
+        frequency = self._sketch.frequency(key)
+        while self._probation_bytes + self._protected_bytes + size > self._main_max:
+            segment = self._probation if self._probation else self._protected
+            victim_key, victim = next(iter(segment.items()))
+            if self._sketch.frequency(victim_key) >= frequency:
+                self.evictions += 1
+                return
+            del segment[victim_key]
+            if segment is self._probation:
+                self._probation_bytes -= victim[1]
+            else:
+                self._protected_bytes -= victim[1]
+            self.evictions += 1
+        self._probation[key] = entry
+        self._probation_bytes += size
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        for segment in (self._window, self._probation, self._protected):
+            entry = segment.pop(key, None)
+            if entry is None:
+                continue
+            if segment is self._window:
+                self._window_bytes -= entry[1]
+            elif segment is self._probation:
+                self._probation_bytes -= entry[1]
+            else:
+                self._protected_bytes -= entry[1]
+            return entry[0]
+        return None
+
+    def clear(self):
+        for segment in (self._window, self._probation, self._protected):
+            segment.clear()
+        self._window_bytes = self._probation_bytes = self._protected_bytes = 0
+
+    def get_stats(self) -> Dict:
+        return {
+            "policy": self.name,
+            "entries": len(self),
+            "bytes": self.bytes_used,
+            "evictions": self.evictions,
+            "window_entries": len(self._window),
+            "probation_entries": len(self._probation),
+            "protected_entries": len(self._protected),
+        }
+
+
+POLICIES = {"lru": LRUPolicy, "tinylfu": WTinyLFUPolicy}
+
+
+def make_policy(name: str, max_bytes: int):
+    try:
+        policy = POLICIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache memory policy: {name}") from None
+    return policy(max_bytes)
@@ -0,0 +1,89 @@
+import gzip
+import json
+import struct
+import zlib
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+# A snapshot is one gzip stream: the magic, a length-prefixed JSON header,
+# then one record per entry, hottest first. Payloads are copied as stored
+# (see app/cache_codec.py), so export and import never re-encode them.
+SNAPSHOT_MAGIC = b"CIFCACHE"
+SNAPSHOT_VERSION = 1
+
+_LENGTH = struct.Struct("<I")
+_KEY_BYTES = 32
+
+# cache_key, normalized_text, payload, provider, model, schema_version,
+# fingerprint, created_at, last_accessed_at, hit_count
+SnapshotRow = Tuple[str, str, bytes, str, str, str, str, str, str, int]
+
+
+def _write_blob(handle: BinaryIO, data: bytes):
+    handle.write(_LENGTH.pack(len(data)))
+    handle.write(data)
+
+
+def _read_exact(handle: BinaryIO, size: int) -> bytes:
+    data = handle.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated cache snapshot")
+    return data
+
+
+def _read_blob(handle: BinaryIO) -> bytes:
+    return _read_exact(handle, _LENGTH.unpack(_read_exact(handle, _LENGTH.size))[0])
+
+
+def write_snapshot(handle: BinaryIO, header: Dict, rows) -> int:
+    """Write ``rows`` (``SnapshotRow`` tuples) to ``handle``; returns the entries written."""
+    count = 0
+    with gzip.GzipFile(fileobj=handle, mode="wb", compresslevel=6, mtime=0) as stream:
+        stream.write(SNAPSHOT_MAGIC)
+        _write_blob(stream, json.dumps({**header, "version": SNAPSHOT_VERSION}).encode("utf-8"))
+        for cache_key, normalized_text, payload, *metadata in rows:
+            stream.write(bytes.fromhex(cache_key))
+            _write_blob(stream, normalized_text.encode("utf-8"))
+            _write_blob(stream, bytes(payload) if not isinstance(payload, str) else payload.encode("utf-8"))
+            _write_blob(stream, json.dumps(metadata, separators=(",", ":")).encode("utf-8"))
+            count += 1
+    return count
+
+
+def read_snapshot(handle: BinaryIO) -> Tuple[Dict, Iterator[SnapshotRow]]:
+    """Return the header and an iterator over the entries of a snapshot.
+
+    Raises ValueError for a file that is not a snapshot, or one written in
+    a newer version; the iterator raises it for a truncated file.
+    """
+    stream = gzip.GzipFile(fileobj=handle, mode="rb")
+    try:
+        magic = stream.read(len(SNAPSHOT_MAGIC))
+    except (OSError, EOFError, zlib.error):
+        magic = b""
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a cache snapshot")
+    header = json.loads(_read_blob(stream))
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported cache snapshot version: {header.get('version')}")
+
+    def rows() -> Iterator[SnapshotRow]:
+        with stream:
+            while True:
+                try:
+                    key = stream.read(_KEY_BYTES)
+                    if not key:
+                        return
+                    if len(key) != _KEY_BYTES:
+                        raise ValueError("Truncated cache snapshot")
+                    normalized_text = _read_blob(stream).decode("utf-8")
+                    payload = _read_blob(stream)
+                    metadata = json.loads(_read_blob(stream))
+                except (OSError, EOFError, zlib.error) as e:
+                    raise ValueError(f"Corrupt cache snapshot: {e}") from e
+                provider, model, version, fingerprint, created_at, accessed_at, hits = metadata
+                yield (
+                    key.hex(), normalized_text, payload, provider, model,
+                    version, fingerprint, created_at, accessed_at, int(hits),
+                )
+
+    return header, rows()
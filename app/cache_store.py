@@ -1,186 +1,1429 @@
+import atexit
 import hashlib
-import json
+import logging
 import os
 import sqlite3
 import threading
+import time
+import zlib
 from collections import OrderedDict
-from datetime import datetime
-from typing import Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
 
+from app.cache_codec import (
+    PAYLOAD_FORMAT,
+    decode_extraction,
+    encode_extraction,
+    payload_format,
+    schema_version,
+)
+from app.cache_l2 import SharedCacheTier, make_l2_backend
+from app.cache_mmap import MappedSnapshot, build_mapped_snapshot
+from app.cache_policy import make_policy
+from app.cache_snapshot import read_snapshot, write_snapshot
+from app.canonicalize import canonicalize
 from app.config import settings
 from app.models import ExtractedContact
 
+logger = logging.getLogger(__name__)
+
+UPSERT_SQL = """
+    INSERT INTO extraction_cache (
+        cache_key,
+        normalized_text,
+        payload,
+        provider,
+        model,
+        schema_version,
+        fingerprint,
+        created_at,
+        last_accessed_at,
+        hit_count
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+    ON CONFLICT(cache_key) DO UPDATE SET
+        normalized_text = excluded.normalized_text,
+        payload = excluded.payload,
+        provider = excluded.provider,
+        model = excluded.model,
+        schema_version = excluded.schema_version,
+        fingerprint = excluded.fingerprint,
+        created_at = excluded.created_at,
+        last_accessed_at = excluded.last_accessed_at
+"""
+
+NEGATIVE_UPSERT_SQL = """
+    INSERT INTO negative_cache (
+        cache_key,
+        payload,
+        schema_version,
+        provider,
+        model,
+        fingerprint,
+        created_at,
+        expires_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(cache_key) DO UPDATE SET
+        payload = excluded.payload,
+        schema_version = excluded.schema_version,
+        provider = excluded.provider,
+        model = excluded.model,
+        fingerprint = excluded.fingerprint,
+        created_at = excluded.created_at,
+        expires_at = excluded.expires_at
+"""
+
+# Entries already in the cache are at least as fresh as a snapshot's.
+SNAPSHOT_INSERT_SQL = """
+    INSERT INTO extraction_cache (
+        cache_key,
+        normalized_text,
+        payload,
+        provider,
+        model,
+        schema_version,
+        fingerprint,
+        created_at,
+        last_accessed_at,
+        hit_count
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(cache_key) DO NOTHING
+"""
+
+HIT_UPDATE_SQL = """
+    UPDATE extraction_cache
+    SET hit_count = hit_count + ?,
+        last_accessed_at = MAX(last_accessed_at, ?)
+    WHERE cache_key = ?
+"""
+
 
 class LocalExtractionCache:
-    """In-memory plus exact-match SQLite cache for extraction results."""
+    """In-memory plus exact-match SQLite cache for extraction results.
+
+    The SQLite file runs in WAL mode, so reads never wait on each other or on
+    a writer, and every thread lazily opens its own connection in the process
+    that uses it. Connections are never carried across a fork: the child
+    drops them and reconnects on first use. Only the memory tier is guarded
+    by a lock; concurrent writers from other workers wait up to
+    ``local_cache_busy_timeout_ms`` for SQLite's write lock.
+
+    Writes are write-behind: new entries and hit counts are buffered in
+    memory and a background thread flushes them in one transaction every
+    ``local_cache_flush_interval_seconds``, or sooner once
+    ``local_cache_flush_max_pending`` writes are waiting. Lookups consult the
+    buffer, so an entry is served before it reaches disk. :meth:`close` and
+    interpreter exit flush whatever is left.
+
+    The same thread enforces retention. Every
+    ``local_cache_eviction_interval_seconds`` it deletes up to
+    ``local_cache_eviction_batch_size`` rows that are past the maximum age,
+    then the least recently used (fewest hits first on ties) while the
+    table is over its row or byte limit. Freed pages are handed back with
+    ``incremental_vacuum``. Each pass is small and index-driven, and passes
+    repeat at the flush interval until the cache is back within its limits.
+
+    Payloads are stored compactly (see :mod:`app.cache_codec`) with their
+    format recorded in ``schema_version``. Rows written in the older JSON
+    format stay readable and are re-encoded in batches by the same thread.
+
+    Texts the provider found nothing servable in are kept as negative
+    entries, in their own memory LRU and ``negative_cache`` table, for
+    ``local_cache_negative_ttl_seconds``. They are keyed like positive
+    entries, never shadow one, and are counted separately.
+
+    Entries are tagged with the caller's fingerprint of whatever produced
+    them (prompt, provider, model, code version). A lookup with a different
+    fingerprint rejects the entry, serves it as "stale" so the caller can
+    refresh it, or accepts it, per ``cache_fingerprint_policy``;
+    ``cache_accepted_fingerprints`` lists older fingerprints that still
+    count as current.
+
+    With ``local_cache_mmap_path`` set, a read-only snapshot of the hottest
+    SQLite entries (see :mod:`app.cache_mmap`) is memory-mapped by every
+    worker and consulted between the memory tier and SQLite. Whichever
+    worker's flush thread finds it older than
+    ``local_cache_mmap_rebuild_seconds`` rebuilds it from SQLite. A mapped
+    entry is only served while SQLite still has it with the same
+    ``created_at``, which every rewrite of a key updates.
+
+    With ``l2_cache_url`` set, a shared tier (see :mod:`app.cache_l2`) is
+    consulted after misses in memory and SQLite, and new entries are
+    written through to it in the background. Its hits are copied into the
+    local tiers. When it is slow or down it is skipped and lookups carry on
+    as misses; ``tier_hits`` in the stats counts where hits were served.
+
+    New instances can start warm: :meth:`export_snapshot` writes the
+    hottest entries to a single file (see :mod:`app.cache_snapshot`),
+    :meth:`import_snapshot` loads one in a single transaction, and
+    :meth:`prime_memory` fills the memory tier from the hottest rows.
+    """
 
     def __init__(self):
         self.enabled = settings.local_cache_enabled
+        self._db_path = settings.local_cache_db_path
+        self._busy_timeout_seconds = max(0, settings.local_cache_busy_timeout_ms) / 1000
+        self._flush_interval_seconds = max(0.01, settings.local_cache_flush_interval_seconds)
+        self._flush_max_pending = max(1, settings.local_cache_flush_max_pending)
         self._lock = threading.Lock()
-        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
-        self._max_entries = max(1, settings.local_cache_memory_entries)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._tables_ready: set = set()
+        # Validated contacts, handed out as copies without revalidation,
+        # sized by their encoded JSON (see app/cache_policy.py).
+        self._memory = make_policy(settings.local_cache_memory_policy, settings.local_cache_memory_bytes)
+        # cache_key -> (extraction or None, expiry as a UNIX timestamp)
+        self._negative: "OrderedDict[str, Tuple[Optional[ExtractedContact], float]]" = OrderedDict()
+        self._max_negative_entries = max(1, settings.local_cache_memory_entries)
+        self._negative_ttl_seconds = max(0.0, settings.local_cache_negative_ttl_seconds)
         self._hits = 0
+        self._tier_hits = {"memory": 0, "mmap": 0, "sqlite": 0, "l2": 0}
         self._misses = 0
-        self._connection: Optional[sqlite3.Connection] = None
+        self._negative_hits = 0
+        self._negative_stores = 0
+        self._stale_hits = 0
+        self._fingerprint_rejects = 0
+        self._fingerprint_policy = settings.cache_fingerprint_policy
+        self._accepted_fingerprints = {
+            value.strip() for value in settings.cache_accepted_fingerprints.split(",") if value.strip()
+        }
+        self._write_failures = 0
+        self._lookup_chunk_size = 500
+        self._max_rows = max(0, settings.local_cache_max_rows)
+        self._max_bytes = max(0, settings.local_cache_max_bytes)
+        self._max_age = timedelta(days=max(0.0, settings.local_cache_max_age_days))
+        self._eviction_interval_seconds = max(0.0, settings.local_cache_eviction_interval_seconds)
+        self._eviction_batch_size = max(1, settings.local_cache_eviction_batch_size)
+        self._vacuum_pages = max(1, settings.local_cache_vacuum_pages)
+        self._evictions = 0
+        self._migrated_rows = 0
+        self._payloads_migrated = False
+        self._snapshot_imported = 0
+        self._primed = 0
+        self._reset_background_state()
+        self._l2 = self._make_shared_tier() if self.enabled else None
+        self._mapped: Optional[MappedSnapshot] = None
+        if self.enabled and settings.local_cache_mmap_path:
+            self._mapped = MappedSnapshot(settings.local_cache_mmap_path)
+        self._mapped_rebuild_seconds = max(1.0, settings.local_cache_mmap_rebuild_seconds)
+        self._mapped_max_entries = max(1, settings.local_cache_mmap_max_entries)
+        self._mapped_rebuilds = 0
+        self._mapped_superseded = 0
+        # cache_key -> created_at of rows this process wrote while the mapped
+        # snapshot held an older version; dropped once a rebuild catches up
+        self._mapped_rewrites: Dict[str, str] = {}
+
+        if self.enabled:
+            atexit.register(self.close)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._reset_after_fork)
 
+    @staticmethod
+    def _make_shared_tier() -> Optional[SharedCacheTier]:
+        if not settings.l2_cache_url:
+            return None
+        try:
+            backend = make_l2_backend(settings.l2_cache_url, max(1.0, settings.l2_cache_timeout_ms) / 1000)
+        except ValueError as e:
+            logger.error("Shared cache disabled: %s", e)
+            return None
+        return SharedCacheTier(
+            backend,
+            ttl_seconds=settings.l2_cache_ttl_seconds,
+            retry_seconds=settings.l2_cache_retry_seconds,
+            max_queued=settings.l2_cache_max_queued_writes,
+            key_prefix=settings.l2_cache_key_prefix,
+        )
+
+    def _reset_background_state(self):
+        # cache_key -> upsert row / (hits, last accessed at)
+        self._pending_inserts: Dict[str, Tuple] = {}
+        self._pending_hits: Dict[str, Tuple[int, str]] = {}
+        self._pending_negatives: Dict[str, Tuple] = {}
+        # (sql, parameters) from buffer_write(), run in order
+        self._pending_statements: List[Tuple[str, Tuple]] = []
+        self._flush_lock = threading.Lock()
+        self._flush_wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._stopping = False
+        self._flushes = 0
+        self._next_eviction_at = 0.0
+        # Whether the file uses incremental auto-vacuum; checked on first eviction.
+        self._incremental_vacuum: Optional[bool] = None
+
+    def _reset_after_fork(self):
+        # The parent's connections and a possibly held lock must not be used
+        # in the child; start from fresh state and reconnect lazily. Pending
+        # writes stay with the parent, which flushes them itself.
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._reset_background_state()
+        if self._l2 is not None:
+            self._l2.reset_after_fork()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use in the current process."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        self._ensure_schema()
+        connection = self._connect()
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, for reading tables kept next to the cache.
+
+        Writes to those tables should go through ``buffer_write`` so they are
+        committed with the cache's own batches.
+        """
+        return self._connection()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._db_path, timeout=self._busy_timeout_seconds)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _ensure_schema(self):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            db_directory = os.path.dirname(self._db_path)
+            if db_directory:
+                os.makedirs(db_directory, exist_ok=True)
+            connection = self._connect()
+            try:
+                # Both are persistent in the database file and no-ops once set;
+                # auto_vacuum only takes effect here for a new file (see vacuum()).
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS extraction_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        normalized_text TEXT NOT NULL,
+                        payload BLOB NOT NULL,
+                        provider TEXT NOT NULL,
+                        model TEXT NOT NULL,
+                        schema_version TEXT NOT NULL,
+                        fingerprint TEXT NOT NULL DEFAULT '',
+                        created_at TEXT NOT NULL,
+                        last_accessed_at TEXT NOT NULL,
+                        hit_count INTEGER NOT NULL DEFAULT 0
+                    )
+                    """
+                )
+                connection.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_extraction_cache_last_accessed
+                        ON extraction_cache (last_accessed_at, hit_count)
+                    """
+                )
+                connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS negative_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        payload BLOB NOT NULL,
+                        schema_version TEXT NOT NULL,
+                        provider TEXT NOT NULL,
+                        model TEXT NOT NULL,
+                        fingerprint TEXT NOT NULL DEFAULT '',
+                        created_at TEXT NOT NULL,
+                        expires_at TEXT NOT NULL
+                    )
+                    """
+                )
+                connection.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_negative_cache_expires
+                        ON negative_cache (expires_at)
+                    """
+                )
+                columns = {
+                    row[1] for row in connection.execute("PRAGMA table_info(extraction_cache)")
+                }
+                if "extraction_json" in columns:
+                    # Files from before compact payloads; rows keep their
+                    # JSON until migrate_payloads() re-encodes them.
+                    connection.execute(
+                        "ALTER TABLE extraction_cache RENAME COLUMN extraction_json TO payload"
+                    )
+                for table in ("extraction_cache", "negative_cache"):
+                    columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                    if "fingerprint" not in columns:
+                        # Older entries have an empty, never-matching fingerprint.
+                        connection.execute(
+                            f"ALTER TABLE {table} ADD COLUMN fingerprint TEXT NOT NULL DEFAULT ''"
+                        )
+                connection.commit()
+            finally:
+                connection.close()
+            self._schema_ready = True
+
+    def ensure_table(self, name: str, statements: Sequence[str]):
+        """Run the idempotent DDL ``statements`` for table ``name`` once per process."""
+        if name in self._tables_ready:
+            return
+        self._ensure_schema()
+        with self._schema_lock:
+            if name in self._tables_ready:
+                return
+            connection = self._connect()
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                for statement in statements:
+                    connection.execute(statement)
+                connection.commit()
+            finally:
+                connection.close()
+            self._tables_ready.add(name)
+
+    def buffer_write(self, sql: str, parameters: Tuple = ()) -> bool:
+        """Queue a statement for the next flush, after this cache's own buffered writes.
+
+        Statements run in the order they were buffered, in the flush's
+        transaction, and are retried with it while the database is busy.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._pending_statements.append((sql, parameters))
+            self._after_buffered_write()
+        return True
+
+    def _record_hit(self, cache_key: str, accessed_at: str):
+        """Buffer a hit-count update; the caller holds ``self._lock``."""
+        hits, _ = self._pending_hits.get(cache_key, (0, accessed_at))
+        self._pending_hits[cache_key] = (hits + 1, accessed_at)
+        self._after_buffered_write()
+
+    def _record_memory_hit(self, cache_key: str):
+        """Buffer a memory-tier hit; the caller holds ``self._lock``.
+
+        Memory hits are the hot path, so once a key has a hit waiting for
+        the flush, further hits only add to its count and keep that access
+        time, which is at most a flush interval old.
+        """
+        pending = self._pending_hits.get(cache_key)
+        if pending is not None:
+            self._pending_hits[cache_key] = (pending[0] + 1, pending[1])
+        else:
+            self._record_hit(cache_key, datetime.utcnow().isoformat())
+
+    def _after_buffered_write(self):
+        # Caller holds ``self._lock``.
+        if self._flusher is None or not self._flusher.is_alive():
+            self._stopping = False
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="local-cache-flush", daemon=True
+            )
+            self._flusher.start()
+        if self._pending_writes() >= self._flush_max_pending:
+            self._flush_wake.set()
+
+    def _pending_writes(self) -> int:
+        return (
+            len(self._pending_inserts)
+            + len(self._pending_hits)
+            + len(self._pending_negatives)
+            + len(self._pending_statements)
+        )
+
+    def _flush_loop(self):
+        while not self._stopping:
+            self._flush_wake.wait(self._flush_interval_seconds)
+            self._flush_wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Local cache flush failed: {str(e)}", exc_info=True)
+
+            if self._mapped is not None:
+                try:
+                    self.rebuild_mapped_snapshot()
+                except Exception as e:
+                    logger.error(f"Mapped cache snapshot rebuild failed: {str(e)}", exc_info=True)
+
+            if self._eviction_interval_seconds and time.monotonic() >= self._next_eviction_at:
+                try:
+                    more = self.migrate_payloads()
+                    more = self.evict() or more
+                except Exception as e:
+                    logger.error(f"Local cache maintenance failed: {str(e)}", exc_info=True)
+                    more = False
+                # Keep going at the flush cadence while work is left.
+                delay = 0.0 if more else self._eviction_interval_seconds
+                self._next_eviction_at = time.monotonic() + delay
+
+    def migrate_payloads(self) -> bool:
+        """Re-encode one batch of legacy JSON rows; returns True if more remain."""
+        if not self.enabled or self._payloads_migrated:
+            return False
+
+        with self._flush_lock:
+            connection = self._connection()
+            try:
+                rows = connection.execute(
+                    """
+                    SELECT cache_key, payload, schema_version, normalized_text
+                    FROM extraction_cache
+                    WHERE schema_version NOT LIKE '%:%'
+                    LIMIT ?
+                    """,
+                    (self._eviction_batch_size,),
+                ).fetchall()
+
+                updates = []
+                unreadable = []
+                for cache_key, payload, version, normalized_text in rows:
+                    try:
+                        data = decode_extraction(payload, payload_format(version), normalized_text)
+                    except ValueError:
+                        unreadable.append((cache_key,))
+                        continue
+                    updates.append((encode_extraction(data), schema_version(version), cache_key, version))
+
+                connection.executemany(
+                    """
+                    UPDATE extraction_cache
+                    SET payload = ?, schema_version = ?
+                    WHERE cache_key = ? AND schema_version = ?
+                    """,
+                    updates,
+                )
+                connection.executemany("DELETE FROM extraction_cache WHERE cache_key = ?", unreadable)
+                connection.commit()
+            except sqlite3.OperationalError as e:
+                connection.rollback()
+                logger.warning("Local cache payload migration deferred: %s", e)
+                return False
+
+            self._migrated_rows += len(updates)
+            if len(rows) < self._eviction_batch_size:
+                self._payloads_migrated = True
+                if self._migrated_rows:
+                    logger.info("Re-encoded %d local cache entries", self._migrated_rows)
+            return not self._payloads_migrated
+
+    def evict(self) -> bool:
+        """Run one bounded eviction pass; returns True if a limit is still exceeded."""
+        if not self.enabled:
+            return False
+
+        with self._flush_lock:
+            connection = self._connection()
+            try:
+                return self._evict(connection)
+            except sqlite3.OperationalError as e:
+                connection.rollback()
+                logger.warning("Local cache eviction deferred: %s", e)
+                return False
+
+    def _evict(self, connection: sqlite3.Connection) -> bool:
+        if self._incremental_vacuum is None:
+            self._incremental_vacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+            if not self._incremental_vacuum:
+                # Switching needs a full VACUUM, which would hold the write
+                # lock for as long as it takes to copy the file.
+                logger.warning(
+                    "Local cache file predates incremental auto-vacuum; freed pages are reused "
+                    "but the file never shrinks. Run 'python cache_admin.py vacuum' while the API is stopped."
+                )
+
+        deleted = 0
+        over_limit = False
+
+        if self._negative_ttl_seconds:
+            expired = connection.execute(
+                """
+                DELETE FROM negative_cache
+                WHERE cache_key IN (
+                    SELECT cache_key
+                    FROM negative_cache
+                    WHERE expires_at < ?
+                    ORDER BY expires_at
+                    LIMIT ?
+                )
+                """,
+                (datetime.utcnow().isoformat(), self._eviction_batch_size),
+            ).rowcount
+            deleted += expired
+            over_limit = expired >= self._eviction_batch_size
+
+        if self._max_age:
+            cutoff = (datetime.utcnow() - self._max_age).isoformat()
+            expired = self._delete_least_recent(
+                connection, self._eviction_batch_size, "WHERE last_accessed_at < ?", (cutoff,)
+            )
+            deleted += expired
+            over_limit = over_limit or expired >= self._eviction_batch_size
+
+        if self._max_rows:
+            rows = connection.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+            excess = rows - self._max_rows
+            if excess > 0:
+                deleted += self._delete_least_recent(
+                    connection, min(excess, self._eviction_batch_size)
+                )
+                over_limit = over_limit or excess > self._eviction_batch_size
+
+        if self._max_bytes:
+            page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+            pages = connection.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            used_bytes = (pages - free_pages) * page_size
+            if used_bytes > self._max_bytes:
+                rows = connection.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+                if rows:
+                    bytes_per_row = used_bytes / rows
+                    wanted = int((used_bytes - self._max_bytes) / bytes_per_row) + 1
+                    deleted += self._delete_least_recent(
+                        connection, min(wanted, self._eviction_batch_size)
+                    )
+                    over_limit = over_limit or wanted > self._eviction_batch_size
+
+        connection.commit()
+        if deleted:
+            self._evictions += deleted
+            logger.info("Evicted %d local cache entries", deleted)
+
+        free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_pages and self._incremental_vacuum:
+            # The pragma frees one page per step and returns no columns, so
+            # execute() would stop after the first page; executescript() steps
+            # it to completion.
+            connection.executescript(
+                f"PRAGMA incremental_vacuum({min(free_pages, self._vacuum_pages)});"
+            )
+            over_limit = over_limit or free_pages > self._vacuum_pages
+        return over_limit
+
+    def vacuum(self):
+        """Rebuild the database file with incremental auto-vacuum.
+
+        Only needed for files created before it was enabled. VACUUM copies
+        the whole file and blocks every writer meanwhile, so this is for
+        maintenance windows (``cache_admin.py vacuum``), never the API.
+        """
         if not self.enabled:
             return
+        self.flush()
+        with self._flush_lock:
+            connection = self._connection()
+            connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.execute("VACUUM")
+            self._incremental_vacuum = True
+
+    def _delete_least_recent(
+        self, connection: sqlite3.Connection, limit: int, where: str = "", params: Tuple = ()
+    ) -> int:
+        cursor = connection.execute(
+            f"""
+            DELETE FROM extraction_cache
+            WHERE cache_key IN (
+                SELECT cache_key
+                FROM extraction_cache
+                {where}
+                ORDER BY last_accessed_at, hit_count
+                LIMIT ?
+            )
+            """,
+            (*params, limit),
+        )
+        return cursor.rowcount
+
+    def flush(self) -> int:
+        """Write buffered inserts, hit counts and statements in one transaction; returns writes done."""
+        if not self.enabled:
+            return 0
+
+        with self._flush_lock:
+            with self._lock:
+                inserts, self._pending_inserts = self._pending_inserts, {}
+                hits, self._pending_hits = self._pending_hits, {}
+                negatives, self._pending_negatives = self._pending_negatives, {}
+                statements, self._pending_statements = self._pending_statements, []
+            if not inserts and not hits and not negatives and not statements:
+                return 0
+
+            connection = self._connection()
+            try:
+                connection.executemany(UPSERT_SQL, list(inserts.values()))
+                connection.executemany(
+                    HIT_UPDATE_SQL,
+                    [(count, accessed_at, key) for key, (count, accessed_at) in hits.items()],
+                )
+                connection.executemany(NEGATIVE_UPSERT_SQL, list(negatives.values()))
+                for sql, parameters in statements:
+                    connection.execute(sql, parameters)
+                connection.commit()
+            except sqlite3.OperationalError as e:
+                connection.rollback()
+                self._requeue(inserts, hits, negatives, statements)
+                logger.warning("Local cache flush deferred: %s", e)
+                return 0
+
+            self._flushes += 1
+            return len(inserts) + len(hits) + len(negatives) + len(statements)
+
+    def _requeue(
+        self,
+        inserts: Dict[str, Tuple],
+        hits: Dict[str, Tuple[int, str]],
+        negatives: Dict[str, Tuple],
+        statements: List[Tuple[str, Tuple]],
+    ):
+        # Newer buffered writes win over the ones being put back; statements
+        # go back ahead of newer ones to keep their order.
+        with self._lock:
+            self._write_failures += 1
+            self._pending_statements[:0] = statements
+            for cache_key, row in negatives.items():
+                self._pending_negatives.setdefault(cache_key, row)
+            for cache_key, row in inserts.items():
+                self._pending_inserts.setdefault(cache_key, row)
+            for cache_key, (count, accessed_at) in hits.items():
+                pending_count, pending_at = self._pending_hits.get(cache_key, (0, accessed_at))
+                self._pending_hits[cache_key] = (pending_count + count, max(pending_at, accessed_at))
+
+    def close(self):
+        """Stop the flush thread and write out everything still buffered."""
+        if not self.enabled:
+            return
+        flusher = self._flusher
+        if flusher is not None and flusher.is_alive():
+            self._stopping = True
+            self._flush_wake.set()
+            flusher.join(timeout=self._busy_timeout_seconds + 1)
+        self.flush()
+        if self._l2 is not None:
+            self._l2.close()
+
+    def export_snapshot(self, handle: BinaryIO, limit: int = 0) -> int:
+        """Write the ``limit`` hottest entries (0 for all) to ``handle``; returns the count.
 
-        db_path = settings.local_cache_db_path
-        db_directory = os.path.dirname(db_path)
-        if db_directory:
-            os.makedirs(db_directory, exist_ok=True)
-        self._connection = sqlite3.connect(db_path, check_same_thread=False)
-        self._connection.execute(
+        Entries are ordered by hit count, then by last access, so a partial
+        import or memory priming takes the most useful ones first.
+        """
+        if not self.enabled:
+            return 0
+
+        self.flush()
+        rows = self._connection().execute(
             """
-            CREATE TABLE IF NOT EXISTS extraction_cache (
-                cache_key TEXT PRIMARY KEY,
-                normalized_text TEXT NOT NULL,
-                extraction_json TEXT NOT NULL,
-                provider TEXT NOT NULL,
-                model TEXT NOT NULL,
-                schema_version TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                last_accessed_at TEXT NOT NULL,
-                hit_count INTEGER NOT NULL DEFAULT 0
+            SELECT cache_key, normalized_text, payload, provider, model, schema_version,
+                fingerprint, created_at, last_accessed_at, hit_count
+            FROM extraction_cache
+            ORDER BY hit_count DESC, last_accessed_at DESC
+            LIMIT ?
+            """,
+            (limit if limit > 0 else -1,),
+        )
+        header = {
+            "created_at": datetime.utcnow().isoformat(),
+            "normalization_version": settings.cache_normalization_version,
+        }
+        return write_snapshot(handle, header, rows)
+
+    def import_snapshot(self, handle: BinaryIO) -> Dict:
+        """Load a snapshot in one transaction; entries already cached are kept.
+
+        Raises ValueError for a file that is not a readable snapshot, in
+        which case nothing is imported. A snapshot whose keys were built with
+        another normalization version could never be hit, so it is skipped
+        and the returned dict carries a ``skipped`` reason.
+        """
+        if not self.enabled:
+            return {"entries": 0, "imported": 0}
+
+        header, rows = read_snapshot(handle)
+        version = header.get("normalization_version")
+        if version != settings.cache_normalization_version:
+            reason = (
+                f"snapshot normalization version {version!r} does not match "
+                f"{settings.cache_normalization_version!r}"
             )
+            logger.warning("Cache snapshot not imported: %s", reason)
+            return {"entries": 0, "imported": 0, "skipped": reason}
+        entries = 0
+
+        def counted():
+            nonlocal entries
+            for row in rows:
+                entries += 1
+                yield row
+
+        with self._flush_lock:
+            connection = self._connection()
+            changes = connection.total_changes
+            try:
+                connection.executemany(SNAPSHOT_INSERT_SQL, counted())
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            imported = connection.total_changes - changes
+
+        self._snapshot_imported += imported
+        logger.info(
+            "Imported %d of %d cache snapshot entries (created %s)",
+            imported, entries, header.get("created_at"),
+        )
+        return {"entries": entries, "imported": imported}
+
+    def rebuild_mapped_snapshot(self, force: bool = False) -> int:
+        """Rewrite the mapped snapshot from SQLite if it is due; returns the entries written.
+
+        Only one process rebuilds at a time; the others skip and pick the
+        new file up on their next check.
+        """
+        if self._mapped is None:
+            return 0
+
+        def due() -> bool:
+            age = self._mapped.age_seconds()
+            return force or age is None or age >= self._mapped_rebuild_seconds
+
+        if not due():
+            return 0
+        lock = self._mapped.rebuild_lock()
+        if lock is None:
+            return 0
+        with lock:
+            if not due():
+                return 0
+            rows = self._connection().execute(
+                """
+                SELECT cache_key, payload, schema_version, fingerprint, created_at
+                FROM extraction_cache
+                ORDER BY hit_count DESC, last_accessed_at DESC
+                LIMIT ?
+                """,
+                (self._mapped_max_entries,),
+            ).fetchall()
+            count = build_mapped_snapshot(self._mapped.path, rows)
+        self._mapped_rebuilds += 1
+        logger.info("Rebuilt mapped cache snapshot with %d entries", count)
+        return count
+
+    def _lookup_mapped(
+        self, texts_by_key: Dict[str, str], fingerprint: Optional[str]
+    ) -> Dict[str, ExtractedContact]:
+        """Current entries from the mapped snapshot, by cache key; anything else is left to SQLite.
+
+        A key this process rewrote is skipped until a rebuild carries the new
+        row. Rewrites by other processes are served from the snapshot until
+        the next rebuild, so they can be up to a rebuild interval stale.
+        """
+        if self._mapped is None or not texts_by_key:
+            return {}
+
+        found: Dict[str, ExtractedContact] = {}
+        superseded = 0
+        caught_up: List[Tuple[str, str]] = []
+        for cache_key, text in texts_by_key.items():
+            entry = self._mapped.get(cache_key)
+            if entry is None:
+                continue
+            version, entry_fingerprint, created_at, payload = entry
+            rewritten_at = self._mapped_rewrites.get(cache_key)
+            if rewritten_at is not None:
+                if created_at < rewritten_at:
+                    superseded += 1
+                    continue
+                caught_up.append((cache_key, rewritten_at))
+            if self._fingerprint_status(entry_fingerprint, fingerprint) != "current":
+                continue
+            extraction = self._decode_row(payload, version, text)
+            if extraction is not None:
+                found[cache_key] = extraction
+        if superseded or caught_up:
+            with self._lock:
+                self._mapped_superseded += superseded
+                for cache_key, rewritten_at in caught_up:
+                    if self._mapped_rewrites.get(cache_key) == rewritten_at:
+                        del self._mapped_rewrites[cache_key]
+        return found
+
+    def prime_memory(self, fingerprint: Optional[str] = None) -> int:
+        """Fill the memory tier with the hottest current entries; returns how many were added."""
+        if not self.enabled:
+            return 0
+
+        budget = self._memory.max_bytes
+        used = 0
+        primed = 0
+        rows = self._connection().execute(
+            """
+            SELECT cache_key, normalized_text, payload, schema_version, fingerprint
+            FROM extraction_cache
+            ORDER BY hit_count DESC, last_accessed_at DESC
             """
         )
-        self._connection.commit()
+        for cache_key, normalized_text, payload, version, entry_fingerprint in rows:
+            if used >= budget:
+                break
+            if self._fingerprint_status(entry_fingerprint, fingerprint) != "current":
+                continue
+            extraction = self._decode_row(payload, version, normalized_text)
+            if extraction is None:
+                continue
+            with self._lock:
+                if cache_key in self._memory:
+                    continue
+                self._remember(cache_key, extraction)
+            used += len(extraction.model_dump_json())
+            primed += 1
+
+        self._primed += primed
+        return primed
 
     def _normalize_text(self, text: str) -> str:
-        return " ".join(text.split())
+        return canonicalize(text, settings.cache_normalization_version)
 
-    def _cache_key(self, text: str) -> str:
+    def cache_key(self, text: str) -> str:
+        """The key ``text`` is cached under, shared by every text that canonicalizes alike."""
         normalized = self._normalize_text(text)
         payload = f"{settings.cache_normalization_version}:{normalized}"
         return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-    def _remember(self, cache_key: str, extraction_data: Dict):
-        self._memory[cache_key] = extraction_data
-        self._memory.move_to_end(cache_key)
-        while len(self._memory) > self._max_entries:
-            self._memory.popitem(last=False)
+    def _remember(self, cache_key: str, extraction: ExtractedContact):
+        self._memory.put(cache_key, self.detached(extraction), len(extraction.model_dump_json()))
+        self._negative.pop(cache_key, None)
+
+    def _remember_negative(self, cache_key: str, extraction: Optional[ExtractedContact], expires_at: float):
+        self._negative[cache_key] = (self.detached(extraction) if extraction else None, expires_at)
+        self._negative.move_to_end(cache_key)
+        while len(self._negative) > self._max_negative_entries:
+            self._negative.popitem(last=False)
+
+    def _memory_negative(self, cache_key: str, text: str) -> Tuple[Optional[ExtractedContact], bool]:
+        """Unexpired negative entry from memory; the caller holds ``self._lock``."""
+        entry = self._negative.get(cache_key)
+        if entry is None:
+            return None, False
+        extraction, expires_at = entry
+        if expires_at <= time.time():
+            del self._negative[cache_key]
+            return None, False
+        self._negative.move_to_end(cache_key)
+        return self.detached(extraction, text) if extraction else None, True
+
+    @staticmethod
+    def detached(extraction: ExtractedContact, text: Optional[str] = None) -> ExtractedContact:
+        """A copy that shares nothing mutable with ``extraction``.
+
+        The memory tiers keep their own copy and hand out copies, so a caller
+        changing a contact (or its phones or address) cannot change later
+        hits. ``text`` replaces raw_text: texts that canonicalize alike still
+        differ as raw text.
+        """
+        return extraction.model_copy(update={
+            "raw_text": extraction.raw_text if text is None else text,
+            "phone_numbers": [phone.model_copy() for phone in extraction.phone_numbers],
+            "address": extraction.address.model_copy() if extraction.address else None,
+        })
+
+    def _decode_negative(self, payload, version: str, text: str) -> Tuple[Optional[ExtractedContact], bool]:
+        # An empty payload records that there was no contact at all.
+        if not payload:
+            return None, True
+        extraction = self._decode_row(payload, version, text)
+        return extraction, extraction is not None
+
+    def _pending_extraction(self, cache_key: str, text: str) -> Optional[ExtractedContact]:
+        """An entry written but not yet flushed; the caller holds ``self._lock``."""
+        row = self._pending_inserts.get(cache_key)
+        return self._decode_row(row[2], PAYLOAD_FORMAT, text) if row else None
+
+    def _decode_row(self, payload, version: str, text: str) -> Optional[ExtractedContact]:
+        """Decode and validate a stored payload; the only place cached entries are validated."""
+        try:
+            return ExtractedContact(**decode_extraction(payload, payload_format(version), text))
+        except (ValueError, zlib.error) as e:
+            logger.warning("Unreadable local cache entry (%s): %s", version, e)
+            return None
+
+    def _fingerprint_status(self, entry_fingerprint: str, fingerprint: Optional[str]) -> str:
+        """Whether a stored entry is "current", "stale" (servable while refreshed) or "rejected"."""
+        if (
+            fingerprint is None
+            or entry_fingerprint == fingerprint
+            or entry_fingerprint in self._accepted_fingerprints
+            or self._fingerprint_policy == "any"
+        ):
+            return "current"
+        if self._fingerprint_policy == "stale_while_revalidate":
+            return "stale"
+        return "rejected"
+
+    @staticmethod
+    def _shared_value(row: Tuple) -> bytes:
+        """An entry as stored in the shared tier: metadata lines, then the payload."""
+        _, _, payload, provider, model, version, fingerprint, _, _ = row
+        header = "\n".join((version, fingerprint, provider, model)).encode("utf-8")
+        return header + b"\n" + payload
+
+    def _lookup_shared(
+        self, texts_by_key: Dict[str, str], fingerprint: Optional[str]
+    ) -> Dict[str, Tuple[ExtractedContact, str]]:
+        """Look keys up in the shared tier; current hits are copied into the local tiers.
+
+        Returns ``(extraction, tier)`` by cache key, with tier "l2" or
+        "stale"; the caller counts them.
+        """
+        if self._l2 is None or not texts_by_key:
+            return {}
+
+        found: Dict[str, Tuple[ExtractedContact, str]] = {}
+        now = datetime.utcnow().isoformat()
+        for cache_key, value in self._l2.get_many(list(texts_by_key)).items():
+            try:
+                version, entry_fingerprint, provider, model, payload = value.split(b"\n", 4)
+                version, entry_fingerprint, provider, model = (
+                    field.decode("utf-8") for field in (version, entry_fingerprint, provider, model)
+                )
+            except ValueError:
+                logger.warning("Unreadable shared cache entry %s", cache_key)
+                continue
+            status = self._fingerprint_status(entry_fingerprint, fingerprint)
+            if status == "rejected":
+                continue
+            text = texts_by_key[cache_key]
+            extraction = self._decode_row(payload, version, text)
+            if extraction is None:
+                continue
+            if status == "stale":
+                found[cache_key] = (extraction, "stale")
+                continue
+            found[cache_key] = (extraction, "l2")
+            with self._lock:
+                self._remember(cache_key, extraction)
+                self._pending_inserts.setdefault(cache_key, (
+                    cache_key, self._normalize_text(text), payload, provider, model,
+                    version, entry_fingerprint, now, now,
+                ))
+                self._after_buffered_write()
+        return found
+
+    def get(self, text: str) -> Optional[ExtractedContact]:
+        return self.lookup(text)[0]
+
+    def peek(self, text: str, fingerprint: Optional[str] = None) -> Optional[ExtractedContact]:
+        """The current local entry for ``text``, for maintenance and inspection.
 
-    def get(self, text: str) -> Optional[Dict]:
+        Unlike :meth:`lookup` it records no hit, promotes nothing in the
+        memory tier and counts nothing in the stats, so scanning many
+        texts leaves eviction order as it was. Only memory, unflushed
+        writes and SQLite are read.
+        """
         if not self.enabled:
             return None
 
-        cache_key = self._cache_key(text)
+        cache_key = self.cache_key(text)
+        with self._lock:
+            memory_hit = self._memory.peek(cache_key)
+            if memory_hit is None:
+                memory_hit = self._pending_extraction(cache_key, text)
+            if memory_hit is not None:
+                return self.detached(memory_hit, text)
+
+        row = self._connection().execute(
+            "SELECT payload, schema_version, fingerprint FROM extraction_cache WHERE cache_key = ?",
+            (cache_key,),
+        ).fetchone()
+        if row is None or self._fingerprint_status(row[2], fingerprint) != "current":
+            return None
+        return self._decode_row(row[0], row[1], text)
+
+    def lookup(
+        self, text: str, fingerprint: Optional[str] = None, memory_only: bool = False
+    ) -> Tuple[Optional[ExtractedContact], Optional[str]]:
+        """Return the cached extraction and the tier that served it.
+
+        The tier is "memory", "mmap", "sqlite" or "l2" for a positive entry, "stale" for an
+        entry written under another ``fingerprint`` that the policy still
+        lets through, "negative" for a cached not-found outcome (whose
+        extraction may be None), or None on a miss. Without a fingerprint
+        every entry is accepted.
+
+        With ``memory_only`` nothing touches SQLite, so it is safe to call
+        from the event loop; a None tier is then not counted as a miss.
+        """
+        if not self.enabled:
+            return None, None
+
+        cache_key = self.cache_key(text)
 
         with self._lock:
             memory_hit = self._memory.get(cache_key)
+            if memory_hit is None:
+                memory_hit = self._pending_extraction(cache_key, text)
+                if memory_hit is not None:
+                    self._remember(cache_key, memory_hit)
             if memory_hit is not None:
+                self._record_memory_hit(cache_key)
                 self._hits += 1
-                self._memory.move_to_end(cache_key)
-                return memory_hit
+                self._tier_hits["memory"] += 1
+                return self.detached(memory_hit, text), "memory"
+            negative_hit, found = self._memory_negative(cache_key, text)
+            if found:
+                self._negative_hits += 1
+                return negative_hit, "negative"
+        if memory_only:
+            return None, None
 
-            if not self._connection:
-                self._misses += 1
-                return None
+        mapped = self._lookup_mapped({cache_key: text}, fingerprint).get(cache_key)
+        if mapped is not None:
+            with self._lock:
+                self._record_hit(cache_key, datetime.utcnow().isoformat())
+                self._remember(cache_key, mapped)
+                self._hits += 1
+                self._tier_hits["mmap"] += 1
+            return mapped, "mmap"
 
-            row = self._connection.execute(
-                """
-                SELECT extraction_json
-                FROM extraction_cache
-                WHERE cache_key = ?
-                """,
-                (cache_key,),
-            ).fetchone()
+        connection = self._connection()
+        row = connection.execute(
+            """
+            SELECT payload, schema_version, fingerprint
+            FROM extraction_cache
+            WHERE cache_key = ?
+            """,
+            (cache_key,),
+        ).fetchone()
+
+        extraction = None
+        status = None
+        if row:
+            status = self._fingerprint_status(row[2], fingerprint)
+            if status != "rejected":
+                extraction = self._decode_row(row[0], row[1], text)
 
-            if not row:
+        if extraction is None:
+            if self._negative_ttl_seconds:
+                negative = connection.execute(
+                    """
+                    SELECT payload, schema_version, expires_at
+                    FROM negative_cache
+                    WHERE cache_key = ? AND expires_at > ? AND (? IS NULL OR fingerprint = ?)
+                    """,
+                    (cache_key, datetime.utcnow().isoformat(), *self._negative_fingerprint(fingerprint)),
+                ).fetchone()
+                if negative:
+                    negative_hit, found = self._decode_negative(negative[0], negative[1], text)
+                    if found:
+                        with self._lock:
+                            self._remember_negative(
+                                cache_key, negative_hit, _timestamp(negative[2])
+                            )
+                            self._negative_hits += 1
+                        return negative_hit, "negative"
+            shared = self._lookup_shared({cache_key: text}, fingerprint)
+            with self._lock:
+                if cache_key in shared:
+                    extraction, tier = shared[cache_key]
+                    if tier == "stale":
+                        self._stale_hits += 1
+                    else:
+                        self._hits += 1
+                        self._tier_hits["l2"] += 1
+                    return extraction, tier
+                if status == "rejected":
+                    self._fingerprint_rejects += 1
                 self._misses += 1
-                return None
+            return None, None
 
-            extraction_data = json.loads(row[0])
-            self._connection.execute(
-                """
-                UPDATE extraction_cache
-                SET hit_count = hit_count + 1,
-                    last_accessed_at = ?
-                WHERE cache_key = ?
-                """,
-                (datetime.utcnow().isoformat(), cache_key),
-            )
-            self._connection.commit()
-            self._remember(cache_key, extraction_data)
+        with self._lock:
+            self._record_hit(cache_key, datetime.utcnow().isoformat())
+            if status == "stale":
+                # Not kept in memory, so every hit sees it is stale until
+                # a fresh extraction replaces it.
+                self._stale_hits += 1
+                return extraction, "stale"
+            self._remember(cache_key, extraction)
             self._hits += 1
-            return extraction_data
+            self._tier_hits["sqlite"] += 1
+        return extraction, "sqlite"
+
+    def _negative_fingerprint(self, fingerprint: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        # Negative entries are short-lived and only used when current; with
+        # no fingerprint to compare, or under the "any" policy, match all.
+        if self._fingerprint_policy == "any":
+            fingerprint = None
+        return fingerprint, fingerprint
 
-    def set(self, text: str, extraction: ExtractedContact, provider: str, model: str) -> bool:
+    def get_many(
+        self, texts: List[str], fingerprint: Optional[str] = None
+    ) -> Dict[str, Tuple[Optional[ExtractedContact], str]]:
+        """Look up several texts at once; returns ``(extraction, tier)`` by cache key.
+
+        Tiers and fingerprint handling are as for :meth:`lookup`; misses are
+        left out. Memory and unflushed entries are served first, then the
+        mapped snapshot; the rest are fetched from SQLite with a single
+        query per chunk.
+        """
+        if not self.enabled:
+            return {}
+
+        texts_by_key: Dict[str, str] = {}
+        for text in texts:
+            texts_by_key.setdefault(self.cache_key(text), text)
+        keys = list(texts_by_key)
+        found: Dict[str, Tuple[Optional[ExtractedContact], str]] = {}
+
+        missing = []
+        with self._lock:
+            for cache_key in keys:
+                memory_hit = self._memory.get(cache_key)
+                if memory_hit is None:
+                    memory_hit = self._pending_extraction(cache_key, texts_by_key[cache_key])
+                    if memory_hit is not None:
+                        self._remember(cache_key, memory_hit)
+                if memory_hit is not None:
+                    self._record_memory_hit(cache_key)
+                    found[cache_key] = (self.detached(memory_hit, texts_by_key[cache_key]), "memory")
+                    continue
+                negative_hit, is_negative = self._memory_negative(cache_key, texts_by_key[cache_key])
+                if is_negative:
+                    found[cache_key] = (negative_hit, "negative")
+                else:
+                    missing.append(cache_key)
+
+        mapped = self._lookup_mapped({cache_key: texts_by_key[cache_key] for cache_key in missing}, fingerprint)
+        for cache_key, extraction in mapped.items():
+            found[cache_key] = (extraction, "mmap")
+        missing = [cache_key for cache_key in missing if cache_key not in mapped]
+
+        loaded: Dict[str, Tuple[ExtractedContact, str]] = {}
+        rejected = 0
+        if missing:
+            connection = self._connection()
+            for start in range(0, len(missing), self._lookup_chunk_size):
+                chunk = missing[start:start + self._lookup_chunk_size]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = connection.execute(
+                    f"""
+                    SELECT cache_key, payload, schema_version, fingerprint
+                    FROM extraction_cache
+                    WHERE cache_key IN ({placeholders})
+                    """,
+                    chunk,
+                ).fetchall()
+                for cache_key, payload, version, entry_fingerprint in rows:
+                    status = self._fingerprint_status(entry_fingerprint, fingerprint)
+                    if status == "rejected":
+                        rejected += 1
+                        continue
+                    extraction = self._decode_row(payload, version, texts_by_key[cache_key])
+                    if extraction is not None:
+                        loaded[cache_key] = (
+                            extraction, "stale" if status == "stale" else "sqlite"
+                        )
+        found.update(loaded)
+
+        negatives: Dict[str, Tuple[Optional[ExtractedContact], float]] = {}
+        still_missing = [cache_key for cache_key in missing if cache_key not in loaded]
+        if still_missing and self._negative_ttl_seconds:
+            now = datetime.utcnow().isoformat()
+            for start in range(0, len(still_missing), self._lookup_chunk_size):
+                chunk = still_missing[start:start + self._lookup_chunk_size]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = connection.execute(
+                    f"""
+                    SELECT cache_key, payload, schema_version, expires_at
+                    FROM negative_cache
+                    WHERE cache_key IN ({placeholders}) AND expires_at > ?
+                        AND (? IS NULL OR fingerprint = ?)
+                    """,
+                    (*chunk, now, *self._negative_fingerprint(fingerprint)),
+                ).fetchall()
+                for cache_key, payload, version, expires_at in rows:
+                    negative_hit, is_negative = self._decode_negative(
+                        payload, version, texts_by_key[cache_key]
+                    )
+                    if is_negative:
+                        negatives[cache_key] = (negative_hit, _timestamp(expires_at))
+                        found[cache_key] = (negative_hit, "negative")
+
+        found.update(self._lookup_shared(
+            {cache_key: texts_by_key[cache_key] for cache_key in missing if cache_key not in found},
+            fingerprint,
+        ))
+
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            for cache_key, extraction in mapped.items():
+                self._remember(cache_key, extraction)
+                self._record_hit(cache_key, now)
+            for cache_key, (extraction, tier) in loaded.items():
+                if tier == "sqlite":
+                    self._remember(cache_key, extraction)
+                self._record_hit(cache_key, now)
+            for cache_key, (negative_hit, expires_at) in negatives.items():
+                self._remember_negative(cache_key, negative_hit, expires_at)
+            tiers = [tier for _, tier in found.values()]
+            for tier in tiers:
+                if tier in self._tier_hits:
+                    self._tier_hits[tier] += 1
+            self._negative_hits += tiers.count("negative")
+            self._stale_hits += tiers.count("stale")
+            self._hits += len(tiers) - tiers.count("negative") - tiers.count("stale")
+            self._misses += len(keys) - len(found)
+            self._fingerprint_rejects += rejected
+        return found
+
+    def set(
+        self,
+        text: str,
+        extraction: ExtractedContact,
+        provider: str,
+        model: str,
+        fingerprint: str = "",
+    ) -> bool:
         if not self.enabled:
             return False
 
-        cache_key = self._cache_key(text)
+        cache_key = self.cache_key(text)
         normalized = self._normalize_text(text)
         extraction_data = extraction.model_dump(mode="json")
         now = datetime.utcnow().isoformat()
 
+        row = (
+            cache_key,
+            normalized,
+            encode_extraction(extraction_data),
+            provider,
+            model,
+            schema_version(settings.cache_normalization_version),
+            fingerprint,
+            now,
+            now,
+        )
+        rewrites_mapped = self._mapped is not None and self._mapped.get(cache_key) is not None
         with self._lock:
-            self._remember(cache_key, extraction_data)
+            self._remember(cache_key, extraction)
+            self._pending_inserts[cache_key] = row
+            if rewrites_mapped:
+                self._mapped_rewrites[cache_key] = now
+            self._after_buffered_write()
+        if self._l2 is not None:
+            self._l2.put(cache_key, self._shared_value(row))
+        return True
 
-            if not self._connection:
-                return True
+    def set_negative(
+        self,
+        text: str,
+        extraction: Optional[ExtractedContact],
+        provider: str,
+        model: str,
+        fingerprint: str = "",
+    ) -> bool:
+        """Remember that ``text`` had nothing servable, with the result that was returned."""
+        if not self.enabled or not self._negative_ttl_seconds:
+            return False
 
-            self._connection.execute(
-                """
-                INSERT INTO extraction_cache (
-                    cache_key,
-                    normalized_text,
-                    extraction_json,
-                    provider,
-                    model,
-                    schema_version,
-                    created_at,
-                    last_accessed_at,
-                    hit_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
-                ON CONFLICT(cache_key) DO UPDATE SET
-                    normalized_text = excluded.normalized_text,
-                    extraction_json = excluded.extraction_json,
-                    provider = excluded.provider,
-                    model = excluded.model,
-                    schema_version = excluded.schema_version,
-                    last_accessed_at = excluded.last_accessed_at
-                """,
-                (
-                    cache_key,
-                    normalized,
-                    json.dumps(extraction_data),
-                    provider,
-                    model,
-                    settings.cache_normalization_version,
-                    now,
-                    now,
-                ),
+        cache_key = self.cache_key(text)
+        extraction_data = extraction.model_dump(mode="json") if extraction else None
+        created_at = datetime.utcnow()
+        expires_at = created_at + timedelta(seconds=self._negative_ttl_seconds)
+
+        with self._lock:
+            if cache_key in self._memory or cache_key in self._pending_inserts:
+                return False
+            self._remember_negative(cache_key, extraction, time.time() + self._negative_ttl_seconds)
+            self._pending_negatives[cache_key] = (
+                cache_key,
+                encode_extraction(extraction_data) if extraction_data else b"",
+                schema_version(settings.cache_normalization_version),
+                provider,
+                model,
+                fingerprint,
+                created_at.isoformat(),
+                expires_at.isoformat(),
             )
-            self._connection.commit()
-            return True
+            self._negative_stores += 1
+            self._after_buffered_write()
+        return True
 
     def get_stats(self) -> Dict:
         if not self.enabled:
             return {
                 "enabled": False,
                 "memory_entries": 0,
+                "memory": {},
                 "persistent_entries": 0,
                 "hits": 0,
                 "misses": 0,
+                "negative_entries": 0,
+                "negative_hits": 0,
+                "negative_stores": 0,
+                "stale_hits": 0,
+                "fingerprint_rejects": 0,
+                "pending_writes": 0,
+                "flushes": 0,
+                "write_failures": 0,
+                "evictions": 0,
+                "migrated_entries": 0,
+                "snapshot_imported": 0,
+                "primed_entries": 0,
+                "tier_hits": {},
+                "mmap": {"enabled": False},
+                "l2": {"enabled": False},
             }
 
-        persistent_entries = 0
-        if self._connection:
-            row = self._connection.execute(
-                "SELECT COUNT(*) FROM extraction_cache"
-            ).fetchone()
-            persistent_entries = int(row[0]) if row else 0
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT COUNT(*) FROM extraction_cache"
+        ).fetchone()
+        persistent_entries = int(row[0]) if row else 0
+        row = connection.execute(
+            "SELECT COUNT(*) FROM negative_cache WHERE expires_at > ?",
+            (datetime.utcnow().isoformat(),),
+        ).fetchone()
+        negative_entries = int(row[0]) if row else 0
 
         return {
             "enabled": True,
             "memory_entries": len(self._memory),
+            "memory": self._memory.get_stats(),
             "persistent_entries": persistent_entries,
             "hits": self._hits,
             "misses": self._misses,
+            "negative_entries": negative_entries,
+            "negative_hits": self._negative_hits,
+            "negative_stores": self._negative_stores,
+            "stale_hits": self._stale_hits,
+            "fingerprint_rejects": self._fingerprint_rejects,
+            "pending_writes": self._pending_writes(),
+            "flushes": self._flushes,
+            "write_failures": self._write_failures,
+            "evictions": self._evictions,
+            "migrated_entries": self._migrated_rows,
+            "snapshot_imported": self._snapshot_imported,
+            "primed_entries": self._primed,
+            "tier_hits": dict(self._tier_hits),
+            "mmap": (
+                {
+                    **self._mapped.get_stats(),
+                    "rebuilds": self._mapped_rebuilds,
+                    "superseded": self._mapped_superseded,
+                    "rewritten_keys": len(self._mapped_rewrites),
+                }
+                if self._mapped is not None
+                else {"enabled": False}
+            ),
+            "l2": self._l2.get_stats() if self._l2 is not None else {"enabled": False},
         }
 
 
+def _timestamp(iso_utc: str) -> float:
+    return datetime.fromisoformat(iso_utc).replace(tzinfo=timezone.utc).timestamp()
+
+
 local_cache = LocalExtractionCache()
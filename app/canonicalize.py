@@ -0,0 +1,75 @@
+import re
+import unicodedata
+from typing import Callable, Dict
+
+# Characters NFKC leaves alone but that differ between keyboards, phones and
+# mail clients for what is meant to be the same text.
+_PUNCTUATION = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201b": "'", "\u2032": "'",
+    "\u201c": '"', "\u201d": '"', "\u201e": '"', "\u201f": '"', "\u2033": '"',
+    "\u2010": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2015": "-", "\u2212": "-",
+    "\u200b": "", "\u200c": "", "\u200d": "", "\u2060": "", "\ufeff": "",
+})
+
+# Sign-offs appended by mail and messaging clients. Only fixed phrases at
+# the very end: free form signatures can carry contact details and must stay
+# in the key. Matched after whitespace is collapsed.
+_BOILERPLATE_TAIL = re.compile(
+    r"(?:^| )(?:"
+    r"sent from my (?:iphone|ipad|android|samsung|galaxy|pixel|mobile|phone|smartphone|blackberry)[a-z&' -]{0,40}"
+    r"|sent from (?:outlook|gmail|yahoo mail|mail)(?: for (?:iphone|ipad|ios|android|windows))?"
+    r"|get outlook for (?:ios|android)"
+    r")[ .!]*$"
+)
+
+_PHONE = re.compile(
+    r"(?<![\d+])(?=[+(\d])(?:\+?1[ .-]?)?\(?(\d{3})\)?[ .-]?(\d{3})[ .-]?(\d{4})(?!\d)"
+    r"(?: ?(?:ext\.?|extension|x) ?(\d{1,6})(?!\d))?"
+)
+_MAILTO = re.compile(r"mailto:(?=[a-z0-9._%+-]+@)")
+_REPEATED_PUNCTUATION = re.compile(r"([!?.,;:~-])\1+")
+_TRAILING_PUNCTUATION = " .!?,;:~-"
+
+
+def collapse_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _phone_digits(match: "re.Match[str]") -> str:
+    number = match.group(1) + match.group(2) + match.group(3)
+    return f"{number}x{match.group(4)}" if match.group(4) else number
+
+
+def canonicalize_v2(text: str) -> str:
+    """Fold away differences that do not change what would be extracted.
+
+    NFKC and case folding, ASCII quotes and dashes, a trailing client
+    sign-off ("Sent from my iPhone") removed, US phone numbers written as their ten
+    digits (plus ``x`` and the extension), ``mailto:`` dropped, runs of
+    punctuation collapsed and trailing punctuation trimmed.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    if not text.isascii():
+        text = text.translate(_PUNCTUATION)
+    text = text.casefold()
+    text = _BOILERPLATE_TAIL.sub("", collapse_whitespace(text))
+    text = _PHONE.sub(_phone_digits, text)
+    text = _MAILTO.sub("", text)
+    text = _REPEATED_PUNCTUATION.sub(r"\1", text)
+    return text.rstrip(_TRAILING_PUNCTUATION)
+
+
+# Cache keys embed the version, so changing what a version does would
+# silently mix entries; add a new version instead.
+CANONICALIZERS: Dict[str, Callable[[str], str]] = {
+    "v1": collapse_whitespace,
+    "v2": canonicalize_v2,
+}
+
+
+def canonicalize(text: str, version: str) -> str:
+    try:
+        canonicalizer = CANONICALIZERS[version]
+    except KeyError:
+        raise ValueError(f"Unknown cache normalization version: {version}") from None
+    return canonicalizer(text)
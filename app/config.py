@@ -15,16 +15,91 @@ class Settings(BaseSettings):
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-4o-mini"
     openai_timeout_seconds: float = 15.0
+
+    # Provider admission control: concurrent calls, waiting calls, and the
+    # longest expected queue wait before a request is rejected with 429.
+    ollama_num_parallel: int = 1  # keep in sync with OLLAMA_NUM_PARALLEL on the Ollama server
+    openai_max_concurrency: int = 16
+    provider_max_queue: int = 64
+    provider_max_queue_wait_seconds: float = 30.0
+    provider_initial_latency_seconds: float = 2.0
+    
+    # Background health probing of the provider and ChromaDB
+    health_probe_interval_seconds: float = 15.0
+    health_probe_failure_interval_seconds: float = 2.0
     
     # ChromaDB Configuration
     chroma_persist_directory: str = "./chroma_db"
     chroma_collection_name: str = "contact_extractions"
+    # Extractions are added by a background thread in batches. When
+    # chroma_write_queue_size are waiting, further ones are dropped or, with
+    # "spill", appended to chroma_spill_path and added once the queue drains.
+    chroma_write_queue_size: int = 2000
+    chroma_write_batch_size: int = 64
+    chroma_write_overflow: Literal["drop", "spill"] = "drop"
+    chroma_spill_path: str = "./cache/chroma_spill.jsonl"
 
     # Local Cache Configuration
     local_cache_enabled: bool = True
     local_cache_db_path: str = "./cache/extraction_cache.sqlite3"
-    local_cache_memory_entries: int = 1000
-    cache_normalization_version: str = "v1"
+    local_cache_memory_entries: int = 1000  # negative entries kept in memory
+    # In-memory tier in front of SQLite, bounded by the encoded size of its
+    # entries; "tinylfu" keeps recurring texts through one-off bulk runs
+    local_cache_memory_bytes: int = 16777216
+    local_cache_memory_policy: Literal["tinylfu", "lru"] = "tinylfu"
+    local_cache_busy_timeout_ms: int = 5000
+    local_cache_flush_interval_seconds: float = 1.0
+    local_cache_flush_max_pending: int = 500
+    # Retention for the SQLite tier; 0 disables a limit
+    local_cache_max_rows: int = 100000
+    local_cache_max_bytes: int = 268435456
+    local_cache_max_age_days: float = 30.0
+    local_cache_eviction_interval_seconds: float = 60.0
+    local_cache_eviction_batch_size: int = 1000
+    local_cache_vacuum_pages: int = 1000
+    # How long "nothing found" outcomes are cached; 0 disables negative caching
+    local_cache_negative_ttl_seconds: float = 3600.0
+    # Read-only snapshot of the hottest entries that all workers memory-map,
+    # between the memory tier and SQLite; empty disables it
+    local_cache_mmap_path: str = ""
+    local_cache_mmap_max_entries: int = 100000
+    local_cache_mmap_rebuild_seconds: float = 300.0
+    # Shared cache tier consulted after local misses, e.g. redis://host:6379/0;
+    # empty disables it. Past the timeout or on errors it is skipped for
+    # l2_cache_retry_seconds.
+    l2_cache_url: str = ""
+    l2_cache_timeout_ms: float = 50.0
+    l2_cache_retry_seconds: float = 5.0
+    l2_cache_ttl_seconds: int = 604800
+    l2_cache_max_queued_writes: int = 1000
+    l2_cache_key_prefix: str = "cif:"
+    # Warm start: a snapshot (see cache_admin.py) loaded into SQLite at
+    # startup, then the hottest entries loaded into memory before serving
+    local_cache_snapshot_path: str = ""
+    local_cache_snapshot_entries: int = 50000  # default size of an exported snapshot
+    local_cache_prime_memory: bool = True
+    # Required in X-Admin-Token for /admin endpoints; empty disables them
+    admin_token: str = ""
+    # Entries from another prompt/provider/model/code version:
+    # "strict" re-extracts, "stale_while_revalidate" serves them while
+    # re-extracting in the background, "any" serves them as-is
+    cache_fingerprint_policy: Literal["strict", "stale_while_revalidate", "any"] = "strict"
+    cache_accepted_fingerprints: str = ""  # comma-separated fingerprints treated as current
+    # How texts are canonicalized for the cache key (see app/canonicalize.py);
+    # "v1" only collapses whitespace
+    cache_normalization_version: Literal["v1", "v2"] = "v2"
+    # Template cache: provider answers reused for texts that differ only in
+    # phones, emails, ZIPs, numbers and labelled names; opt-in, since only a
+    # sample of template hits is re-checked with the provider
+    template_cache_enabled: bool = False
+    template_cache_max_entries: int = 5000
+    template_cache_verify_rate: float = 0.05  # share of template hits re-checked with the provider
+    # Similarity cache: provider answers reused for lightly edited re-sends
+    # within cache_similarity_threshold cosine distance (see app/similarity_cache.py);
+    # opt-in, since a near duplicate can differ in a detail nothing checks
+    similarity_cache_enabled: bool = False
+    similarity_cache_max_entries: int = 10000
+    similarity_cache_dimensions: int = 512
     
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -37,6 +112,17 @@ class Settings(BaseSettings):
     # Performance
     enable_fast_mode: bool = False  # Set to True for millisecond responses (less accurate)
     cache_similarity_threshold: float = 0.1
+    batch_max_items: int = 500
+    batch_max_concurrency: int = 8
+    stream_max_in_flight: int = 16
+
+    # Background jobs (/jobs)
+    jobs_db_path: str = "./cache/jobs.sqlite3"
+    jobs_parallelism: int = 4
+    jobs_input_directory: str = "./data/jobs"
+    # A running job is claimed by one worker for this long and the claim is
+    # renewed while it runs; a job whose claim lapsed is resumed by another
+    jobs_lease_seconds: float = 60.0
     
     class Config:
         env_file = ".env"
@@ -1,19 +1,55 @@
 import os
+import queue
 import sys
-from typing import Optional, List, Dict
+import threading
+import time
+from typing import Optional, List, Dict, Tuple
 import json
 import logging
+from app.cache_store import local_cache
 from app.config import settings
+from app.health import health_prober
 from app.models import ExtractedContact
 
 logger = logging.getLogger(__name__)
 
 
+# text, extraction, embedding
+PendingExtraction = Tuple[str, ExtractedContact, Optional[List[float]]]
+
+
 class ChromaDBManager:
+    """The ChromaDB collection of extractions.
+
+    Each text is one document, whose id is its local cache key, so
+    repeats of a text update it instead of adding another. The metadata
+    only holds fields to filter on; the extraction itself is kept in the
+    local cache under the same key.
+
+    Extractions are added by a background thread in batches of up to
+    ``chroma_write_batch_size``, so requests never wait for the vector
+    store. When ``chroma_write_queue_size`` are already waiting, new ones
+    are dropped, or with ``chroma_write_overflow="spill"`` appended to
+    ``chroma_spill_path`` and added once the queue has drained. What is
+    still queued at shutdown is written by :meth:`close`.
+    """
+
+    write_wait_seconds = 0.5
+
     def __init__(self):
         self.client = None
         self.collection = None
         self.disabled_reason = None
+        self._batch_size = max(1, settings.chroma_write_batch_size)
+        self._written = 0
+        self._dropped = 0
+        self._spilled = 0
+        self._write_errors = 0
+        # Matches whose extraction the local cache no longer holds
+        self._extraction_misses = 0
+        self._reset_writer()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_writer)
 
         if self._should_disable_chroma():
             return
@@ -69,39 +105,177 @@ class ChromaDBManager:
             # Fallback: try to get existing collection
             return self.client.get_collection(settings.chroma_collection_name)
     
+    def _reset_writer(self):
+        # Also run in a forked child: the parent's writer thread and queued
+        # extractions stay with the parent.
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[PendingExtraction]" = queue.Queue(max(1, settings.chroma_write_queue_size))
+        self._writer: Optional[threading.Thread] = None
+        self._stopping = False
+
     def add_extraction(self, text: str, extraction: ExtractedContact, embedding: Optional[List[float]] = None):
-        """Store an extraction in the database"""
+        """Queue an extraction for storage; never blocks. False if it was dropped."""
         if not self.collection:
             return False
 
         try:
-            # Convert extraction to dict for metadata
-            metadata = {
-                "client_name": extraction.client_name or "",
-                "company_name": extraction.company_name or "",
-                "email": extraction.email or "",
-                "has_address": bool(extraction.address),
-                "phone_count": len(extraction.phone_numbers),
-                "extracted_at": extraction.extracted_at.isoformat()
-            }
-            
-            # Store full extraction as JSON in metadata
-            metadata["full_extraction"] = json.dumps(extraction.dict(), default=str)
-            
-            self.collection.add(
-                documents=[text],
-                metadatas=[metadata],
-                ids=[f"extraction_{extraction.extracted_at.timestamp()}"],
-                embeddings=[embedding] if embedding else None
+            self._queue.put_nowait((text, extraction, embedding))
+        except queue.Full:
+            return self._overflow([(text, extraction, embedding)])
+
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._stopping = False
+                self._writer = threading.Thread(target=self._write_loop, name="chroma-write", daemon=True)
+                self._writer.start()
+        return True
+
+    def _overflow(self, items: List[PendingExtraction]) -> bool:
+        """Spill extractions that found the queue full to disk, or drop them."""
+        if settings.chroma_write_overflow == "spill":
+            lines = "".join(
+                json.dumps({
+                    "text": text,
+                    "extraction": extraction.model_dump(mode="json"),
+                    "embedding": embedding,
+                }) + "\n"
+                for text, extraction, embedding in items
+            )
+            try:
+                with self._lock:
+                    directory = os.path.dirname(settings.chroma_spill_path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    with open(settings.chroma_spill_path, "a", encoding="utf-8") as handle:
+                        handle.write(lines)
+                    self._spilled += len(items)
+                return True
+            except OSError as e:
+                logger.warning("Could not spill ChromaDB writes to %s: %s", settings.chroma_spill_path, e)
+        with self._lock:
+            self._dropped += len(items)
+        return False
+
+    def _next_batch(self, timeout: Optional[float]) -> List[PendingExtraction]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _metadata(extraction: ExtractedContact) -> Dict:
+        return {
+            "client_name": extraction.client_name or "",
+            "company_name": extraction.company_name or "",
+            "email": extraction.email or "",
+            "has_address": bool(extraction.address),
+            "phone_count": len(extraction.phone_numbers),
+            "extracted_at": extraction.extracted_at.isoformat()
+        }
+
+    def _write_batch(self, batch: List[PendingExtraction]):
+        """Upsert a batch with one ``collection.upsert`` call."""
+        # ChromaDB rejects a batch that repeats an id; the latest extraction
+        # of a text wins, as with one upsert after another.
+        unique: Dict[str, PendingExtraction] = {}
+        for item in batch:
+            unique[local_cache.cache_key(item[0])] = item
+        embeddings = [embedding for _, _, embedding in unique.values()]
+
+        try:
+            self.collection.upsert(
+                documents=[text for text, _, _ in unique.values()],
+                metadatas=[self._metadata(extraction) for _, extraction, _ in unique.values()],
+                ids=list(unique),
+                embeddings=embeddings if all(embeddings) else None
             )
-            logger.info(f"Stored extraction for text: {text[:50]}...")
-            return True
         except Exception as e:
-            logger.error(f"Error storing extraction: {str(e)}")
-            return False
+            logger.error("Error storing %d extractions: %s", len(batch), e)
+            with self._lock:
+                self._write_errors += len(batch)
+            return
+        logger.info("Stored %d extractions", len(unique))
+        with self._lock:
+            self._written += len(unique)
+
+    def _replay_spill(self):
+        """Add the extractions spilled to disk, once nothing else is queued."""
+        path = settings.chroma_spill_path
+        claimed = f"{path}.{os.getpid()}.replay"
+        try:
+            # Renaming claims the file, so only one worker replays it.
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning("Could not replay spilled ChromaDB writes from %s: %s", path, e)
+            return
+
+        with open(claimed, encoding="utf-8") as handle:
+            lines = []
+            for line in handle:
+                lines.append(line)
+                if len(lines) == self._batch_size:
+                    self._write_spilled(lines)
+                    lines = []
+                if self._stopping:
+                    # Put the rest back for the next run.
+                    lines.extend(handle)
+                    with self._lock, open(path, "a", encoding="utf-8") as spill:
+                        spill.writelines(lines)
+                    lines = []
+                    break
+            if lines:
+                self._write_spilled(lines)
+        os.remove(claimed)
+
+    def _write_spilled(self, lines: List[str]):
+        batch: List[PendingExtraction] = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+                batch.append((record["text"], ExtractedContact(**record["extraction"]), record.get("embedding")))
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Skipping unreadable spilled ChromaDB write")
+        if batch:
+            self._write_batch(batch)
+
+    def _write_loop(self):
+        while not self._stopping:
+            batch = self._next_batch(timeout=self.write_wait_seconds)
+            if batch:
+                self._write_batch(batch)
+            elif os.path.exists(settings.chroma_spill_path):
+                self._replay_spill()
+
+    def close(self, timeout_seconds: float = 5.0):
+        """Write what is still queued, for at most ``timeout_seconds``; the rest is spilled or dropped."""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._stopping = True
+            writer.join(timeout=timeout_seconds)
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            batch = self._next_batch(timeout=0)
+            if not batch:
+                break
+            if self.collection and time.monotonic() < deadline:
+                self._write_batch(batch)
+            else:
+                self._overflow(batch)
     
-    def find_similar(self, text: str, n_results: int = 5) -> List[Dict]:
-        """Find similar previously extracted texts"""
+    def find_similar(self, text: str, n_results: int = 5, fingerprint: Optional[str] = None) -> List[Dict]:
+        """Find similar previously extracted texts; extractions under another ``fingerprint`` are left out
+
+        A match whose extraction is no longer in the local cache is left out
+        too, and counted as ``extraction_misses`` in :meth:`get_stats`.
+        """
         if not self.collection:
             return []
 
@@ -112,20 +286,101 @@ class ChromaDBManager:
             )
             
             similar_extractions = []
+            misses = 0
             for i in range(len(results['ids'][0])):
-                if results['metadatas'][0][i].get('full_extraction'):
-                    extraction_data = json.loads(results['metadatas'][0][i]['full_extraction'])
-                    similar_extractions.append({
-                        'text': results['documents'][0][i],
-                        'extraction': extraction_data,
-                        'distance': results['distances'][0][i] if 'distances' in results else None
-                    })
-            
+                extraction_data = self._stored_extraction(
+                    results['documents'][0][i], results['metadatas'][0][i], fingerprint
+                )
+                if extraction_data is None:
+                    # Evicted from the local cache, cache disabled, or under
+                    # another fingerprint: the caller falls through to the provider.
+                    misses += 1
+                    continue
+                similar_extractions.append({
+                    'text': results['documents'][0][i],
+                    'extraction': extraction_data,
+                    'distance': results['distances'][0][i] if 'distances' in results else None
+                })
+            if misses:
+                with self._lock:
+                    self._extraction_misses += misses
+                logger.info("%d similar texts have no current extraction in the local cache", misses)
+
             return similar_extractions
         except Exception as e:
             logger.error(f"Error finding similar texts: {str(e)}")
             return []
     
+    @staticmethod
+    def _stored_extraction(document: str, metadata: Optional[Dict], fingerprint: Optional[str]) -> Optional[Dict]:
+        """The extraction of a document: from the local cache, or the metadata of documents written before it moved there."""
+        if metadata and metadata.get('full_extraction'):
+            return json.loads(metadata['full_extraction'])
+        # Peeked, so reading Chroma results does not count as cache hits.
+        cached = local_cache.peek(document, fingerprint)
+        return cached.model_dump(mode="json") if cached else None
+
+    def compact(self, page_size: int = 1000, fingerprint: Optional[str] = None) -> Dict:
+        """Collapse the documents of each text into one, stored under its cache key.
+
+        Older documents used a timestamp id per insert, so repeats of a text
+        piled up. The newest copy of each text is kept with its embedding
+        (nothing is re-embedded), and its ``full_extraction`` metadata is
+        dropped when the local cache holds a current extraction for
+        ``fingerprint``; the check records no cache hits. Returns counts of
+        documents before and after and of those removed.
+        """
+        page_size = max(1, page_size)
+        # cache key -> [(id, extracted_at, has full_extraction)]
+        groups: Dict[str, List[Tuple[str, str, bool]]] = {}
+        total = 0
+        while True:
+            page = self.collection.get(include=["documents", "metadatas"], limit=page_size, offset=total)
+            if not page["ids"]:
+                break
+            for doc_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                metadata = metadata or {}
+                groups.setdefault(local_cache.cache_key(document or ""), []).append(
+                    (doc_id, str(metadata.get("extracted_at", "")), "full_extraction" in metadata)
+                )
+            total += len(page["ids"])
+
+        pending = [
+            (key, copies) for key, copies in groups.items()
+            if len(copies) > 1 or copies[0][0] != key or copies[0][2]
+        ]
+        removed = 0
+        for start in range(0, len(pending), page_size):
+            chunk = pending[start:start + page_size]
+            newest = {key: max(copies, key=lambda copy: copy[1])[0] for key, copies in chunk}
+            found = self.collection.get(
+                ids=list(newest.values()), include=["documents", "metadatas", "embeddings"]
+            )
+            kept = {
+                doc_id: (document, metadata or {}, embedding)
+                for doc_id, document, metadata, embedding in zip(
+                    found["ids"], found["documents"], found["metadatas"], found["embeddings"]
+                )
+            }
+            ids, documents, metadatas, embeddings = [], [], [], []
+            for key, doc_id in newest.items():
+                document, metadata, embedding = kept[doc_id]
+                if "full_extraction" in metadata and local_cache.peek(document, fingerprint) is not None:
+                    metadata = {name: value for name, value in metadata.items() if name != "full_extraction"}
+                ids.append(key)
+                documents.append(document)
+                metadatas.append(metadata)
+                embeddings.append(embedding)
+            self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+            stale = [doc_id for key, copies in chunk for doc_id, _, _ in copies if doc_id != key]
+            if stale:
+                self.collection.delete(ids=stale)
+                removed += len(stale)
+            logger.info("Compacted %d of %d texts", min(start + page_size, len(pending)), len(pending))
+
+        return {"documents": total, "unique": len(groups), "removed": removed}
+
     def get_stats(self) -> Dict:
         """Get collection statistics"""
         if not self.collection:
@@ -138,9 +393,20 @@ class ChromaDBManager:
 
         try:
             count = self.collection.count()
+            with self._lock:
+                writes = {
+                    "queued": self._queue.qsize(),
+                    "written": self._written,
+                    "dropped": self._dropped,
+                    "spilled": self._spilled,
+                    "errors": self._write_errors,
+                }
+                extraction_misses = self._extraction_misses
             return {
                 "total_extractions": count,
-                "collection_name": settings.chroma_collection_name
+                "collection_name": settings.chroma_collection_name,
+                "writes": writes,
+                "extraction_misses": extraction_misses,
             }
         except Exception as e:
             logger.error(f"Error getting stats: {str(e)}")
@@ -159,4 +425,5 @@ class ChromaDBManager:
 
 
 # Singleton instance
-chroma_manager = ChromaDBManager()
\ No newline at end of file
+chroma_manager = ChromaDBManager()
+health_prober.register("chromadb", chroma_manager.health_check)
\ No newline at end of file
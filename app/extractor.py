@@ -1,96 +1,379 @@
+import asyncio
+import contextvars
+import hashlib
 import json
 import logging
 import re
+import time
 from datetime import date, timedelta
 from typing import Dict, List, Optional, Tuple
 
 import ollama
 import phonenumbers
-from openai import OpenAI
+from openai import AsyncOpenAI
 
+from app.admission import AdmissionRejected, ProviderLimiter
 from app.cache_store import local_cache
 from app.config import settings
 from app.database import chroma_manager
 from app.fast_extractor import FastExtractor
+from app.health import health_prober
+from app.metrics import (
+    CACHE_LOOKUPS,
+    FAST_PATH_SERVED,
+    PARSE_FAILURES,
+    PROVIDER_ERRORS,
+    PROVIDER_RETRIES,
+    SIMILARITY_LOOKUPS,
+    TEMPLATE_LOOKUPS,
+    TEMPLATE_VERIFICATIONS,
+    count_provider_attempt,
+    mark_served_by,
+    time_stage,
+)
 from app.models import Address, ExtractedContact, PhoneNumber
 from app.prompts import EXTRACTION_PROMPT
+from app.similarity_cache import similarity_cache
+from app.template_cache import template_cache
 
 logger = logging.getLogger(__name__)
 
+# Part of the cache fingerprint. Bump it whenever parsing, merging or
+# post-processing changes what gets stored for the same provider output.
+EXTRACTION_CODE_VERSION = "1"
+
 
 class ContactExtractor:
     def __init__(self):
         self.provider = settings.llm_provider
         self.model = settings.openai_model if self.provider == "openai" else settings.ollama_model
-        self.openai_client = None
         self.ollama_client = None
+        self.async_openai_client = None
+        self.async_ollama_client = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._coalesced_requests = 0
+        self._revalidating: set = set()
+        self._background_tasks: set = set()
+        self._revalidations = 0
+        self.limiter = ProviderLimiter(
+            name=self.provider_name(),
+            max_concurrency=(
+                settings.openai_max_concurrency if self.provider == "openai" else settings.ollama_num_parallel
+            ),
+            max_queue=settings.provider_max_queue,
+            max_wait_seconds=settings.provider_max_queue_wait_seconds,
+            initial_service_seconds=settings.provider_initial_latency_seconds,
+        )
+        health_prober.register("provider", self.health_check_async)
 
         if self.provider == "openai" and settings.openai_api_key:
-            self.openai_client = OpenAI(
+            self.async_openai_client = AsyncOpenAI(
                 api_key=settings.openai_api_key,
                 timeout=settings.openai_timeout_seconds,
             )
         else:
             self.ollama_client = ollama.Client(host=settings.ollama_base_url)
+            self.async_ollama_client = ollama.AsyncClient(host=settings.ollama_base_url)
+        self.fingerprint = self._compute_fingerprint()
     
-    def extract(self, text: str, use_cache: bool = True) -> Tuple[Optional[ExtractedContact], bool]:
-        """Extract contact information from text"""
+    async def extract_async(self, text: str, use_cache: bool = True) -> Tuple[Optional[ExtractedContact], bool]:
+        """Extract contact information without blocking the event loop.
+
+        The provider is awaited through the async clients, behind the
+        admission limiter, and SQLite / ChromaDB work runs in worker threads.
+        """
         cache_hit = False
         fast_result = None
 
         # Try fast extraction first.
-        if settings.enable_fast_mode and FastExtractor.can_extract_fast(text):
-            logger.info("Using fast regex extraction")
-            fast_result = FastExtractor.extract_fast(text)
-            if fast_result and self._can_serve(fast_result):
-                if use_cache:
-                    self._store_cached_result(text, fast_result)
-                return fast_result, cache_hit
+        fast_result, fast_servable = self._try_fast_path(text)
+        if fast_servable:
+            if use_cache:
+                await asyncio.to_thread(self._store_cached_result, text, fast_result)
+            return fast_result, cache_hit
 
-        # Then try local memory / exact cache.
+        # Then try local memory / exact cache; only SQLite needs a worker thread.
         if use_cache:
-            cached = local_cache.get(text)
-            if cached:
+            tier, cached_contact = self._lookup_cache(text, fast_result, True, memory_only=True)
+            if tier is None:
+                tier, cached_contact = await asyncio.to_thread(self._lookup_cache, text, fast_result, True)
+            cache_hit = tier is not None
+            if cache_hit:
                 logger.info("Local cache hit - returning previous extraction")
-                cache_hit = True
-                return ExtractedContact(**cached), cache_hit
+                if tier == "stale":
+                    self._schedule_revalidation(text, fast_result)
+                return cached_contact, cache_hit
+
+        contact = await self._extract_uncached_async(text, fast_result, use_cache)
+        return contact, cache_hit
+
+    async def extract_batch_async(
+        self,
+        texts: List[str],
+        use_cache: bool = True,
+    ) -> List[Tuple[Optional[ExtractedContact], bool, float]]:
+        """Extract a batch of texts, sharing work between identical inputs.
+
+        Texts are deduplicated on the local cache key, fast-path and cache
+        hits are resolved in a single pass, and the remaining misses go to
+        the provider with at most ``settings.batch_max_concurrency`` calls in
+        flight. Returns one ``(contact, cache_hit, seconds)`` tuple per input,
+        in input order, where ``seconds`` is the time until that item resolved.
+        """
+        started = time.perf_counter()
+        keys = [local_cache.cache_key(text) for text in texts]
+        unique: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+
+        resolved: Dict[str, Tuple[Optional[ExtractedContact], bool, float]] = {}
+        fast_results: Dict[str, Optional[ExtractedContact]] = {}
+        fast_served: List[Tuple[str, ExtractedContact]] = []
+
+        if settings.enable_fast_mode:
+            for key, text in unique.items():
+                fast_result, fast_servable = self._try_fast_path(text)
+                fast_results[key] = fast_result
+                if fast_servable:
+                    resolved[key] = (fast_result, False, time.perf_counter() - started)
+                    fast_served.append((text, fast_result))
+            if fast_served:
+                logger.info("Fast regex extraction served %d batch items", len(fast_served))
+                if use_cache:
+                    await asyncio.to_thread(self._store_cached_results, fast_served)
+
+        pending = {key: text for key, text in unique.items() if key not in resolved}
+        if use_cache and pending:
+            with self._stage("cache_lookup"):
+                cached = await asyncio.to_thread(
+                    local_cache.get_many, list(pending.values()), self.fingerprint
+                )
+            negative = sum(1 for _, tier in cached.values() if tier == "negative")
+            stale = sum(1 for _, tier in cached.values() if tier == "stale")
+            CACHE_LOOKUPS.inc("hit", self.provider, self.model, amount=len(cached) - negative - stale)
+            CACHE_LOOKUPS.inc("negative_hit", self.provider, self.model, amount=negative)
+            CACHE_LOOKUPS.inc("stale_hit", self.provider, self.model, amount=stale)
+            CACHE_LOOKUPS.inc("miss", self.provider, self.model, amount=len(pending) - len(cached))
+            elapsed = time.perf_counter() - started
+            for key, (cached_data, tier) in cached.items():
+                contact = self._cached_contact(cached_data, tier, fast_results.get(key))
+                resolved[key] = (contact, True, elapsed)
+                if tier == "stale":
+                    self._schedule_revalidation(pending[key], fast_results.get(key))
+                pending.pop(key, None)
+            if cached:
+                logger.info("Local cache served %d batch items", len(cached))
+
+        semaphore = asyncio.Semaphore(max(1, settings.batch_max_concurrency))
+
+        async def extract_miss(key: str, text: str):
+            async with semaphore:
+                contact = await self._extract_uncached_async(text, fast_results.get(key), use_cache)
+            resolved[key] = (contact, False, time.perf_counter() - started)
+
+        await asyncio.gather(*(extract_miss(key, text) for key, text in pending.items()))
+        results = []
+        for key, text in zip(keys, texts):
+            contact, cache_hit, seconds = resolved[key]
+            # Inputs sharing a cache key may still differ as raw text, and
+            # each gets its own copy.
+            if contact is not None:
+                contact = local_cache.detached(contact, text)
+            results.append((contact, cache_hit, seconds))
+        return results
+
+    async def _extract_uncached_async(
+        self,
+        text: str,
+        fast_result: Optional[ExtractedContact],
+        use_cache: bool,
+    ) -> Optional[ExtractedContact]:
+        """Run the provider half of the pipeline for a text that missed every cache.
+
+        Concurrent calls for the same cache key share one provider call: the
+        first caller starts it as a task and later callers await that task.
+        The task is shielded so a disconnecting caller does not cancel it for
+        the others. Each caller gets its own copy of the result, carrying its
+        own text as raw_text.
+        """
+        cache_key = local_cache.cache_key(text)
+        task = self._in_flight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._extract_with_llm_async(text, fast_result, use_cache))
+            self._in_flight[cache_key] = task
+            task.add_done_callback(lambda done: self._forget_in_flight(cache_key, done))
+        else:
+            self._coalesced_requests += 1
+            mark_served_by("coalesced")
+            logger.info("Coalescing with in-flight extraction of identical text")
+        result = await asyncio.shield(task)
+        return local_cache.detached(result, text) if result is not None else None
+
+    def _forget_in_flight(self, cache_key: str, task: asyncio.Task):
+        if self._in_flight.get(cache_key) is task:
+            del self._in_flight[cache_key]
+
+    def _schedule_revalidation(self, text: str, fast_result: Optional[ExtractedContact]):
+        """Re-extract a text that was served from a stale cache entry, in the background.
+
+        The task runs in a fresh context so its stages and served-by do not
+        end up on the trace of the request that triggered it.
+        """
+        cache_key = local_cache.cache_key(text)
+        if cache_key in self._revalidating:
+            return
+        self._revalidating.add(cache_key)
+        task = asyncio.create_task(
+            self._revalidate(cache_key, text, fast_result),
+            context=contextvars.Context(),
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _schedule_template_verification(
+        self,
+        text: str,
+        filled: ExtractedContact,
+        template_key: str,
+        fast_result: Optional[ExtractedContact],
+    ):
+        task = asyncio.create_task(
+            self._verify_template(text, filled, template_key, fast_result),
+            context=contextvars.Context(),
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _verify_template(
+        self,
+        text: str,
+        filled: ExtractedContact,
+        template_key: str,
+        fast_result: Optional[ExtractedContact],
+    ):
+        """Extract a template-served text with the provider and compare the results."""
+        try:
+            extraction_json = await self._extract_with_provider_async(text)
+            if extraction_json is None:
+                return
+            contact = self._finalize_extraction(extraction_json, text, fast_result) if extraction_json else None
+        except AdmissionRejected:
+            logger.info("Provider queue full; template verification skipped")
+            return
+        except Exception:
+            logger.warning("Template verification failed", exc_info=True)
+            return
+
+        matched = await asyncio.to_thread(
+            template_cache.record_verification,
+            template_key,
+            self.fingerprint,
+            filled.model_dump(mode="json"),
+            contact.model_dump(mode="json") if contact else None,
+        )
+        TEMPLATE_VERIFICATIONS.inc("match" if matched else "mismatch", self.provider, self.model)
+        if not matched and self._can_serve(contact):
+            # The filled answer went into the exact cache; replace it.
+            await asyncio.to_thread(self._store_cached_result, text, contact)
+
+    async def _revalidate(self, cache_key: str, text: str, fast_result: Optional[ExtractedContact]):
+        try:
+            await self._extract_uncached_async(text, fast_result, True)
+            self._revalidations += 1
+        except AdmissionRejected:
+            logger.info("Provider queue full; stale cache entry left for a later request")
+        except Exception:
+            logger.warning("Revalidating stale cache entry failed", exc_info=True)
+        finally:
+            self._revalidating.discard(cache_key)
+
+    async def _extract_with_llm_async(
+        self,
+        text: str,
+        fast_result: Optional[ExtractedContact],
+        use_cache: bool,
+    ) -> Optional[ExtractedContact]:
+        """Reuse a near duplicate's extraction, fill a learned template, or call the provider, then parse, merge, post-process and cache the result."""
+        if use_cache:
+            similar_contact = await asyncio.to_thread(self._lookup_similar, text)
+            if similar_contact is not None:
+                await asyncio.to_thread(self._store_cached_result, text, similar_contact)
+                return similar_contact
+
+            template_contact, template_key = await asyncio.to_thread(self._lookup_template, text)
+            if template_contact is not None:
+                await asyncio.to_thread(self._store_cached_result, text, template_contact)
+                if template_cache.should_verify():
+                    self._schedule_template_verification(text, template_contact, template_key, fast_result)
+                return template_contact
 
         if not settings.llm_enabled:
             logger.warning("LLM fallback is disabled")
-            return fast_result, cache_hit
+            return fast_result
 
         # Only then call the configured provider.
-        if not self.health_check():
+        if not await self.is_available_async():
             logger.error("%s is not accessible", self.provider_name())
-            return fast_result, cache_hit
+            return fast_result
 
+        mark_served_by("provider")
         try:
-            extraction_json = self._extract_with_provider(text)
+            extraction_json = await self._extract_with_provider_async(text)
             if not extraction_json:
-                return fast_result, cache_hit
-
-            contact = self._parse_extraction(extraction_json, text)
-            contact = self._merge_contacts(fast_result, contact)
-            contact = self._post_process_contact(contact, text)
-
-            if use_cache and contact and self._can_serve(contact):
-                self._store_cached_result(text, contact)
-
-            return contact, cache_hit
+                # None means the provider call failed; only an answer of
+                # "nothing here" is worth remembering.
+                if use_cache and extraction_json is not None:
+                    await asyncio.to_thread(self._store_negative_result, text, None)
+                return fast_result
+
+            contact = self._finalize_extraction(extraction_json, text, fast_result)
+
+            if use_cache:
+                if self._can_serve(contact):
+                    await asyncio.to_thread(self._store_provider_result, text, contact)
+                else:
+                    await asyncio.to_thread(self._store_negative_result, text, contact)
+
+            return contact
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Extraction error: {str(e)}")
             logger.error(f"Full traceback: ", exc_info=True)
-            return None, cache_hit
-    
+            return None
+
+    def get_stats(self) -> Dict:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "in_flight_provider_calls": len(self._in_flight),
+            "coalesced_requests": self._coalesced_requests,
+            "cache_fingerprint": self.fingerprint,
+            "revalidations": self._revalidations,
+            "revalidations_in_flight": len(self._revalidating),
+            "template_cache": template_cache.get_stats(),
+            "similarity_cache": similarity_cache.get_stats(),
+            "admission": self.limiter.get_stats(),
+        }
+
     def provider_name(self) -> str:
         return "OpenAI" if self.provider == "openai" else "Ollama"
 
-    def provider_status(self) -> str:
+    def provider_status(self, healthy: Optional[bool] = None) -> str:
         if not settings.llm_enabled:
             return "disabled"
         if self.provider == "openai":
             return "healthy" if bool(settings.openai_api_key) else "unhealthy"
-        return "healthy" if self.health_check() else "unhealthy"
+        if healthy is None:
+            healthy = self.health_check()
+        return "healthy" if healthy else "unhealthy"
+
+    async def is_available_async(self) -> bool:
+        """Provider health as last seen by the background prober, probing once if it has not run yet."""
+        healthy = health_prober.is_healthy("provider")
+        if healthy is None:
+            healthy = await health_prober.probe("provider")
+        return healthy
 
     def unavailable_error_message(self) -> str:
         if not settings.llm_enabled:
@@ -99,91 +382,241 @@ class ContactExtractor:
             return "OpenAI is not configured. Please set OPENAI_API_KEY."
         return "Ollama is not running. Please start Ollama with: ollama serve"
 
-    def _store_cached_result(self, text: str, extraction: ExtractedContact):
-        local_cache.set(text, extraction, self.provider, self.model)
-        chroma_manager.add_extraction(text, extraction)
+    def _stage(self, stage: str):
+        return time_stage(stage, self.provider, self.model)
 
-    def _extract_with_provider(self, text: str) -> Optional[Dict]:
-        if self.provider == "openai":
-            return self._extract_with_openai(text)
-        return self._extract_with_ollama(text)
+    def _try_fast_path(self, text: str) -> Tuple[Optional[ExtractedContact], bool]:
+        """Run the regex fast path; return the result and whether it can be served alone."""
+        if not settings.enable_fast_mode:
+            return None, False
+
+        with self._stage("fast_path_screen"):
+            eligible = FastExtractor.can_extract_fast(text)
+        if not eligible:
+            return None, False
+
+        logger.info("Using fast regex extraction")
+        with self._stage("fast_extract"):
+            fast_result = FastExtractor.extract_fast(text)
+        servable = bool(fast_result and self._can_serve(fast_result))
+        if servable:
+            FAST_PATH_SERVED.inc(self.provider, self.model)
+            mark_served_by("fast")
+        return fast_result, servable
+
+    def _lookup_cache(
+        self,
+        text: str,
+        fast_result: Optional[ExtractedContact],
+        serve_stale: bool = False,
+        memory_only: bool = False,
+    ) -> Tuple[Optional[str], Optional[ExtractedContact]]:
+        """Look the text up in the local cache; returns the tier that hit and what to serve.
+
+        Stale entries (another fingerprint, under stale-while-revalidate)
+        count as misses unless the caller can refresh them in the background.
+        A ``memory_only`` lookup is non-blocking and records nothing on a miss.
+        """
+        with self._stage("memory_lookup" if memory_only else "cache_lookup"):
+            cached, tier = local_cache.lookup(text, self.fingerprint, memory_only)
+        if tier is None and memory_only:
+            return None, None
+        if tier is None or (tier == "stale" and not serve_stale):
+            CACHE_LOOKUPS.inc("miss", self.provider, self.model)
+            return None, None
+        label = {"negative": "negative_hit", "stale": "stale_hit"}.get(tier, "hit")
+        CACHE_LOOKUPS.inc(label, self.provider, self.model)
+        mark_served_by(f"{tier}_cache")
+        return tier, self._cached_contact(cached, tier, fast_result)
+
+    def _lookup_similar(self, text: str) -> Optional[ExtractedContact]:
+        """The extraction of a verified near duplicate of the text, if one was seen."""
+        if not similarity_cache.enabled:
+            return None
+        with self._stage("similarity_lookup"):
+            contact, result = similarity_cache.lookup(text, self.fingerprint)
+        if contact is not None and not self._can_serve(contact):
+            contact, result = None, "rejected"
+        SIMILARITY_LOOKUPS.inc(result, self.provider, self.model)
+        if contact is None:
+            return None
+        mark_served_by("similarity_cache")
+        logger.info("Similarity cache hit - reusing the extraction of a near duplicate")
+        return contact
+
+    def _lookup_template(self, text: str) -> Tuple[Optional[ExtractedContact], Optional[str]]:
+        """Fill a learned template for the text; returns the contact and template key."""
+        if not template_cache.enabled:
+            return None, None
+        with self._stage("template_lookup"):
+            filled, template_key = template_cache.lookup(text, self.fingerprint)
+            contact = None
+            if filled is not None:
+                try:
+                    contact = ExtractedContact(**filled, raw_text=text)
+                except ValueError as e:
+                    logger.warning("Filled template is not a valid extraction: %s", e)
+        if contact is None or not self._can_serve(contact):
+            TEMPLATE_LOOKUPS.inc("miss", self.provider, self.model)
+            return None, None
+        TEMPLATE_LOOKUPS.inc("hit", self.provider, self.model)
+        mark_served_by("template_cache")
+        logger.info("Template cache hit - filled a learned extraction")
+        return contact, template_key
+
+    def _cached_contact(
+        self,
+        cached: Optional[ExtractedContact],
+        tier: str,
+        fast_result: Optional[ExtractedContact],
+    ) -> Optional[ExtractedContact]:
+        # A negative entry without an extraction means the provider found
+        # nothing at all, which is answered with whatever the regex found.
+        if tier == "negative" and cached is None:
+            return fast_result
+        return cached
 
-    def _extract_with_openai(self, text: str) -> Optional[Dict]:
+    def _finalize_extraction(
+        self,
+        extraction_json: Dict,
+        text: str,
+        fast_result: Optional[ExtractedContact],
+    ) -> Optional[ExtractedContact]:
+        """Parse the provider JSON, merge in regex findings and post-process."""
+        with self._stage("parse_extraction"):
+            contact = self._parse_extraction(extraction_json, text)
+        with self._stage("merge"):
+            contact = self._merge_contacts(fast_result, contact)
+        with self._stage("post_process"):
+            contact = self._post_process_contact(contact, text)
+        return contact
+
+    def _store_cached_result(self, text: str, extraction: ExtractedContact):
+        with self._stage("cache_write"):
+            local_cache.set(text, extraction, self.provider, self.model, self.fingerprint)
+        with self._stage("chroma_enqueue"):
+            chroma_manager.add_extraction(text, extraction)
+
+    def _store_provider_result(self, text: str, extraction: ExtractedContact):
+        self._store_cached_result(text, extraction)
+        if template_cache.enabled:
+            with self._stage("template_learn"):
+                template_cache.learn(text, extraction, self.fingerprint)
+        if similarity_cache.enabled:
+            with self._stage("similarity_learn"):
+                similarity_cache.learn(text, extraction, self.fingerprint)
+
+    def _store_negative_result(self, text: str, extraction: Optional[ExtractedContact]):
+        with self._stage("cache_write"):
+            local_cache.set_negative(text, extraction, self.provider, self.model, self.fingerprint)
+
+    def _store_cached_results(self, items: List[Tuple[str, ExtractedContact]]):
+        for text, extraction in items:
+            self._store_cached_result(text, extraction)
+
+    async def _extract_with_provider_async(self, text: str) -> Optional[Dict]:
+        with self._stage("provider_queue"):
+            admitted_at = await self.limiter.acquire()
+        try:
+            if self.provider == "openai":
+                return await self._extract_with_openai_async(text)
+            return await self._extract_with_ollama_async(text)
+        finally:
+            self.limiter.release(admitted_at)
+
+    def _openai_request(self, text: str) -> Dict:
+        """Build the OpenAI chat completion arguments; also hashed into the cache fingerprint."""
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": (
+                        "Extract contact information from the user text. "
+                        "Return a single valid JSON object only. "
+                        "Do not return markdown, backticks, code, comments, or explanations."
+                    ),
+                },
+                {"role": "user", "content": self._build_prompt(text)},
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.0,
+            "max_tokens": 256,
+        }
+
+    def _ollama_request(self, text: str) -> Dict:
+        """Build the Ollama chat arguments; also hashed into the cache fingerprint."""
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    'role': 'system',
+                    'content': (
+                        'Extract contact information from the user text. '
+                        'Return a single valid JSON object only. '
+                        'Do not return markdown, backticks, Python code, '
+                        'comments, or explanations.'
+                    )
+                },
+                {
+                    'role': 'user',
+                    'content': self._build_prompt(text)
+                }
+            ],
+            "format": 'json',
+            "options": {
+                'temperature': 0.0,
+                'top_p': 0.1,
+                'num_predict': 256,
+                'num_ctx': 1024,
+                'num_thread': 4,
+                'repeat_penalty': 1.0,
+                'seed': 42
+            },
+        }
+
+    async def _extract_with_openai_async(self, text: str) -> Optional[Dict]:
         """Use OpenAI to extract information with retry logic."""
-        if not self.openai_client:
+        if not self.async_openai_client:
             logger.error("OpenAI client is not configured")
             return None
 
         max_retries = 3
         for attempt in range(max_retries):
+            count_provider_attempt()
+            if attempt:
+                PROVIDER_RETRIES.inc(self.provider, self.model)
             try:
-                prompt = self._build_prompt(text)
-                response = self.openai_client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "Extract contact information from the user text. "
-                                "Return a single valid JSON object only. "
-                                "Do not return markdown, backticks, code, comments, or explanations."
-                            ),
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.0,
-                    max_tokens=256,
-                )
+                with self._stage("provider_call"):
+                    response = await self.async_openai_client.chat.completions.create(
+                        **self._openai_request(text)
+                    )
                 response_text = (response.choices[0].message.content or "").strip()
                 logger.info(f"OpenAI response (attempt {attempt + 1}): {response_text[:500]}...")
                 result = self._parse_json_response(response_text)
                 if result is not None:
                     return result
             except Exception as e:
+                PROVIDER_ERRORS.inc(self.provider, self.model)
                 logger.error(f"OpenAI extraction error on attempt {attempt + 1}: {str(e)}")
                 if attempt == max_retries - 1:
                     logger.error(f"Failed after {max_retries} attempts")
+                    health_prober.report_failure("provider")
                     return None
         return None
 
-    def _extract_with_ollama(self, text: str) -> Optional[Dict]:
+    async def _extract_with_ollama_async(self, text: str) -> Optional[Dict]:
         """Use Ollama to extract information with retry logic."""
         max_retries = 3
 
         for attempt in range(max_retries):
+            count_provider_attempt()
+            if attempt:
+                PROVIDER_RETRIES.inc(self.provider, self.model)
             try:
-                prompt = self._build_prompt(text)
-
-                response = self.ollama_client.chat(
-                    model=self.model,
-                    messages=[
-                        {
-                            'role': 'system',
-                            'content': (
-                                'Extract contact information from the user text. '
-                                'Return a single valid JSON object only. '
-                                'Do not return markdown, backticks, Python code, '
-                                'comments, or explanations.'
-                            )
-                        },
-                        {
-                            'role': 'user',
-                            'content': prompt
-                        }
-                    ],
-                    format='json',
-                    options={
-                        'temperature': 0.0,
-                        'top_p': 0.1,
-                        'num_predict': 256,
-                        'num_ctx': 1024,
-                        'num_thread': 4,
-                        'repeat_penalty': 1.0,
-                        'seed': 42
-                    }
-                )
-            
+                with self._stage("provider_call"):
+                    response = await self.async_ollama_client.chat(**self._ollama_request(text))
+
                 response_text = response['message']['content'].strip()
                 logger.info(f"Ollama response (attempt {attempt + 1}): {response_text[:500]}...")
                 result = self._parse_json_response(response_text)
@@ -193,14 +626,34 @@ class ContactExtractor:
                 logger.error(f"Failed to parse LLM response as JSON: {e}")
                 return None
             except Exception as e:
+                PROVIDER_ERRORS.inc(self.provider, self.model)
                 logger.error(f"LLM extraction error on attempt {attempt + 1}: {str(e)}")
                 if attempt == max_retries - 1:
                     logger.error(f"Failed after {max_retries} attempts")
+                    health_prober.report_failure("provider")
                     return None
                 continue
-        
+
         return None
 
+    def _compute_fingerprint(self) -> str:
+        """Identify what produces this extractor's results, for cache invalidation.
+
+        Covers the provider, the full request (model, system prompt, sampling
+        options) with the unformatted user prompt, since the formatted one
+        carries today's date, and EXTRACTION_CODE_VERSION.
+        """
+        if self.provider == "openai":
+            request = self._openai_request("")
+        else:
+            request = self._ollama_request("")
+        request["messages"][-1]["content"] = EXTRACTION_PROMPT
+        source = json.dumps(
+            {"provider": self.provider, "code_version": EXTRACTION_CODE_VERSION, "request": request},
+            sort_keys=True,
+        )
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
     def _build_prompt(self, text: str) -> str:
         """Build extraction prompt with current date context."""
         return EXTRACTION_PROMPT.format(
@@ -209,6 +662,13 @@ class ContactExtractor:
         )
 
     def _parse_json_response(self, response_text: str) -> Optional[Dict]:
+        with self._stage("json_parse"):
+            result = self._decode_json_response(response_text)
+        if result is None:
+            PARSE_FAILURES.inc(self.provider, self.model)
+        return result
+
+    def _decode_json_response(self, response_text: str) -> Optional[Dict]:
         json_str = response_text.strip()
 
         if not json_str.startswith('{'):
@@ -503,6 +963,20 @@ class ContactExtractor:
         except Exception:
             return False
 
+    async def health_check_async(self) -> bool:
+        """Async counterpart of :meth:`health_check`."""
+        if not settings.llm_enabled:
+            return False
+
+        if self.provider == "openai":
+            return bool(settings.openai_api_key)
+
+        try:
+            await self.async_ollama_client.list()
+            return True
+        except Exception:
+            return False
+
 
 # Singleton instance
 extractor = ContactExtractor()
\ No newline at end of file
@@ -0,0 +1,136 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+HealthCheck = Callable[[], Union[bool, Awaitable[bool]]]
+
+
+class HealthProber:
+    """Refreshes dependency health in the background so request paths only read state.
+
+    Healthy checks are re-run every ``interval_seconds``. A failing check is
+    retried after ``failure_interval_seconds``, doubling up to the normal
+    interval while it stays down, so a dead provider is noticed quickly
+    without being hammered. Request paths can call :meth:`report_failure`
+    to ask for an early re-probe.
+    """
+
+    def __init__(self, interval_seconds: float, failure_interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.failure_interval_seconds = min(failure_interval_seconds, interval_seconds)
+        self._checks: Dict[str, HealthCheck] = {}
+        self._healthy: Dict[str, bool] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._next_probe_at: Dict[str, float] = {}
+        self._consecutive_failures: Dict[str, int] = {}
+        self._probes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def register(self, name: str, check: HealthCheck):
+        """Register a check; sync checks run in a worker thread."""
+        self._checks[name] = check
+
+    def is_healthy(self, name: str) -> Optional[bool]:
+        """Last known state of a check, or None if it has never been probed."""
+        return self._healthy.get(name)
+
+    async def probe(self, name: str) -> bool:
+        check = self._checks[name]
+        try:
+            if inspect.iscoroutinefunction(check):
+                healthy = bool(await check())
+            else:
+                healthy = bool(await asyncio.to_thread(check))
+        except Exception as e:
+            logger.warning("Health check %s raised: %s", name, e)
+            healthy = False
+
+        previous = self._healthy.get(name)
+        if previous is not None and previous != healthy:
+            logger.warning("%s is now %s", name, "healthy" if healthy else "unhealthy")
+        self._healthy[name] = healthy
+        self._checked_at[name] = time.monotonic()
+        self._probes += 1
+
+        if healthy:
+            self._consecutive_failures[name] = 0
+            delay = self.interval_seconds
+        else:
+            failures = self._consecutive_failures.get(name, 0) + 1
+            self._consecutive_failures[name] = failures
+            delay = min(self.interval_seconds, self.failure_interval_seconds * 2 ** (failures - 1))
+        self._next_probe_at[name] = time.monotonic() + delay
+        return healthy
+
+    async def probe_all(self):
+        await asyncio.gather(*(self.probe(name) for name in self._checks))
+
+    def report_failure(self, name: str):
+        """Ask for an early re-probe after a request saw the dependency fail.
+
+        Re-probes are still spaced by ``failure_interval_seconds``, so a burst
+        of failing requests triggers at most one extra probe.
+        """
+        if name not in self._checks:
+            return
+        earliest = self._checked_at.get(name, 0.0) + self.failure_interval_seconds
+        self._next_probe_at[name] = min(self._next_probe_at.get(name, earliest), earliest)
+        if self._wake:
+            self._wake.set()
+
+    def start(self):
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            due = [name for name in self._checks if self._next_probe_at.get(name, 0.0) <= now]
+            if due:
+                await asyncio.gather(*(self.probe(name) for name in due))
+
+            next_due = min(self._next_probe_at.values(), default=now + self.interval_seconds)
+            timeout = max(0.0, next_due - time.monotonic())
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "probes": self._probes,
+            "checks": {
+                name: {
+                    "healthy": self._healthy.get(name),
+                    "seconds_since_check": (
+                        now - self._checked_at[name] if name in self._checked_at else None
+                    ),
+                    "consecutive_failures": self._consecutive_failures.get(name, 0),
+                }
+                for name in self._checks
+            },
+        }
+
+
+health_prober = HealthProber(
+    interval_seconds=settings.health_probe_interval_seconds,
+    failure_interval_seconds=settings.health_probe_failure_interval_seconds,
+)
@@ -0,0 +1,513 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.admission import AdmissionRejected
+from app.config import settings
+from app.models import ExtractionResponse
+
+logger = logging.getLogger(__name__)
+
+ProcessFn = Callable[[str, bool], Awaitable[ExtractionResponse]]
+
+
+class JobInputError(ValueError):
+    """Raised when a job's input file cannot be used."""
+
+
+class JobStore:
+    """SQLite persistence for bulk extraction jobs and their per-item results.
+
+    Like the local cache, the file runs in WAL mode and every thread lazily
+    opens its own connection in the process that uses it, so nothing is
+    touched on disk until the store is first used.
+
+    Several workers may share the file. A runner takes a job by claiming a
+    lease on it (:meth:`claim_next_job`) in a single conditional UPDATE, so
+    each job is run by one worker at a time. Leases are renewed while the
+    job runs; a job whose lease ran out, e.g. because its worker died, is
+    claimed again by the next runner looking for work.
+    """
+
+    busy_timeout_seconds = 5.0
+
+    def __init__(self, db_path: str):
+        self._db_path = db_path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use in the current process."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        self._ensure_schema()
+        connection = self._connect()
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._db_path, timeout=self.busy_timeout_seconds)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _ensure_schema(self):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            db_directory = os.path.dirname(self._db_path)
+            if db_directory:
+                os.makedirs(db_directory, exist_ok=True)
+            connection = self._connect()
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(
+                    """
+                    BEGIN IMMEDIATE;
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        job_id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL,
+                        source TEXT NOT NULL,
+                        use_cache INTEGER NOT NULL,
+                        total_items INTEGER NOT NULL,
+                        created_at TEXT NOT NULL,
+                        started_at TEXT,
+                        finished_at TEXT,
+                        owner TEXT,
+                        lease_expires_at TEXT
+                    );
+                    CREATE TABLE IF NOT EXISTS job_items (
+                        job_id TEXT NOT NULL,
+                        item_index INTEGER NOT NULL,
+                        text TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        result_json TEXT,
+                        completed_at TEXT,
+                        PRIMARY KEY (job_id, item_index)
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_job_items_status
+                        ON job_items (job_id, status, item_index);
+                    """
+                )
+                columns = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+                for column in ("owner", "lease_expires_at"):
+                    if column not in columns:
+                        # Files from before leases; their running jobs have
+                        # no lease and are claimed again.
+                        connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+                connection.commit()
+            finally:
+                connection.close()
+            self._schema_ready = True
+
+    def create_job(self, texts: Iterator[str], source: str, use_cache: bool) -> str:
+        """Insert a job and all of its items in one transaction."""
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow().isoformat()
+        connection = self._connection()
+        try:
+            connection.execute(
+                """
+                INSERT INTO jobs (job_id, status, source, use_cache, total_items, created_at)
+                VALUES (?, 'queued', ?, ?, 0, ?)
+                """,
+                (job_id, source, int(use_cache), now),
+            )
+            total = 0
+            chunk: List[Tuple[str, int, str]] = []
+            for text in texts:
+                chunk.append((job_id, total, text))
+                total += 1
+                if len(chunk) >= 1000:
+                    self._insert_items(connection, chunk)
+                    chunk = []
+            if chunk:
+                self._insert_items(connection, chunk)
+            if total == 0:
+                raise JobInputError("Job has no texts to extract")
+            connection.execute(
+                "UPDATE jobs SET total_items = ? WHERE job_id = ?",
+                (total, job_id),
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        return job_id
+
+    @staticmethod
+    def _insert_items(connection: sqlite3.Connection, rows: List[Tuple[str, int, str]]):
+        connection.executemany(
+            "INSERT INTO job_items (job_id, item_index, text) VALUES (?, ?, ?)",
+            rows,
+        )
+
+    def claim_next_job(self, owner: str, lease_seconds: float) -> Optional[Tuple[str, bool]]:
+        """Claim the oldest job that is queued or whose lease ran out; None if there is none.
+
+        Each claim is a conditional UPDATE, so when several runners race for
+        a job only the one whose UPDATE changed the row gets it.
+        """
+        connection = self._connection()
+        now = datetime.utcnow()
+        expires_at = (now + timedelta(seconds=lease_seconds)).isoformat()
+        now = now.isoformat()
+        candidates = connection.execute(
+            """
+            SELECT job_id, use_cache
+            FROM jobs
+            WHERE status = 'queued'
+                OR (status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?))
+            ORDER BY created_at
+            LIMIT 10
+            """,
+            (now,),
+        ).fetchall()
+        for job_id, use_cache in candidates:
+            claimed = connection.execute(
+                """
+                UPDATE jobs
+                SET status = 'running', owner = ?, lease_expires_at = ?,
+                    started_at = COALESCE(started_at, ?)
+                WHERE job_id = ? AND (
+                    status = 'queued'
+                    OR (status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?))
+                )
+                """,
+                (owner, expires_at, now, job_id, now),
+            ).rowcount
+            connection.commit()
+            if claimed == 1:
+                return job_id, bool(use_cache)
+        return None
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend ``owner``'s lease on a running job; False if it no longer holds it."""
+        connection = self._connection()
+        renewed = connection.execute(
+            """
+            UPDATE jobs
+            SET lease_expires_at = ?
+            WHERE job_id = ? AND owner = ? AND status = 'running'
+            """,
+            ((datetime.utcnow() + timedelta(seconds=lease_seconds)).isoformat(), job_id, owner),
+        ).rowcount
+        connection.commit()
+        return renewed == 1
+
+    def release_job(self, job_id: str, owner: str):
+        """Put a job ``owner`` stopped working on back in the queue."""
+        connection = self._connection()
+        connection.execute(
+            """
+            UPDATE jobs
+            SET status = 'queued', owner = NULL, lease_expires_at = NULL
+            WHERE job_id = ? AND owner = ? AND status = 'running'
+            """,
+            (job_id, owner),
+        )
+        connection.commit()
+
+    def pending_items(self, job_id: str, after_index: int, limit: int) -> List[Tuple[int, str]]:
+        return self._connection().execute(
+            """
+            SELECT item_index, text
+            FROM job_items
+            WHERE job_id = ? AND status = 'pending' AND item_index > ?
+            ORDER BY item_index
+            LIMIT ?
+            """,
+            (job_id, after_index, limit),
+        ).fetchall()
+
+    def complete_item(self, job_id: str, item_index: int, response: ExtractionResponse):
+        connection = self._connection()
+        connection.execute(
+            """
+            UPDATE job_items
+            SET status = ?, result_json = ?, completed_at = ?
+            WHERE job_id = ? AND item_index = ? AND status = 'pending'
+            """,
+            (
+                "done" if response.success else "error",
+                response.model_dump_json(),
+                datetime.utcnow().isoformat(),
+                job_id,
+                item_index,
+            ),
+        )
+        connection.commit()
+
+    def finish_job(self, job_id: str, owner: str):
+        connection = self._connection()
+        connection.execute(
+            """
+            UPDATE jobs
+            SET status = 'completed', finished_at = ?, owner = NULL, lease_expires_at = NULL
+            WHERE job_id = ? AND owner = ?
+            """,
+            (datetime.utcnow().isoformat(), job_id, owner),
+        )
+        connection.commit()
+
+    def get_job(self, job_id: str, offset: int = 0, limit: int = 100) -> Optional[Dict]:
+        """Job summary with progress, throughput and a page of finished results."""
+        connection = self._connection()
+        job = connection.execute(
+            """
+            SELECT status, source, total_items, created_at, started_at, finished_at
+            FROM jobs
+            WHERE job_id = ?
+            """,
+            (job_id,),
+        ).fetchone()
+        if not job:
+            return None
+
+        counts = dict(
+            connection.execute(
+                """
+                SELECT status, COUNT(*)
+                FROM job_items
+                WHERE job_id = ?
+                GROUP BY status
+                """,
+                (job_id,),
+            ).fetchall()
+        )
+        last_completed_at = connection.execute(
+            "SELECT MAX(completed_at) FROM job_items WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()[0]
+        rows = connection.execute(
+            """
+            SELECT item_index, status, result_json
+            FROM job_items
+            WHERE job_id = ? AND status != 'pending'
+            ORDER BY item_index
+            LIMIT ? OFFSET ?
+            """,
+            (job_id, limit, offset),
+        ).fetchall()
+
+        status, source, total_items, created_at, started_at, finished_at = job
+        completed = counts.get("done", 0)
+        failed = counts.get("error", 0)
+        processed = completed + failed
+
+        items_per_second = None
+        if started_at and last_completed_at:
+            elapsed = (
+                datetime.fromisoformat(last_completed_at) - datetime.fromisoformat(started_at)
+            ).total_seconds()
+            if elapsed > 0:
+                items_per_second = processed / elapsed
+
+        return {
+            "job_id": job_id,
+            "status": status,
+            "source": source,
+            "total_items": total_items,
+            "completed_items": completed,
+            "failed_items": failed,
+            "pending_items": counts.get("pending", 0),
+            "progress": processed / total_items if total_items else 1.0,
+            "items_per_second": items_per_second,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "results": [
+                {
+                    "index": item_index,
+                    "status": item_status,
+                    "result": json.loads(result_json) if result_json else None,
+                }
+                for item_index, item_status, result_json in rows
+            ],
+        }
+
+
+def iter_jsonl_texts(path: str, text_field: str = "text") -> Iterator[str]:
+    """Yield texts from a JSONL file of strings or objects carrying ``text_field``.
+
+    The path must resolve inside ``settings.jobs_input_directory``.
+    """
+    input_root = Path(settings.jobs_input_directory).resolve()
+    resolved = Path(path)
+    if not resolved.is_absolute():
+        resolved = input_root / resolved
+    resolved = resolved.resolve()
+    if resolved != input_root and input_root not in resolved.parents:
+        raise JobInputError(f"Job input must be inside {input_root}")
+    if not resolved.is_file():
+        raise JobInputError(f"Job input file not found: {path}")
+
+    with open(resolved, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise JobInputError(f"Invalid JSON on line {line_number}: {e}") from e
+            text = item if isinstance(item, str) else (
+                item.get(text_field) if isinstance(item, dict) else None
+            )
+            if not isinstance(text, str) or not text.strip():
+                raise JobInputError(f"Line {line_number} has no '{text_field}' text")
+            yield text
+
+
+class JobRunner:
+    """Drains persisted jobs in the background with bounded parallelism.
+
+    Only items still marked ``pending`` are processed, so a job interrupted
+    by a restart resumes where it stopped without redoing finished items.
+    Jobs are claimed with a lease of ``lease_seconds`` that is renewed while
+    they run (see :class:`JobStore`), and jobs queued by other workers or
+    left behind by a dead one are picked up within a lease period.
+    """
+
+    def __init__(self, store: JobStore, parallelism: int, lease_seconds: float):
+        self.store = store
+        self.parallelism = max(1, parallelism)
+        self.lease_seconds = max(1.0, lease_seconds)
+        self.owner = self._new_owner()
+        self._process: Optional[ProcessFn] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._current_job: Optional[str] = None
+
+    @staticmethod
+    def _new_owner() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def start(self, process: ProcessFn):
+        # Forked workers inherit the parent's runner; each claims jobs as itself.
+        self.owner = self._new_owner()
+        self._process = process
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._current_job:
+            # Hand the job back right away instead of when the lease runs out.
+            await asyncio.to_thread(self.store.release_job, self._current_job, self.owner)
+            self._current_job = None
+
+    def notify(self):
+        """Wake the runner after a new job was queued."""
+        if self._wake:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim_next_job, self.owner, self.lease_seconds)
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=self.lease_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    continue
+                await self._run_job(*job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job runner error: {str(e)}", exc_info=True)
+                await asyncio.sleep(5)
+
+    async def _run_job(self, job_id: str, use_cache: bool):
+        logger.info("Running extraction job %s", job_id)
+        self._current_job = job_id
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.parallelism * 2)
+
+        async def feed():
+            after_index = -1
+            while True:
+                items = await asyncio.to_thread(self.store.pending_items, job_id, after_index, 200)
+                if not items:
+                    break
+                for item in items:
+                    await queue.put(item)
+                after_index = items[-1][0]
+            for _ in range(self.parallelism):
+                await queue.put(None)
+
+        async def work():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                item_index, text = item
+                response = await self._process_item(text, use_cache)
+                await asyncio.to_thread(self.store.complete_item, job_id, item_index, response)
+
+        processing = asyncio.gather(feed(), *(work() for _ in range(self.parallelism)))
+        lease = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            await asyncio.wait({processing, lease}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            lease.cancel()
+            if not processing.done():
+                processing.cancel()
+                try:
+                    await processing
+                except asyncio.CancelledError:
+                    pass
+        if processing.cancelled():
+            logger.warning("Lost the lease on extraction job %s; another worker continues it", job_id)
+            self._current_job = None
+            return
+        processing.result()
+        await asyncio.to_thread(self.store.finish_job, job_id, self.owner)
+        self._current_job = None
+        logger.info("Finished extraction job %s", job_id)
+
+    async def _keep_lease(self, job_id: str):
+        """Renew the lease on ``job_id`` until it is lost."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.store.renew_lease, job_id, self.owner, self.lease_seconds):
+                return
+
+    async def _process_item(self, text: str, use_cache: bool) -> ExtractionResponse:
+        # Jobs have no client waiting on them, so provider backpressure means
+        # waiting for a slot rather than failing the item.
+        while True:
+            try:
+                return await self._process(text, use_cache)
+            except AdmissionRejected as exc:
+                await asyncio.sleep(exc.retry_after)
+
+
+# Both open nothing until the runner starts or a job is queued.
+job_store = JobStore(settings.jobs_db_path)
+job_runner = JobRunner(job_store, settings.jobs_parallelism, settings.jobs_lease_seconds)
@@ -0,0 +1,220 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, *label_values: str, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._values[label_values] = series
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._values.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(self.label_names, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                cumulative += series[len(self.buckets)]
+                labels = _format_labels(self.label_names, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                plain = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{plain} {series[-1]}")
+                lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str]) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "contact_extractor_stage_duration_seconds",
+    "Time spent in each extraction pipeline stage.",
+    ("stage", "provider", "model"),
+)
+PROVIDER_RETRIES = registry.counter(
+    "contact_extractor_provider_retries_total",
+    "Provider calls retried after an error or unparseable response.",
+    ("provider", "model"),
+)
+PROVIDER_ERRORS = registry.counter(
+    "contact_extractor_provider_errors_total",
+    "Provider calls that raised an error.",
+    ("provider", "model"),
+)
+PARSE_FAILURES = registry.counter(
+    "contact_extractor_json_parse_failures_total",
+    "Provider responses that could not be parsed as JSON.",
+    ("provider", "model"),
+)
+FAST_PATH_SERVED = registry.counter(
+    "contact_extractor_fast_path_served_total",
+    "Requests served by the regex fast path.",
+    ("provider", "model"),
+)
+CACHE_LOOKUPS = registry.counter(
+    "contact_extractor_cache_lookups_total",
+    "Local cache lookups by result.",
+    ("result", "provider", "model"),
+)
+TEMPLATE_LOOKUPS = registry.counter(
+    "contact_extractor_template_lookups_total",
+    "Template cache lookups by result.",
+    ("result", "provider", "model"),
+)
+SIMILARITY_LOOKUPS = registry.counter(
+    "contact_extractor_similarity_lookups_total",
+    "Similarity cache lookups by result (hit, miss, rejected by verification).",
+    ("result", "provider", "model"),
+)
+TEMPLATE_VERIFICATIONS = registry.counter(
+    "contact_extractor_template_verifications_total",
+    "Template cache hits re-checked with the provider, by result.",
+    ("result", "provider", "model"),
+)
+
+
+class RequestTrace:
+    """Stages one request went through, which path served it and provider attempts."""
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+        self.served_by = "none"
+        self.provider_attempts = 0
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def start_trace() -> RequestTrace:
+    """Start recording stages for the current request (task context)."""
+    trace = RequestTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+def mark_served_by(path: str):
+    """Record which path answered the request; see ``ExtractionTimings.served_by``."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.served_by = path
+
+
+def count_provider_attempt():
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.provider_attempts += 1
+
+
+@contextmanager
+def time_stage(stage: str, provider: str, model: str) -> Iterator[None]:
+    """Record how long the wrapped block took as one pipeline stage.
+
+    The duration always goes to the stage histogram, and also to the current
+    request's trace when one was started.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(stage, provider, model, value=elapsed)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.stages.append((stage, elapsed))
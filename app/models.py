@@ -45,11 +45,28 @@ class ExtractedContact(BaseModel):
 class ExtractionRequest(BaseModel):
     text: str = Field(..., min_length=1, description="Text containing contact information")
     use_cache: bool = True
+    include_timings: bool = Field(False, description="Return a per-stage timing breakdown")
     
     @validator('text')
-    def clean_text(cls, v):
-        # Remove excessive whitespace
-        return ' '.join(v.split())
+    def require_text(cls, v):
+        # The text is kept as sent; only the cache key is canonicalized.
+        if not v.strip():
+            raise ValueError('Text must not be empty')
+        return v
+
+
+class StageTiming(BaseModel):
+    stage: str
+    duration_ms: float
+
+
+class ExtractionTimings(BaseModel):
+    # "fast", "memory_cache", "mmap_cache", "sqlite_cache", "l2_cache",
+    # "negative_cache", "stale_cache", "similarity_cache", "template_cache",
+    # "provider", "coalesced" or "none"
+    served_by: str
+    provider_attempts: int = 0
+    stages: List[StageTiming] = Field(default_factory=list)
 
 
 class ExtractionResponse(BaseModel):
@@ -59,6 +76,65 @@ class ExtractionResponse(BaseModel):
     error: Optional[str] = None
     processing_time: float
     cache_hit: bool = False
+    timings: Optional[ExtractionTimings] = None
+
+
+class BatchExtractionRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, description="Texts containing contact information")
+    use_cache: bool = True
+
+    @validator('texts', each_item=True)
+    def require_texts(cls, v):
+        # Same rule as ExtractionRequest.text
+        if not v.strip():
+            raise ValueError('Text must not be empty')
+        return v
+
+
+class BatchExtractionResponse(BaseModel):
+    success: bool
+    results: List[ExtractionResponse]
+    total_items: int
+    unique_items: int
+    processing_time: float
+
+
+class JobCreateRequest(BaseModel):
+    texts: Optional[List[str]] = Field(None, description="Texts to extract")
+    path: Optional[str] = Field(
+        None,
+        description="JSONL file of strings or objects, relative to JOBS_INPUT_DIRECTORY",
+    )
+    text_field: str = Field("text", description="Object field holding the text in a JSONL file")
+    use_cache: bool = True
+
+    @validator('path', always=True)
+    def require_one_source(cls, v, values):
+        if bool(v) == bool(values.get('texts')):
+            raise ValueError('Provide either texts or path')
+        return v
+
+
+class JobItemResult(BaseModel):
+    index: int
+    status: str  # "done" or "error"
+    result: Optional[ExtractionResponse] = None
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str  # "queued", "running" or "completed"
+    source: str
+    total_items: int
+    completed_items: int
+    failed_items: int
+    pending_items: int
+    progress: float
+    items_per_second: Optional[float] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    results: List[JobItemResult] = Field(default_factory=list)
 
 
 class HealthResponse(BaseModel):
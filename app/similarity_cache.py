@@ -0,0 +1,352 @@
+import logging
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.cache_codec import PAYLOAD_FORMAT, decode_extraction, encode_extraction
+from app.cache_store import local_cache
+from app.canonicalize import canonicalize
+from app.config import settings
+from app.models import ExtractedContact
+
+logger = logging.getLogger(__name__)
+
+# Stored with every vector; bump it when vectorizing or verification keys
+# change so old rows are no longer loaded.
+VECTORIZER_VERSION = "h2"
+
+_PHONE = re.compile(r"(?<![\d+])(?:\+?1[-.\s]?)?\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})(?!\d)")
+_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+_DIGITS = re.compile(r"\d+")
+_TOKEN = re.compile(r"[^\W_]+")
+_WEEKDAYS = r"mon(?:day)?|tues?(?:day)?|wed(?:nesday)?|thu(?:rs?)?(?:day)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?"
+_RELATIVE_DAYS = rf"today|tonight|tomorrow|yesterday|next|{_WEEKDAYS}"
+# Words that place a date or time; "2pm" counts, so only letters delimit them.
+_DATE_TIME_WORD = re.compile(
+    rf"(?<![^\W\d_])(?:{_RELATIVE_DAYS}|noon|midnight|morning|afternoon|evening|am|pm"
+    r"|jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+    r")(?![^\W\d_])",
+    re.IGNORECASE,
+)
+# Words that make a date depend on the day the text was extracted.
+_RELATIVE_DATE_WORD = re.compile(rf"(?<![^\W\d_])(?:{_RELATIVE_DAYS})(?![^\W\d_])", re.IGNORECASE)
+# Address fields whose every word must appear in the new text.
+_ADDRESS_FIELDS = ("unit", "street", "city", "postal_code")
+
+# Odd 64-bit constants mixing the three code points of a trigram.
+_MIX = (
+    np.uint64(0x9E3779B97F4A7C15),
+    np.uint64(0xC2B2AE3D27D4EB4F),
+    np.uint64(0x165667B19E3779F9),
+)
+_FINAL_MIX = np.uint64(0xD6E8FEB86659FD93)
+
+SIMILARITY_TABLE_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS similarity_index (
+        cache_key TEXT PRIMARY KEY,
+        vectorizer TEXT NOT NULL,
+        vector BLOB NOT NULL,
+        verification_key TEXT NOT NULL,
+        payload BLOB NOT NULL,
+        fingerprint TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_similarity_index_created
+        ON similarity_index (created_at)
+    """,
+)
+
+SIMILARITY_UPSERT_SQL = """
+    INSERT INTO similarity_index (
+        cache_key, vectorizer, vector, verification_key, payload, fingerprint, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(cache_key) DO UPDATE SET
+        vectorizer = excluded.vectorizer,
+        vector = excluded.vector,
+        verification_key = excluded.verification_key,
+        payload = excluded.payload,
+        fingerprint = excluded.fingerprint,
+        created_at = excluded.created_at
+"""
+
+SIMILARITY_TRIM_SQL = """
+    DELETE FROM similarity_index
+    WHERE cache_key NOT IN (
+        SELECT cache_key FROM similarity_index
+        ORDER BY created_at DESC
+        LIMIT ?
+    )
+"""
+
+
+def vectorize(text: str, dimensions: int) -> Optional[np.ndarray]:
+    """Unit-length hashed character trigram counts of the canonical text.
+
+    Trigrams are hashed into ``dimensions`` buckets with a sign bit, so
+    collisions cancel out on average. Hashing is stable across processes,
+    so vectors can be stored. None for texts too short to have a trigram.
+    """
+    canonical = f" {canonicalize(text, 'v2')} "
+    codes = np.frombuffer(canonical.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < 3:
+        return None
+    hashed = (codes[:-2] * _MIX[0]) ^ (codes[1:-1] * _MIX[1]) ^ (codes[2:] * _MIX[2])
+    hashed ^= hashed >> np.uint64(31)
+    hashed *= _FINAL_MIX
+    buckets = (hashed % np.uint64(dimensions)).astype(np.intp)
+    signs = np.where(hashed >> np.uint64(63), -1.0, 1.0)
+    vector = np.bincount(buckets, weights=signs, minlength=dimensions).astype(np.float32)
+    norm = float(np.linalg.norm(vector))
+    if not norm:
+        return None
+    return vector / norm
+
+
+def verification_key(text: str) -> str:
+    """What a near duplicate of ``text`` must have in common with it.
+
+    The phones (as ten digits) and emails, every other run of digits (house
+    numbers, units, ZIP codes, dates, times) and the date and time words,
+    so an edit to any of them is never answered with the old extraction.
+    """
+    phones = sorted({"".join(match.groups()) for match in _PHONE.finditer(text)})
+    emails = sorted({email.lower() for email in _EMAIL.findall(text)})
+    rest = _PHONE.sub(" ", _EMAIL.sub(" ", text))
+    digits = sorted(_DIGITS.findall(rest))
+    words = sorted(word.casefold() for word in _DATE_TIME_WORD.findall(rest))
+    return "|".join((",".join(phones), ",".join(emails), ",".join(digits), ",".join(words)))
+
+
+def _fields_present(extraction: ExtractedContact, text: str) -> bool:
+    """Whether the names and address of ``extraction`` are in ``text`` and its dates still hold."""
+    folded = " ".join(text.split()).casefold()
+    for name in (extraction.client_name, extraction.company_name):
+        if name and " ".join(name.split()).casefold() not in folded:
+            return False
+    if extraction.address is not None:
+        tokens = set(_TOKEN.findall(folded))
+        for field in _ADDRESS_FIELDS:
+            value = getattr(extraction.address, field)
+            if value and not set(_TOKEN.findall(value.casefold())) <= tokens:
+                return False
+    # "Tomorrow" meant another day when the near duplicate was extracted.
+    if (extraction.scheduled_date or extraction.appointment_time) and _RELATIVE_DATE_WORD.search(text):
+        return extraction.extracted_at.date() == date.today()
+    return True
+
+
+class SimilarityCache:
+    """Provider extractions reused for lightly edited re-sends of a text.
+
+    Each extracted text is stored as a hashed character trigram vector
+    (:func:`vectorize`, NumPy only, no embedding model) next to its
+    extraction in the ``similarity_index`` table of the local cache
+    database. The vectors are held in one in-process matrix, so a lookup is
+    a single matrix-vector product. The nearest texts within
+    ``cache_similarity_threshold`` cosine distance are candidates. One is
+    only served if its fingerprint is current, it had the same
+    :func:`verification_key` as the new text, and the names and address it
+    extracted occur in the new text; a relative date ("tomorrow") is only
+    reused on the day it was extracted.
+
+    Only the ``similarity_cache_max_entries`` most recent texts are kept.
+    Writes go through the local cache's write-behind buffer.
+    """
+
+    candidates = 5
+
+    def __init__(self):
+        self.enabled = settings.similarity_cache_enabled and local_cache.enabled
+        self._threshold = max(0.0, settings.cache_similarity_threshold)
+        self._dimensions = max(64, settings.similarity_cache_dimensions)
+        self._max_entries = max(1, settings.similarity_cache_max_entries)
+        self._vectorizer = f"{VECTORIZER_VERSION}:{self._dimensions}"
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._vectors = np.zeros((0, self._dimensions), dtype=np.float32)
+        self._count = 0
+        # Parallel to the matrix rows: (cache_key, verification key, fingerprint,
+        # payload), or None for a row retired by a replacement
+        self._entries: List[Optional[Tuple[str, str, str, bytes]]] = []
+        self._rows: Dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+        self._rejected = 0
+        self._learned = 0
+
+    @staticmethod
+    def _ensure_table():
+        local_cache.ensure_table("similarity_index", SIMILARITY_TABLE_SQL)
+
+    def _connection(self) -> sqlite3.Connection:
+        self._ensure_table()
+        return local_cache.connection()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        rows = self._connection().execute(
+            """
+            SELECT cache_key, vector, verification_key, fingerprint, payload
+            FROM similarity_index
+            WHERE vectorizer = ?
+            ORDER BY created_at DESC
+            LIMIT ?
+            """,
+            (self._vectorizer, self._max_entries),
+        ).fetchall()
+        with self._lock:
+            if self._loaded:
+                return
+            for cache_key, vector, verification, fingerprint, payload in reversed(rows):
+                self._append(cache_key, np.frombuffer(vector, dtype=np.float32), verification, fingerprint, payload)
+            self._loaded = True
+        if rows:
+            logger.info("Loaded %d texts into the similarity index", len(rows))
+
+    def _append(self, cache_key: str, vector: np.ndarray, verification: str, fingerprint: str, payload: bytes):
+        """Add or replace a row; the caller holds ``self._lock``.
+
+        A lookup may be reading the matrix meanwhile, so a replaced row is
+        not overwritten: its entry is set to None first, which lookups skip,
+        and only then its vector zeroed so it stops ranking among the nearest.
+        The new row is appended past the count lookups read up to.
+        """
+        row = self._rows.get(cache_key)
+        if row is not None:
+            self._entries[row] = None
+            self._vectors[row] = 0.0
+        if self._count == len(self._vectors):
+            grown = np.zeros((max(64, 2 * len(self._vectors)), self._dimensions), dtype=np.float32)
+            grown[:self._count] = self._vectors[:self._count]
+            self._vectors = grown
+        self._vectors[self._count] = vector
+        self._entries.append((cache_key, verification, fingerprint, payload))
+        self._rows[cache_key] = self._count
+        self._count += 1
+        if self._count > self._max_entries:
+            self._drop_oldest(max(1, self._max_entries // 10))
+
+    def _drop_oldest(self, count: int):
+        """Forget the ``count`` oldest rows and any retired ones; the caller holds ``self._lock``."""
+        kept = [row for row in range(count, self._count) if self._entries[row] is not None]
+        # A new array, since lookups may still be reading the old one.
+        vectors = np.zeros_like(self._vectors)
+        vectors[:len(kept)] = self._vectors[kept]
+        self._vectors = vectors
+        self._entries = [self._entries[row] for row in kept]
+        self._rows = {entry[0]: row for row, entry in enumerate(self._entries)}
+        self._count = len(kept)
+
+    def lookup(self, text: str, fingerprint: str) -> Tuple[Optional[ExtractedContact], str]:
+        """The extraction of a verified near duplicate of ``text`` (with ``text`` as its raw
+        text) and the result: "hit", "miss", or "rejected" when near duplicates failed verification.
+        """
+        if not self.enabled:
+            return None, "miss"
+        self._ensure_loaded()
+        query = vectorize(text, self._dimensions)
+
+        found = None
+        rejected = False
+        if query is not None:
+            with self._lock:
+                vectors, entries, count = self._vectors, self._entries, self._count
+            if count:
+                scores = vectors[:count] @ query
+                top = min(self.candidates, count)
+                nearest = np.argpartition(-scores, top - 1)[:top]
+                verification = None
+                for row in nearest[np.argsort(-scores[nearest])]:
+                    if 1.0 - float(scores[row]) > self._threshold:
+                        break
+                    entry = entries[row]
+                    if entry is None:
+                        continue
+                    _, entry_verification, entry_fingerprint, payload = entry
+                    if entry_fingerprint != fingerprint:
+                        continue
+                    if verification is None:
+                        verification = verification_key(text)
+                    if entry_verification != verification:
+                        rejected = True
+                        continue
+                    try:
+                        candidate = ExtractedContact(**decode_extraction(payload, PAYLOAD_FORMAT, text))
+                    except ValueError as e:
+                        logger.warning("Unreadable similarity index entry: %s", e)
+                        continue
+                    if not _fields_present(candidate, text):
+                        rejected = True
+                        continue
+                    found = candidate
+                    break
+
+        with self._lock:
+            if found is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+                self._rejected += rejected
+        if found is not None:
+            return found, "hit"
+        return None, "rejected" if rejected else "miss"
+
+    def learn(self, text: str, extraction: ExtractedContact, fingerprint: str) -> bool:
+        """Index a provider extraction of ``text``; returns whether it was stored."""
+        if not self.enabled:
+            return False
+        vector = vectorize(text, self._dimensions)
+        if vector is None:
+            return False
+        self._ensure_loaded()
+
+        cache_key = local_cache.cache_key(text)
+        verification = verification_key(text)
+        payload = encode_extraction(extraction.model_dump(mode="json"))
+        self._ensure_table()
+        local_cache.buffer_write(
+            SIMILARITY_UPSERT_SQL,
+            (
+                cache_key,
+                self._vectorizer,
+                vector.tobytes(),
+                verification,
+                payload,
+                fingerprint,
+                datetime.utcnow().isoformat(),
+            ),
+        )
+        with self._lock:
+            self._append(cache_key, vector, verification, fingerprint, payload)
+            self._learned += 1
+            trim = self._learned % 100 == 0
+        if trim:
+            local_cache.buffer_write(SIMILARITY_TRIM_SQL, (self._max_entries,))
+        return True
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "indexed_texts": len(self._rows),
+                "dimensions": self._dimensions,
+                "threshold": self._threshold,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "verification_rejects": self._rejected,
+                "learned": self._learned,
+            }
+
+
+similarity_cache = SimilarityCache()
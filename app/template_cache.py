@@ -0,0 +1,442 @@
+import copy
+import hashlib
+import json
+import logging
+import random
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.cache_store import local_cache
+from app.config import settings
+from app.models import ExtractedContact
+
+logger = logging.getLogger(__name__)
+
+# Part of every template key; bump it when masking or mapping changes so
+# stored templates stop matching.
+TEMPLATE_VERSION = "t1"
+
+# Value slots, tried in this order at each position; patterns follow
+# FastExtractor's.
+_SLOT_PATTERN = re.compile(
+    r"(?P<EMAIL>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)"
+    r"|(?P<PHONE>(?<![\w+])(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}(?!\d))"
+    r"|(?P<ZIP>(?<![\w-])\d{5}(?:-\d{4})?(?![\w-]))"
+    r"|(?P<NUM>(?<!\d)\d+(?!\d))"
+)
+
+# A capitalized (or all caps) word that is not a "Label:".
+_NAME_WORD = r"[A-Z][A-Za-z'-]*(?![A-Za-z'-]|:)"
+_NAME = rf"{_NAME_WORD}(?: {_NAME_WORD}){{0,3}}"
+_NAME_PATTERNS = (
+    re.compile(rf"\b(?:Customer|Client|Name|Contact)\s*:\s*(?P<NAME>{_NAME})"),
+    re.compile(rf"\bContact\s+(?P<NAME>{_NAME})\s+at\s+(?P<COMPANY>{_NAME})"),
+)
+
+_SLOT_MARK = "\x00"
+_EXCLUDED_FIELDS = ("raw_text", "extracted_at")
+# Fields the provider may compute rather than copy ("tomorrow" becomes a
+# date); a template only keeps them when the text has the value verbatim.
+_VERBATIM_FIELDS = ("scheduled_date", "appointment_time")
+_WORD = re.compile(r"[^\W\d_]{3,}")
+_DIGITS = re.compile(r"\d+")
+
+Slots = List[Tuple[str, str]]
+
+TEMPLATE_TABLE_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS extraction_templates (
+        template_key TEXT PRIMARY KEY,
+        skeleton TEXT NOT NULL,
+        mapping TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        disabled INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    # TEMPLATE_TRIM_SQL orders by created_at
+    """
+    CREATE INDEX IF NOT EXISTS idx_extraction_templates_created
+        ON extraction_templates (created_at)
+    """,
+)
+
+TEMPLATE_UPSERT_SQL = """
+    INSERT INTO extraction_templates (template_key, skeleton, mapping, fingerprint, created_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(template_key) DO UPDATE SET
+        mapping = excluded.mapping,
+        fingerprint = excluded.fingerprint,
+        created_at = excluded.created_at,
+        disabled = 0
+"""
+
+TEMPLATE_TRIM_SQL = """
+    DELETE FROM extraction_templates
+    WHERE template_key NOT IN (
+        SELECT template_key FROM extraction_templates
+        ORDER BY created_at DESC
+        LIMIT ?
+    )
+"""
+
+
+def mask(text: str) -> Tuple[str, Slots]:
+    """Split ``text`` into its template and the values masked out of it.
+
+    The template has each value replaced by a marker with its kind; values
+    are returned as ``(kind, text)`` in order of appearance.
+    """
+    spans = []
+    for pattern in _NAME_PATTERNS:
+        for match in pattern.finditer(text):
+            for group in ("NAME", "COMPANY"):
+                if match.re.groupindex.get(group) and match.group(group):
+                    spans.append((match.start(group), match.end(group), "NAME"))
+    for match in _SLOT_PATTERN.finditer(text):
+        spans.append((match.start(), match.end(), match.lastgroup))
+    spans.sort(key=lambda span: (span[0], -span[1]))
+
+    parts: List[str] = []
+    slots: Slots = []
+    position = 0
+    for start, end, kind in spans:
+        if start < position:
+            continue
+        parts.append(text[position:start])
+        parts.append(f"{_SLOT_MARK}{kind}{_SLOT_MARK}")
+        slots.append((kind, text[start:end]))
+        position = end
+    parts.append(text[position:])
+    return "".join(parts), slots
+
+
+def _phone_digits(phone: str) -> str:
+    digits = re.sub(r"\D", "", phone)
+    return digits[1:] if len(digits) == 11 and digits.startswith("1") else digits
+
+
+def _case_of(found: str, slot_text: str) -> Optional[str]:
+    for case in ("same", "upper", "lower", "title"):
+        if found == _apply_case(slot_text, case):
+            return case
+    return None
+
+
+def _apply_case(value: str, case: str) -> str:
+    if case == "upper":
+        return value.upper()
+    if case == "lower":
+        return value.lower()
+    if case == "title":
+        return value.title()
+    return value
+
+
+def _replace(pieces: List, pattern: "re.Pattern[str]", piece_for) -> List:
+    """Replace matches inside the literal pieces by ``piece_for(match)`` (None keeps the text)."""
+    result: List = []
+    for piece in pieces:
+        if not isinstance(piece, str):
+            result.append(piece)
+            continue
+        position = 0
+        for match in pattern.finditer(piece):
+            replacement = piece_for(match)
+            if replacement is None:
+                continue
+            result.append(piece[position:match.start()])
+            result.append(replacement)
+            position = match.end()
+        result.append(piece[position:])
+    return [piece for piece in result if piece != ""]
+
+
+def _map_value(value: str, slots: Slots, constant_text: str) -> Optional[List]:
+    """Describe ``value`` as literal text and references to slots, or None if it cannot be."""
+    pieces: List = [value]
+    for index, (kind, slot_text) in enumerate(slots):
+        if kind == "PHONE":
+            digits = _phone_digits(slot_text)
+            pattern = re.compile(r"(?<!\d)" + r"\D{0,3}".join(digits) + r"(?!\d)")
+            pieces = _replace(pieces, pattern, lambda m, i=index: ["phone", i, re.sub(r"\d", "#", m.group())])
+
+    for index in sorted(range(len(slots)), key=lambda i: -len(slots[i][1])):
+        slot_text = slots[index][1]
+        if len(slot_text) < 2 and value != slot_text:
+            # A lone digit turns up everywhere ("+1 ..."); only a whole
+            # value is taken to be it.
+            continue
+        pattern = re.compile(
+            r"(?<![A-Za-z0-9])" + re.escape(slot_text) + r"(?![A-Za-z0-9])", re.IGNORECASE
+        )
+
+        def slot_piece(match, i=index, slot_text=slot_text):
+            case = _case_of(match.group(), slot_text)
+            return ["slot", i, case] if case else None
+
+        pieces = _replace(pieces, pattern, slot_piece)
+
+    # What is left must be constant for the template: nothing that looks
+    # taken from a masked value (a name guessed from an email, a unit number)
+    # unless the template's fixed text has it too.
+    slot_texts = [slot_text.casefold() for _, slot_text in slots]
+    for piece in pieces:
+        if not isinstance(piece, str):
+            continue
+        literal = piece.casefold()
+        for word in _WORD.findall(literal):
+            if word not in constant_text and any(word in slot_text for slot_text in slot_texts):
+                return None
+        for digits in _DIGITS.findall(literal):
+            if any(
+                digits == slot_text or (len(digits) > 2 and digits in slot_text)
+                for slot_text in slot_texts
+            ):
+                return None
+    return pieces
+
+
+def _fill_value(pieces: List, slots: Slots) -> str:
+    parts = []
+    for piece in pieces:
+        if isinstance(piece, str):
+            parts.append(piece)
+        elif piece[0] == "slot":
+            parts.append(_apply_case(slots[piece[1]][1], piece[2]))
+        else:
+            digits = iter(_phone_digits(slots[piece[1]][1]))
+            parts.append(re.sub("#", lambda _: next(digits), piece[2]))
+    return "".join(parts)
+
+
+def _string_fields(value: Any, path: Tuple = ()):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _string_fields(item, path + (key,))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _string_fields(item, path + (index,))
+    elif isinstance(value, str):
+        yield path, value
+
+
+def _set_path(target: Any, path: List, value: str):
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+
+
+def comparable(extraction: Dict) -> Dict:
+    """An extraction without the fields that differ between otherwise equal results."""
+    return {key: value for key, value in extraction.items() if key not in _EXCLUDED_FIELDS}
+
+
+def build_mapping(text: str, skeleton: str, slots: Slots, extraction: Dict) -> Optional[Dict]:
+    """The field-to-slot mapping of one extraction, or None if a field is not explained by the template."""
+    shape = comparable(extraction)
+    constant_text = skeleton.casefold()
+    folded_text = text.casefold()
+    fields = []
+    for path, value in list(_string_fields(shape)):
+        if path[0] in _VERBATIM_FIELDS and value.casefold() not in folded_text:
+            return None
+        pieces = _map_value(value, slots, constant_text)
+        if pieces is None:
+            return None
+        fields.append([list(path), pieces])
+        _set_path(shape, list(path), None)
+    return {"shape": shape, "fields": fields}
+
+
+def fill_mapping(mapping: Dict, slots: Slots) -> Dict:
+    extraction = copy.deepcopy(mapping["shape"])
+    for path, pieces in mapping["fields"]:
+        _set_path(extraction, path, _fill_value(pieces, slots))
+    return extraction
+
+
+class TemplateCache:
+    """LLM extractions reused across texts that differ only in their values.
+
+    Texts are masked into a template: emails, phone numbers, ZIP codes,
+    other numbers and labelled names become typed slots. When the provider
+    extracts a text, each field of the result is described as literal text
+    and references to the text's slots, and the mapping is stored under the
+    template. A later text with the same template gets the mapping filled in
+    with its own values instead of a provider call.
+
+    Results whose fields cannot all be explained by the template are not
+    learned. Templates are tied to the extractor fingerprint, live in a
+    memory LRU in front of the ``extraction_templates`` table of the local
+    cache database, and are disabled for good once a verification against
+    the provider disagrees with them. Writes go through the local cache's
+    write-behind buffer.
+    """
+
+    def __init__(self):
+        self.enabled = settings.template_cache_enabled and local_cache.enabled
+        self._max_entries = max(1, settings.template_cache_max_entries)
+        self._verify_rate = min(1.0, max(0.0, settings.template_cache_verify_rate))
+        self._lock = threading.Lock()
+        # template_key -> (fingerprint, mapping, or None once disabled)
+        self._memory: "OrderedDict[str, Tuple[str, Optional[Dict]]]" = OrderedDict()
+        self._learns_since_trim = 0
+        self._hits = 0
+        self._misses = 0
+        self._learned = 0
+        self._unmappable = 0
+        self._verifications = 0
+        self._verification_mismatches = 0
+
+    @staticmethod
+    def _ensure_table():
+        local_cache.ensure_table("extraction_templates", TEMPLATE_TABLE_SQL)
+
+    def _connection(self) -> sqlite3.Connection:
+        self._ensure_table()
+        return local_cache.connection()
+
+    def _template_key(self, skeleton: str) -> str:
+        payload = f"{TEMPLATE_VERSION}:{skeleton}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, template_key: str, entry: Tuple[str, Optional[Dict]]):
+        self._memory[template_key] = entry
+        self._memory.move_to_end(template_key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _entry(self, template_key: str) -> Optional[Tuple[str, Optional[Dict]]]:
+        with self._lock:
+            entry = self._memory.get(template_key)
+            if entry is not None:
+                self._memory.move_to_end(template_key)
+                return entry
+
+        row = self._connection().execute(
+            "SELECT fingerprint, mapping, disabled FROM extraction_templates WHERE template_key = ?",
+            (template_key,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = (row[0], None if row[2] else json.loads(row[1]))
+        with self._lock:
+            self._remember(template_key, entry)
+        return entry
+
+    def lookup(self, text: str, fingerprint: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Fill a learned template for ``text``; returns the extraction and the template key."""
+        if not self.enabled:
+            return None, None
+
+        skeleton, slots = mask(text)
+        if not slots:
+            return None, None
+        template_key = self._template_key(skeleton)
+        entry = self._entry(template_key)
+
+        extraction = None
+        if entry is not None and entry[0] == fingerprint and entry[1] is not None:
+            try:
+                extraction = fill_mapping(entry[1], slots)
+            except (IndexError, KeyError, TypeError, StopIteration) as e:
+                logger.warning("Unusable extraction template %s: %s", template_key[:12], e)
+
+        with self._lock:
+            if extraction is None:
+                self._misses += 1
+                return None, None
+            self._hits += 1
+        return extraction, template_key
+
+    def learn(self, text: str, extraction: ExtractedContact, fingerprint: str) -> bool:
+        """Store the template of a provider extraction; returns whether one was stored."""
+        if not self.enabled:
+            return False
+
+        skeleton, slots = mask(text)
+        if not slots:
+            return False
+        template_key = self._template_key(skeleton)
+        entry = self._entry(template_key)
+        if entry is not None and entry[0] == fingerprint:
+            return False
+
+        mapping = build_mapping(text, skeleton, slots, extraction.model_dump(mode="json"))
+        if mapping is None:
+            with self._lock:
+                self._unmappable += 1
+            return False
+
+        self._ensure_table()
+        local_cache.buffer_write(
+            TEMPLATE_UPSERT_SQL,
+            (
+                template_key,
+                skeleton,
+                json.dumps(mapping, separators=(",", ":")),
+                fingerprint,
+                datetime.utcnow().isoformat(),
+            ),
+        )
+        with self._lock:
+            self._remember(template_key, (fingerprint, mapping))
+            self._learned += 1
+            self._learns_since_trim += 1
+            trim = self._learns_since_trim >= 100
+            if trim:
+                self._learns_since_trim = 0
+        if trim:
+            local_cache.buffer_write(TEMPLATE_TRIM_SQL, (self._max_entries,))
+        return True
+
+    def should_verify(self) -> bool:
+        return self.enabled and random.random() < self._verify_rate
+
+    def record_verification(
+        self, template_key: str, fingerprint: str, filled: Dict, expected: Optional[Dict]
+    ) -> bool:
+        """Compare a filled template with the provider's own extraction; disable it on a mismatch."""
+        matched = expected is not None and comparable(filled) == comparable(expected)
+        with self._lock:
+            self._verifications += 1
+            if matched:
+                return True
+            self._verification_mismatches += 1
+            self._remember(template_key, (fingerprint, None))
+
+        self._ensure_table()
+        local_cache.buffer_write(
+            "UPDATE extraction_templates SET disabled = 1 WHERE template_key = ?",
+            (template_key,),
+        )
+        logger.info("Extraction template %s disagreed with the provider; disabled", template_key[:12])
+        return False
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "memory_templates": len(self._memory),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "learned": self._learned,
+                "unmappable": self._unmappable,
+                "verifications": self._verifications,
+                "verification_mismatches": self._verification_mismatches,
+                "verified_accuracy": (
+                    round(1 - self._verification_mismatches / self._verifications, 4)
+                    if self._verifications
+                    else None
+                ),
+            }
+
+
+template_cache = TemplateCache()
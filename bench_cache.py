@@ -0,0 +1,506 @@
+#!/usr/bin/env python
+"""
+Benchmarks for the local extraction cache.
+
+contention: get throughput against the SQLite tier with several threads
+sharing one cache, and with several forked worker processes sharing the
+same database file. The memory tier is shrunk to one byte so lookups hit
+SQLite.
+
+    python bench_cache.py contention --entries 2000 --seconds 3
+    python bench_cache.py contention --threads 1,2,4,8 --processes 1,2,4
+
+encoding: bytes per stored entry and decode time of the compact payload
+format against the legacy JSON rows (full model dump including raw_text).
+
+    python bench_cache.py encoding --entries 5000
+
+canonical: replays traffic through a cold, unbounded cache and reports the
+hit rate each cache normalization version would get. Texts come from a
+file (JSONL with a "text" field, or one text per line), from the texts in
+an existing cache database (weighted by their hit counts), or by default
+from generated messages resent with typical variations.
+
+    python bench_cache.py canonical --input traffic.jsonl
+    python bench_cache.py canonical --db cache/extraction_cache.sqlite3
+
+hits: latency of a memory-tier cache hit: from the cache lookup to a
+ready contact, through the /extract handler including response encoding
+as FastAPI does it, and for a whole request through the test client (in
+process, with the provider disabled).
+
+    python bench_cache.py hits --requests 2000
+
+policy: hit ratio of each memory tier eviction policy at a few byte
+capacities, replaying a trace through the policy alone (a miss stores the
+entry, as an extraction would). The trace comes from --input or --db as for
+canonical, or by default is interactive traffic with a few hot recurring
+messages and a one-off bulk backfill running through the middle of it.
+Entry sizes are the text plus the typical size of the extracted fields.
+
+    python bench_cache.py policy --capacities 256KiB,1MiB,4MiB
+    python bench_cache.py policy --input traffic.jsonl
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+TEXT_TEMPLATE = "Customer {i} called about job {i}. Reach them at 239-555-{n:04d} or user{i}@example.com."
+
+
+def sample_text(i: int) -> str:
+    return TEXT_TEMPLATE.format(i=i, n=i % 10000)
+
+
+def build_cache(db_path: str, entries: int):
+    from app.cache_store import LocalExtractionCache
+    from app.config import settings
+    from app.models import ExtractedContact, PhoneNumber
+
+    settings.local_cache_enabled = True
+    settings.local_cache_db_path = db_path
+    settings.local_cache_memory_bytes = 1
+
+    cache = LocalExtractionCache()
+    for i in range(entries):
+        contact = ExtractedContact(
+            client_name=f"Customer {i}",
+            phone_numbers=[PhoneNumber(number=f"239555{i % 10000:04d}")],
+            email=f"user{i}@example.com",
+            raw_text=sample_text(i),
+        )
+        cache.set(sample_text(i), contact, "bench", "bench")
+    cache.flush()
+    return cache
+
+
+def run_gets(cache, entries: int, seconds: float, seed: int) -> int:
+    rng = random.Random(seed)
+    texts = [sample_text(rng.randrange(entries)) for _ in range(4096)]
+    deadline = time.perf_counter() + seconds
+    done = 0
+    while time.perf_counter() < deadline:
+        for text in texts[done % 4096:done % 4096 + 64]:
+            cache.get(text)
+        done += 64
+    return done
+
+
+def bench_threads(cache, entries: int, seconds: float, count: int) -> float:
+    totals = [0] * count
+
+    def worker(index: int):
+        totals[index] = run_gets(cache, entries, seconds, seed=index)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(totals) / (time.perf_counter() - started)
+
+
+_shared_cache = None
+
+
+def _process_worker(args):
+    entries, seconds, seed = args
+    return run_gets(_shared_cache, entries, seconds, seed)
+
+
+def bench_processes(cache, entries: int, seconds: float, count: int) -> float:
+    # Forked children inherit the parent's cache object, which is exactly
+    # what a preforking server does; each must reconnect on its own.
+    global _shared_cache
+    _shared_cache = cache
+    context = multiprocessing.get_context("fork")
+    started = time.perf_counter()
+    with context.Pool(count) as pool:
+        totals = pool.map(_process_worker, [(entries, seconds, i) for i in range(count)])
+    return sum(totals) / (time.perf_counter() - started)
+
+
+def contention(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.sqlite3")
+        cache = build_cache(db_path, args.entries)
+        # Touch the database from the parent so children inherit a live connection.
+        cache.get(sample_text(0))
+
+        print(f"{args.entries} cached entries, {args.seconds:.1f}s per run\n")
+        print(f"{'mode':>10} {'workers':>8} {'gets/s':>12} {'scaling':>8}")
+
+        baseline = None
+        for count in [int(level) for level in args.threads.split(",")]:
+            rate = bench_threads(cache, args.entries, args.seconds, count)
+            baseline = baseline or rate
+            print(f"{'threads':>10} {count:>8} {rate:>12.0f} {rate / baseline:>7.2f}x")
+
+        if sys.platform == "win32":
+            print("process runs need fork; skipped")
+            return
+
+        baseline = None
+        for count in [int(level) for level in args.processes.split(",")]:
+            rate = bench_processes(cache, args.entries, args.seconds, count)
+            baseline = baseline or rate
+            print(f"{'processes':>10} {count:>8} {rate:>12.0f} {rate / baseline:>7.2f}x")
+
+        stats = cache.get_stats()
+        print(f"\nwrite failures in parent: {stats['write_failures']}")
+
+
+FIRST_NAMES = ["Bob", "Maria", "Dave", "Linda", "Jose", "Karen", "Tom", "Aisha"]
+LAST_NAMES = ["Smith", "Garcia", "Nguyen", "Johnson", "Brown", "Lopez", "Miller"]
+JOBS = ["roof leak", "AC not cooling", "water heater", "pool pump", "gutter cleaning"]
+CITIES = [("Naples", "FL", "34102"), ("Fort Myers", "FL", "33901"), ("Tampa", "FL", "33602")]
+
+
+def sample_message(rng: random.Random):
+    from app.models import Address, ExtractedContact, PhoneNumber
+
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    phone = f"239-{rng.randrange(200, 999)}-{rng.randrange(10000):04d}"
+    email = f"{name.split()[0].lower()}{rng.randrange(100)}@gmail.com"
+    city, state, postal = rng.choice(CITIES)
+    street = f"{rng.randrange(100, 9999)} {rng.choice(['Palm', 'Oak', 'Gulf Shore'])} Blvd"
+    job = rng.choice(JOBS)
+    text = (
+        f"Hi, this is {name}. We have a {job} at {street}, {city} {state} {postal}. "
+        f"Please call me back at {phone} or email {email}. Thursday morning works best."
+    )
+    contact = ExtractedContact(
+        client_name=name,
+        phone_numbers=[PhoneNumber(number=f"+1 {phone}")],
+        email=email,
+        address=Address(street=street, city=city, state=state, postal_code=postal, country="US"),
+        job_type=job,
+        scheduled_date="Thursday",
+        appointment_time="morning",
+        raw_text=text,
+    )
+    return text, contact
+
+
+def encoding(args):
+    from app.cache_codec import LEGACY_FORMAT, PAYLOAD_FORMAT, decode_extraction, encode_extraction
+
+    rng = random.Random(0)
+    samples = [sample_message(rng) for _ in range(args.entries)]
+    normalized = [" ".join(text.split()) for text, _ in samples]
+    dumps = [contact.model_dump(mode="json") for _, contact in samples]
+
+    legacy = [json.dumps(data) for data in dumps]
+    compact = [encode_extraction(data) for data in dumps]
+    plain_zlib = [
+        zlib.compress(
+            json.dumps({k: v for k, v in data.items() if k != "raw_text"}, separators=(",", ":")).encode(),
+            9,
+        )
+        for data in dumps
+    ]
+
+    def per_entry(payloads):
+        return sum(len(text) + len(payload) for text, payload in zip(normalized, payloads)) / len(payloads)
+
+    def decode_us(fn, payloads):
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for text, payload in zip(normalized, payloads):
+                fn(payload, text)
+        return (time.perf_counter() - started) / (args.rounds * len(payloads)) * 1e6
+
+    legacy_bytes = per_entry(legacy)
+    print(f"{args.entries} sample entries (normalized_text + payload)\n")
+    print(f"{'format':>22} {'bytes/entry':>12} {'vs legacy':>10} {'decode us':>10}")
+    rows = [
+        ("legacy json", legacy, lambda p, t: decode_extraction(p, LEGACY_FORMAT, t)),
+        ("zlib, no dictionary", plain_zlib, lambda p, t: json.loads(zlib.decompress(p))),
+        (PAYLOAD_FORMAT, compact, lambda p, t: decode_extraction(p, PAYLOAD_FORMAT, t)),
+    ]
+    for label, payloads, fn in rows:
+        size = per_entry(payloads)
+        print(f"{label:>22} {size:>12.0f} {size / legacy_bytes:>9.0%} {decode_us(fn, payloads):>10.1f}")
+
+
+def load_traffic(args):
+    if args.input:
+        texts = []
+        with open(args.input, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.rstrip("\n")
+                if not line.strip():
+                    continue
+                if line.lstrip().startswith("{"):
+                    texts.append(json.loads(line)["text"])
+                else:
+                    texts.append(line)
+        return texts, args.input
+    if args.db:
+        connection = sqlite3.connect(args.db)
+        rows = connection.execute("SELECT normalized_text, hit_count FROM extraction_cache").fetchall()
+        connection.close()
+        return [text for text, hits in rows for _ in range(hits + 1)], args.db
+    return generated_traffic(args.messages, args.repeats), "generated"
+
+
+VARIATIONS = [
+    lambda text: text,
+    lambda text: text.lower(),
+    lambda text: text.upper(),
+    lambda text: text.replace("'", "\u2019").replace(". ", ".  "),
+    lambda text: text + "\n\nSent from my iPhone",
+    lambda text: text.rstrip(".") + "!!",
+    lambda text: " ".join(text.split()) + "\n",
+]
+
+
+def reformat_phone(text: str, rng: random.Random) -> str:
+    import re
+
+    def replace(match):
+        area, prefix, line = match.groups()
+        style = rng.randrange(4)
+        return [f"({area}) {prefix}-{line}", f"{area}.{prefix}.{line}", f"{area}{prefix}{line}", f"+1 {area}-{prefix}-{line}"][style]
+
+    return re.sub(r"(\d{3})-(\d{3})-(\d{4})", replace, text)
+
+
+def generated_traffic(messages: int, repeats: int):
+    rng = random.Random(0)
+    originals = [sample_message(rng)[0] for _ in range(messages)]
+    texts = []
+    for text in originals:
+        texts.append(text)
+        for _ in range(rng.randrange(repeats + 1)):
+            variant = rng.choice(VARIATIONS)(text)
+            if rng.random() < 0.5:
+                variant = reformat_phone(variant, rng)
+            texts.append(variant)
+    rng.shuffle(texts)
+    return texts
+
+
+def canonical(args):
+    from app.canonicalize import CANONICALIZERS
+
+    texts, source = load_traffic(args)
+    if not texts:
+        print("no traffic to replay")
+        return
+    print(f"{len(texts)} requests from {source}\n")
+    print(f"{'version':>8} {'distinct':>9} {'hit rate':>9} {'LLM calls':>10} {'canon us':>9}")
+    baseline = None
+    for version, canonicalizer in CANONICALIZERS.items():
+        started = time.perf_counter()
+        keys = [canonicalizer(text) for text in texts]
+        elapsed = (time.perf_counter() - started) / len(texts) * 1e6
+        distinct = len(set(keys))
+        baseline = baseline or distinct
+        print(
+            f"{version:>8} {distinct:>9} {1 - distinct / len(texts):>9.1%} "
+            f"{distinct / baseline:>9.0%} {elapsed:>9.1f}"
+        )
+
+
+def hits(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["LOCAL_CACHE_DB_PATH"] = os.path.join(tmp, "bench.sqlite3")
+        os.environ["LLM_ENABLED"] = "false"
+        os.environ["ENABLE_FAST_MODE"] = "false"
+        os.environ["CHROMA_DISABLE"] = "1"
+        os.environ["TEMPLATE_CACHE_ENABLED"] = "false"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+        from fastapi import Response
+        from fastapi.responses import JSONResponse
+        from fastapi.routing import serialize_response
+        from fastapi.testclient import TestClient
+
+        import main as api
+        from app.extractor import extractor
+
+        rng = random.Random(0)
+        samples = [sample_message(rng) for _ in range(args.entries)]
+        for text, contact in samples:
+            extractor._store_cached_result(text, contact)
+        texts = [text for text, _ in samples]
+
+        rounds = max(1, args.lookups // len(texts))
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for text in texts:
+                extractor._lookup_cache(text, None)
+        lookup_us = (time.perf_counter() - started) / (rounds * len(texts)) * 1e6
+
+        route = next(route for route in api.app.routes if getattr(route, "path", "") == "/extract")
+
+        async def handle(text: str) -> bytes:
+            result = await api.extract_contact_info(api.ExtractionRequest(text=text))
+            if not isinstance(result, Response):
+                content = await serialize_response(field=route.response_field, response_content=result)
+                result = JSONResponse(content)
+            return result.body
+
+        async def handle_all() -> float:
+            started = time.perf_counter()
+            for index in range(args.requests):
+                await handle(texts[index % len(texts)])
+            return (time.perf_counter() - started) / args.requests * 1e6
+
+        handler_us = asyncio.run(handle_all())
+
+        with TestClient(api.app) as client:
+            for text in texts[:50]:
+                client.post("/extract", json={"text": text})
+            started = time.perf_counter()
+            for index in range(args.requests):
+                response = client.post("/extract", json={"text": texts[index % len(texts)]})
+            request_us = (time.perf_counter() - started) / args.requests * 1e6
+            assert response.json()["cache_hit"], response.text
+
+        print(f"{args.entries} cached entries in the memory tier\n")
+        print(f"{'lookup to contact':>22} {lookup_us:>9.1f} us")
+        print(f"{'handler + encoding':>22} {handler_us:>9.1f} us")
+        print(f"{'/extract request':>22} {request_us:>9.1f} us")
+
+
+# Serialized fields of a typical extraction, on top of its raw text.
+ENTRY_OVERHEAD_BYTES = 420
+
+
+def parse_size(value: str) -> int:
+    units = {"kib": 1 << 10, "mib": 1 << 20, "gib": 1 << 30}
+    value = value.strip().lower()
+    for suffix, multiplier in units.items():
+        if value.endswith(suffix):
+            return int(float(value[: -len(suffix)]) * multiplier)
+    return int(value)
+
+
+def policy_trace(args):
+    """Return (label, trace) with (key, size, interactive) per request."""
+    from app.canonicalize import canonicalize
+
+    def entry(text: str, interactive: bool):
+        key = canonicalize(text, "v2")
+        return key, len(text.encode("utf-8")) + ENTRY_OVERHEAD_BYTES, interactive
+
+    if args.input or args.db:
+        texts, source = load_traffic(args)
+        return source, [entry(text, True) for text in texts]
+
+    rng = random.Random(0)
+    hot = [sample_message(rng)[0] for _ in range(args.hot)]
+    weights = [1 / (rank + 1) ** args.skew for rank in range(len(hot))]
+    interactive = [entry(text, True) for text in rng.choices(hot, weights, k=args.requests)]
+    backfill = [entry(sample_message(rng)[0], False) for _ in range(args.backfill)]
+    # The backfill interleaves with the second half of the interactive traffic.
+    middle = len(interactive) // 2
+    tail = interactive[middle:]
+    mixed = []
+    step = max(1, len(backfill) // max(1, len(tail)))
+    for index, request in enumerate(tail):
+        mixed.extend(backfill[index * step:(index + 1) * step])
+        mixed.append(request)
+    mixed.extend(backfill[len(tail) * step:])
+    label = (
+        f"generated: {args.hot} hot messages (zipf {args.skew}), "
+        f"{args.requests} interactive requests, {args.backfill} backfill texts"
+    )
+    return label, interactive[:middle] + mixed
+
+
+def policy(args):
+    from app.cache_policy import POLICIES, make_policy
+
+    source, trace = policy_trace(args)
+    if not trace:
+        print("no traffic to replay")
+        return
+    capacities = [parse_size(value) for value in args.capacities.split(",")]
+    interactive_total = sum(1 for _, _, interactive in trace if interactive)
+    print(f"{len(trace)} requests from {source}\n")
+    print(f"{'capacity':>10} {'policy':>8} {'hit ratio':>10} {'interactive':>12} {'entries':>8} {'us/op':>7}")
+    for capacity in capacities:
+        for name in POLICIES:
+            cache = make_policy(name, capacity)
+            hits_all = hits_interactive = 0
+            started = time.perf_counter()
+            for key, size, interactive in trace:
+                if cache.get(key) is not None:
+                    hits_all += 1
+                    hits_interactive += interactive
+                else:
+                    cache.put(key, True, size)
+            elapsed = (time.perf_counter() - started) / len(trace) * 1e6
+            interactive_ratio = hits_interactive / interactive_total if interactive_total else 0.0
+            print(
+                f"{capacity >> 10:>7}KiB {name:>8} {hits_all / len(trace):>10.1%} "
+                f"{interactive_ratio:>12.1%} {len(cache):>8} {elapsed:>7.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local extraction cache benchmarks")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    contention_parser = subcommands.add_parser(
+        "contention", help="get throughput with concurrent threads and processes"
+    )
+    contention_parser.add_argument("--entries", type=int, default=2000, help="Entries to preload")
+    contention_parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each run")
+    contention_parser.add_argument("--threads", default="1,2,4,8", help="Comma-separated thread counts")
+    contention_parser.add_argument("--processes", default="1,2,4", help="Comma-separated process counts")
+    contention_parser.set_defaults(func=contention)
+
+    encoding_parser = subcommands.add_parser(
+        "encoding", help="stored size and decode time of cache payload formats"
+    )
+    encoding_parser.add_argument("--entries", type=int, default=5000, help="Sample entries")
+    encoding_parser.add_argument("--rounds", type=int, default=5, help="Decode passes to time")
+    encoding_parser.set_defaults(func=encoding)
+
+    canonical_parser = subcommands.add_parser(
+        "canonical", help="cache hit rate per normalization version over replayed traffic"
+    )
+    canonical_parser.add_argument("--input", help="JSONL ({\"text\": ...}) or one text per line")
+    canonical_parser.add_argument("--db", help="Replay the texts stored in a cache database")
+    canonical_parser.add_argument("--messages", type=int, default=2000, help="Generated distinct messages")
+    canonical_parser.add_argument("--repeats", type=int, default=3, help="Most resends per generated message")
+    canonical_parser.set_defaults(func=canonical)
+
+    hits_parser = subcommands.add_parser("hits", help="latency of memory-tier cache hits")
+    hits_parser.add_argument("--entries", type=int, default=500, help="Cached entries")
+    hits_parser.add_argument("--lookups", type=int, default=50000, help="Cache lookups to time")
+    hits_parser.add_argument("--requests", type=int, default=2000, help="/extract requests to time")
+    hits_parser.set_defaults(func=hits)
+
+    policy_parser = subcommands.add_parser(
+        "policy", help="memory tier hit ratio per eviction policy over a replayed trace"
+    )
+    policy_parser.add_argument("--capacities", default="256KiB,1MiB,4MiB", help="Comma-separated byte budgets")
+    policy_parser.add_argument("--input", help="JSONL ({\"text\": ...}) or one text per line")
+    policy_parser.add_argument("--db", help="Replay the texts stored in a cache database")
+    policy_parser.add_argument("--hot", type=int, default=5000, help="Generated recurring messages")
+    policy_parser.add_argument("--skew", type=float, default=0.9, help="Zipf exponent of the recurring messages")
+    policy_parser.add_argument("--requests", type=int, default=100000, help="Generated interactive requests")
+    policy_parser.add_argument("--backfill", type=int, default=50000, help="Generated one-off backfill texts")
+    policy_parser.set_defaults(func=policy, messages=2000, repeats=3)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
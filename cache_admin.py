@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Maintenance commands for the local extraction cache.
+
+export: write the hottest entries (by hit count, then last access) of the
+SQLite cache to a snapshot file.
+
+    python cache_admin.py export cache-snapshot.bin --limit 50000
+
+import: load a snapshot into the SQLite cache in one transaction; entries
+already cached are kept. A running API can instead be pointed at the file
+with LOCAL_CACHE_SNAPSHOT_PATH, or sent it with POST /admin/cache/snapshot.
+
+    python cache_admin.py import cache-snapshot.bin --db cache/extraction_cache.sqlite3
+
+vacuum: rebuild a cache file created before incremental auto-vacuum was
+enabled, so evictions shrink it again. VACUUM copies the whole file and
+blocks every writer meanwhile; stop the API first.
+
+    python cache_admin.py vacuum --db cache/extraction_cache.sqlite3
+
+l2-standin: run a small in-memory server speaking the Redis protocol, to
+try out the shared cache tier (L2_CACHE_URL=redis://127.0.0.1:6379/0)
+without Redis. --delay-ms slows every reply down.
+
+    python cache_admin.py l2-standin --port 6379
+
+chroma-compact: collapse the ChromaDB documents of each text into one,
+stored under its cache key. Collections written before ids were derived
+from the cache key hold a document per request rather than per text.
+
+    python cache_admin.py chroma-compact
+"""
+import argparse
+import sys
+
+
+def open_cache(args):
+    from app.config import settings
+
+    if args.db:
+        settings.local_cache_db_path = args.db
+    settings.local_cache_enabled = True
+
+    from app.cache_store import LocalExtractionCache
+
+    return LocalExtractionCache()
+
+
+def export(args):
+    cache = open_cache(args)
+    with open(args.path, "wb") as handle:
+        entries = cache.export_snapshot(handle, args.limit)
+    print(f"exported {entries} entries to {args.path}")
+
+
+def import_(args):
+    cache = open_cache(args)
+    try:
+        with open(args.path, "rb") as handle:
+            result = cache.import_snapshot(handle)
+    except ValueError as e:
+        sys.exit(f"{args.path}: {e}")
+    cache.close()
+    if "skipped" in result:
+        sys.exit(f"{args.path}: {result['skipped']}")
+    print(f"imported {result['imported']} of {result['entries']} entries from {args.path}")
+
+
+def vacuum(args):
+    cache = open_cache(args)
+    cache.vacuum()
+    cache.close()
+    print(f"vacuumed {cache._db_path}")
+
+
+def l2_standin(args):
+    from resp_standin import RespStandInServer
+
+    server = RespStandInServer((args.host, args.port), delay_seconds=args.delay_ms / 1000)
+    host, port = server.server_address[:2]
+    print(f"serving the Redis protocol on {host}:{port} (L2_CACHE_URL=redis://{host}:{port}/0)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def chroma_compact(args):
+    from app.config import settings
+
+    if args.db:
+        settings.local_cache_db_path = args.db
+
+    from app.cache_store import local_cache
+    from app.database import chroma_manager
+    from app.extractor import extractor
+
+    if not chroma_manager.collection:
+        sys.exit(chroma_manager.disabled_reason or "ChromaDB is not available")
+    result = chroma_manager.compact(args.page_size, extractor.fingerprint)
+    local_cache.close()
+    print(
+        f"compacted {result['documents']} documents into {result['unique']} "
+        f"({result['removed']} removed)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local extraction cache maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subcommands.add_parser("export", help="write the hottest entries to a snapshot")
+    export_parser.add_argument("path", help="Snapshot file to write")
+    export_parser.add_argument("--limit", type=int, default=None, help="Entries to export, 0 for all")
+    export_parser.add_argument("--db", help="Cache database (default: LOCAL_CACHE_DB_PATH)")
+    export_parser.set_defaults(func=export)
+
+    import_parser = subcommands.add_parser("import", help="load a snapshot into the cache")
+    import_parser.add_argument("path", help="Snapshot file to load")
+    import_parser.add_argument("--db", help="Cache database (default: LOCAL_CACHE_DB_PATH)")
+    import_parser.set_defaults(func=import_)
+
+    vacuum_parser = subcommands.add_parser("vacuum", help="rebuild the cache file with incremental vacuum")
+    vacuum_parser.add_argument("--db", help="Cache database (default: LOCAL_CACHE_DB_PATH)")
+    vacuum_parser.set_defaults(func=vacuum)
+
+    standin_parser = subcommands.add_parser("l2-standin", help="serve a stand-in shared cache")
+    standin_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    standin_parser.add_argument("--port", type=int, default=6379, help="Port to listen on")
+    standin_parser.add_argument("--delay-ms", type=float, default=0.0, help="Delay before every reply")
+    standin_parser.set_defaults(func=l2_standin)
+
+    compact_parser = subcommands.add_parser("chroma-compact", help="merge duplicate ChromaDB documents")
+    compact_parser.add_argument("--page-size", type=int, default=1000, help="Documents read per request")
+    compact_parser.add_argument("--db", help="Cache database holding the extractions (default: LOCAL_CACHE_DB_PATH)")
+    compact_parser.set_defaults(func=chroma_compact)
+
+    args = parser.parse_args()
+    if getattr(args, "limit", 0) is None:
+        from app.config import settings
+
+        args.limit = settings.local_cache_snapshot_entries
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
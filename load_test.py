@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Concurrency load test for the /extract endpoint.
+
+Sends uncached extraction requests at increasing concurrency levels and
+reports throughput and latency for each level. With the async provider
+path, throughput should grow with concurrency until the provider itself
+saturates, instead of staying flat at one request per provider latency.
+
+Against a running API:
+    python load_test.py --url http://localhost:8000
+
+Self-contained (starts a stub Ollama with a fixed latency plus the API):
+    python load_test.py --self-hosted --stub-latency 0.5
+
+The stub serves any number of calls at once, so the self-hosted API is
+started with OLLAMA_NUM_PARALLEL at the highest concurrency level. Against
+a real server, set OLLAMA_NUM_PARALLEL on the API to match the Ollama
+server's own setting; beyond it, requests queue and are rejected with 429
+once the expected wait exceeds PROVIDER_MAX_QUEUE_WAIT_SECONDS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+STUB_RESPONSE = {
+    "client_name": "Load Test",
+    "company_name": None,
+    "phone_numbers": [{"number": "2392184565", "extension": None, "type": "primary"}],
+    "email": None,
+    "address": None,
+    "job_type": None,
+    "scheduled_date": None,
+    "appointment_time": None,
+    "notes": None,
+}
+
+
+def build_stub_ollama(latency: float):
+    """Minimal Ollama stand-in: /api/tags and a slow /api/chat."""
+    from fastapi import FastAPI
+
+    stub = FastAPI()
+
+    @stub.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "stub:latest"}]}
+
+    @stub.post("/api/chat")
+    async def chat(payload: dict):
+        await asyncio.sleep(latency)
+        return {
+            "model": payload.get("model", "stub"),
+            "message": {"role": "assistant", "content": json.dumps(STUB_RESPONSE)},
+            "done": True,
+        }
+
+    return stub
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def start_self_hosted(latency: float, num_parallel: int):
+    """Start the stub Ollama and the API as subprocesses; return (api_url, processes).
+
+    ``num_parallel`` is the API's provider concurrency limit.
+    """
+    stub_port = free_port()
+    api_port = free_port()
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+
+    stub_code = (
+        "import uvicorn, load_test; "
+        f"uvicorn.run(load_test.build_stub_ollama({latency}), host='127.0.0.1', "
+        f"port={stub_port}, log_level='warning')"
+    )
+    stub_proc = subprocess.Popen([sys.executable, "-c", stub_code], cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    env = dict(os.environ)
+    env.update({
+        "LLM_PROVIDER": "ollama",
+        "OLLAMA_BASE_URL": f"http://127.0.0.1:{stub_port}",
+        "OLLAMA_MODEL": "stub",
+        "OLLAMA_NUM_PARALLEL": str(num_parallel),
+        "ENABLE_FAST_MODE": "false",
+        "CHROMA_DISABLE": "true",
+        "LOCAL_CACHE_DB_PATH": os.path.join(workdir, "extraction_cache.sqlite3"),
+        "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "LOG_LEVEL": "WARNING",
+    })
+    api_proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(api_port), "--workers", "1", "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+    )
+
+    wait_for(f"http://127.0.0.1:{stub_port}/api/tags")
+    wait_for(f"http://127.0.0.1:{api_port}/")
+    return f"http://127.0.0.1:{api_port}", [api_proc, stub_proc]
+
+
+async def run_level(client: httpx.AsyncClient, url: str, concurrency: int, total: int):
+    """Send `total` unique uncached requests with `concurrency` in flight."""
+    latencies = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(f"Customer: LOAD TEST Phone: 239-218-4565 ref {uuid.uuid4().hex}")
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                text = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"{url}/extract", json={"text": text, "use_cache": False})
+                if response.status_code != 200 or not response.json().get("success"):
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "p50": statistics.median(latencies),
+        "p95": p95,
+    }
+
+
+async def run(url: str, levels, requests_per_level: int):
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        print(f"{'conc':>5} {'reqs':>5} {'errors':>6} {'req/s':>8} {'p50 (s)':>8} {'p95 (s)':>8}")
+        for level in levels:
+            result = await run_level(client, url, level, max(requests_per_level, level))
+            print(
+                f"{result['concurrency']:>5} {result['requests']:>5} {result['errors']:>6} "
+                f"{result['throughput']:>8.2f} {result['p50']:>8.3f} {result['p95']:>8.3f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the /extract endpoint")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--levels", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--self-hosted", action="store_true", help="Start a stub Ollama and the API locally")
+    parser.add_argument("--stub-latency", type=float, default=0.5, help="Stub Ollama latency in seconds")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    processes = []
+    url = args.url
+    if args.self_hosted:
+        url, processes = start_self_hosted(args.stub_latency, max(levels))
+        print(f"Self-hosted API at {url} (stub latency {args.stub_latency}s)")
+
+    try:
+        asyncio.run(run(url, levels, args.requests))
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
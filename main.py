@@ -1,16 +1,38 @@
+import asyncio
+import hmac
+import io
+import json
+import os
+import sqlite3
 from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 import logging
 import time
 from datetime import datetime
+from app.admission import AdmissionRejected
 from app.cache_store import local_cache
 from app.config import settings
-from app.models import ExtractionRequest, ExtractionResponse, HealthResponse
+from app.models import (
+    BatchExtractionRequest,
+    BatchExtractionResponse,
+    ExtractionRequest,
+    ExtractionResponse,
+    ExtractionTimings,
+    HealthResponse,
+    JobCreateRequest,
+    JobStatusResponse,
+    StageTiming,
+)
 from app.extractor import extractor
 from app.database import chroma_manager
+from app.health import health_prober
+from app.jobs import JobInputError, iter_jsonl_texts, job_runner, job_store
+from app.metrics import registry as metrics_registry
+from app.metrics import start_trace
 
 # Configure logging
 logging.basicConfig(
@@ -37,22 +59,69 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Tell clients to back off when the provider queue is saturated."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "retry_after": exc.retry_after},
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
+def warm_start_cache():
+    """Load the configured cache snapshot, then the hottest entries into memory."""
+    path = settings.local_cache_snapshot_path
+    if path and os.path.exists(path):
+        try:
+            with open(path, "rb") as handle:
+                local_cache.import_snapshot(handle)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logger.warning("Cache snapshot %s not loaded: %s", path, e)
+    elif path:
+        logger.warning("Cache snapshot %s not found", path)
+
+    if settings.local_cache_mmap_path:
+        local_cache.rebuild_mapped_snapshot()
+
+    if settings.local_cache_prime_memory:
+        primed = local_cache.prime_memory(extractor.fingerprint)
+        logger.info("Loaded %d cache entries into memory", primed)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
     logger.info("Starting Contact Info Finder API...")
 
-    # Check selected LLM provider.
-    if not extractor.health_check():
-        logger.warning("%s is not accessible.", extractor.provider_name())
+    # Requests are only accepted once this returns, so the first ones
+    # already find the snapshot and a warm memory tier.
+    await asyncio.to_thread(warm_start_cache)
 
-    # Check ChromaDB.
-    if not chroma_manager.health_check():
+    # Probe the selected LLM provider and ChromaDB once, then keep their
+    # health fresh in the background.
+    await health_prober.probe_all()
+    if not health_prober.is_healthy("provider"):
+        logger.warning("%s is not accessible.", extractor.provider_name())
+    if not health_prober.is_healthy("chromadb"):
         logger.warning("ChromaDB initialization failed.")
+    health_prober.start()
+
+    # Resume unfinished jobs and pick up new ones.
+    job_runner.start(run_extraction)
 
     logger.info("API startup complete")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    await job_runner.stop()
+    await health_prober.stop()
+    await asyncio.to_thread(local_cache.close)
+    await asyncio.to_thread(chroma_manager.close)
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
@@ -73,14 +142,15 @@ async def verify_ui():
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Check health status of all services"""
-    llm_status = extractor.provider_status()
-    ollama_status = "healthy" if settings.llm_provider == "ollama" and extractor.health_check() else (
+    provider_healthy = await extractor.is_available_async()
+    llm_status = extractor.provider_status(provider_healthy)
+    ollama_status = "healthy" if settings.llm_provider == "ollama" and provider_healthy else (
         "disabled" if settings.llm_provider != "ollama" else "unhealthy"
     )
-    chromadb_status = "healthy" if chroma_manager.health_check() else (
+    chromadb_status = "healthy" if health_prober.is_healthy("chromadb") else (
         "disabled" if chroma_manager.disabled_reason else "unhealthy"
     )
-    cache_stats = local_cache.get_stats()
+    cache_stats = await asyncio.to_thread(local_cache.get_stats)
     local_cache_status = "healthy" if cache_stats["enabled"] else "disabled"
 
     overall_status = (
@@ -100,80 +170,84 @@ async def health_check():
     )
 
 
-@app.post("/extract", response_model=ExtractionResponse, tags=["Extraction"])
-async def extract_contact_info(request: ExtractionRequest):
-    """
-    Extract contact information from text
-    
-    This endpoint analyzes unstructured text and extracts:
-    - Client name
-    - Company name
-    - Phone numbers (with extensions)
-    - Email addresses
-    - Physical addresses
-    """
-    start_time = time.time()
-    
-    try:
-        # Perform extraction
-        contact, cache_hit = extractor.extract(request.text, request.use_cache)
-        
-        processing_time = time.time() - start_time
-        
-        if not contact:
-            if not extractor.health_check():
-                return ExtractionResponse(
-                    success=False,
-                    status="error",
-                    data=None,
-                    error=extractor.unavailable_error_message(),
-                    processing_time=processing_time,
-                    cache_hit=cache_hit
-                )
-
+def build_extraction_response(
+    contact,
+    cache_hit: bool,
+    processing_time: float,
+    provider_available: bool = True,
+) -> ExtractionResponse:
+    """Turn an extractor result into the public response shape."""
+    if not contact:
+        if not provider_available:
             return ExtractionResponse(
-                success=True,
-                status="not_found",
+                success=False,
+                status="error",
                 data=None,
-                error=None,
+                error=extractor.unavailable_error_message(),
                 processing_time=processing_time,
                 cache_hit=cache_hit
             )
-        
-        # Check if any meaningful data was extracted
-        has_data = (
-            contact.client_name or 
-            contact.company_name or 
-            contact.email or 
-            contact.job_type or
-            contact.scheduled_date or
-            contact.appointment_time or
-            len(contact.phone_numbers) > 0 or
-            contact.notes or
-            (contact.address and any([
-                contact.address.street,
-                contact.address.city,
-                contact.address.state,
-                contact.address.postal_code
-            ]))
-        )
-        
+
         return ExtractionResponse(
             success=True,
-            status="found" if has_data else "not_found",
-            data=contact,
+            status="not_found",
+            data=None,
             error=None,
             processing_time=processing_time,
             cache_hit=cache_hit
         )
+
+    # Check if any meaningful data was extracted
+    has_data = (
+        contact.client_name or 
+        contact.company_name or 
+        contact.email or 
+        contact.job_type or
+        contact.scheduled_date or
+        contact.appointment_time or
+        len(contact.phone_numbers) > 0 or
+        contact.notes or
+        (contact.address and any([
+            contact.address.street,
+            contact.address.city,
+            contact.address.state,
+            contact.address.postal_code
+        ]))
+    )
+
+    return ExtractionResponse(
+        success=True,
+        status="found" if has_data else "not_found",
+        data=contact,
+        error=None,
+        processing_time=processing_time,
+        cache_hit=cache_hit
+    )
+
+
+async def run_extraction(text: str, use_cache: bool = True, include_timings: bool = False) -> ExtractionResponse:
+    """Extract one text, turning unexpected errors into an error response."""
+    start_time = time.time()
+    trace = start_trace() if include_timings else None
+    
+    try:
+        # Perform extraction
+        contact, cache_hit = await extractor.extract_async(text, use_cache)
+        
+        processing_time = time.time() - start_time
+        provider_available = True
+        if not contact:
+            provider_available = await extractor.is_available_async()
+
+        response = build_extraction_response(contact, cache_hit, processing_time, provider_available)
         
-    except HTTPException:
+    except (HTTPException, AdmissionRejected):
         raise
     except Exception as e:
         logger.error(f"Extraction error: {str(e)}")
         processing_time = time.time() - start_time
         
-        return ExtractionResponse(
+        response = ExtractionResponse(
             success=False,
             status="error",
             data=None,
@@ -182,13 +256,270 @@ async def extract_contact_info(request: ExtractionRequest):
             cache_hit=False
         )
 
+    if trace is not None:
+        response.timings = ExtractionTimings(
+            served_by=trace.served_by,
+            provider_attempts=trace.provider_attempts,
+            stages=[
+                StageTiming(stage=stage, duration_ms=round(seconds * 1000, 3))
+                for stage, seconds in trace.stages
+            ],
+        )
+    return response
+
+
+def server_timing_header(timings: ExtractionTimings, processing_time: float) -> str:
+    """Render stage timings as a Server-Timing header value."""
+    entries = [
+        f"{stage.stage};dur={stage.duration_ms}"
+        for stage in timings.stages
+    ]
+    entries.append(f'total;dur={round(processing_time * 1000, 3)};desc="{timings.served_by}"')
+    return ", ".join(entries)
+
+
+@app.post("/extract", response_model=ExtractionResponse, tags=["Extraction"])
+async def extract_contact_info(request: ExtractionRequest):
+    """
+    Extract contact information from text
+    
+    This endpoint analyzes unstructured text and extracts:
+    - Client name
+    - Company name
+    - Phone numbers (with extensions)
+    - Email addresses
+    - Physical addresses
+
+    Set ``include_timings`` to get a per-stage breakdown in ``timings`` and a
+    ``Server-Timing`` header.
+    """
+    result = await run_extraction(request.text, request.use_cache, request.include_timings)
+    headers = {}
+    if result.timings is not None:
+        headers["Server-Timing"] = server_timing_header(result.timings, result.processing_time)
+    # Returned as bytes: response_model would validate and encode it again.
+    return Response(result.model_dump_json().encode(), media_type="application/json", headers=headers)
+
+
+@app.post("/extract/batch", response_model=BatchExtractionResponse, tags=["Extraction"])
+async def extract_contact_info_batch(request: BatchExtractionRequest):
+    """
+    Extract contact information from many texts in one request
+
+    Identical texts (after whitespace normalization) are extracted once,
+    cache and fast-path hits are resolved together, and the remaining texts
+    are sent to the provider concurrently. Results are returned in input
+    order, each with its own processing time.
+
+    If the provider queue is saturated the batch is rejected with 429; items
+    that were already extracted are cached, so retrying it is cheap.
+    """
+    if len(request.texts) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the maximum of {settings.batch_max_items} texts",
+        )
+
+    start_time = time.time()
+    results = await extractor.extract_batch_async(request.texts, request.use_cache)
+
+    provider_available = True
+    if any(contact is None for contact, _, _ in results):
+        provider_available = await extractor.is_available_async()
+
+    return BatchExtractionResponse(
+        success=True,
+        results=[
+            build_extraction_response(contact, cache_hit, item_time, provider_available)
+            for contact, cache_hit, item_time in results
+        ],
+        total_items=len(request.texts),
+        unique_items=len({local_cache.cache_key(text) for text in request.texts}),
+        processing_time=time.time() - start_time,
+    )
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """Streaming response whose iterator may still be reading the request body.
+
+    Starlette's StreamingResponse watches for client disconnects by consuming
+    ``receive`` concurrently, which would steal body chunks from an iterator
+    that reads ``request.stream()``. Disconnects surface through
+    ``request.stream()`` instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    """Yield the non-blank lines of a streamed request body without buffering it."""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
+def parse_stream_item(line: bytes, default_use_cache: bool) -> Tuple[Optional[str], bool, Any]:
+    """Parse one NDJSON input line into ``(text, use_cache, client_id)``.
+
+    A line is either a JSON string or an object with ``text`` and optional
+    ``use_cache`` / ``id`` fields. ``text`` is ``None`` when the line is invalid.
+    """
+    try:
+        item = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None, default_use_cache, None
+
+    if isinstance(item, str):
+        text, use_cache, client_id = item, default_use_cache, None
+    elif isinstance(item, dict) and isinstance(item.get("text"), str):
+        text = item["text"]
+        use_cache = bool(item.get("use_cache", default_use_cache))
+        client_id = item.get("id")
+    else:
+        return None, default_use_cache, None
+
+    # The text is kept as sent; only the cache key is canonicalized.
+    return (text if text.strip() else None), use_cache, client_id
+
+
+async def stream_extractions(
+    lines: AsyncIterator[bytes],
+    use_cache: bool,
+    ordered: bool,
+    window: int,
+) -> AsyncIterator[bytes]:
+    """Extract NDJSON input lines with a bounded number of items held in memory.
+
+    At most ``window`` items are in flight or, in ordered mode, waiting in the
+    reorder buffer; the request body is only read further once a slot frees up.
+    """
+    in_flight: Set[asyncio.Task] = set()
+    reorder_buffer: Dict[int, bytes] = {}
+    next_to_emit = 0
+
+    async def extract_line(index: int, line: bytes) -> Tuple[int, bytes]:
+        text, item_use_cache, client_id = parse_stream_item(line, use_cache)
+        if text is None:
+            response = ExtractionResponse(
+                success=False,
+                status="error",
+                error="Invalid NDJSON item: expected a JSON string or an object with a 'text' field",
+                processing_time=0.0,
+            )
+        else:
+            try:
+                response = await run_extraction(text, item_use_cache)
+            except AdmissionRejected as exc:
+                response = ExtractionResponse(
+                    success=False,
+                    status="error",
+                    error=f"{exc} (retry after {exc.retry_after_header}s)",
+                    processing_time=0.0,
+                )
+        payload = {"index": index, "id": client_id, **response.model_dump(mode="json")}
+        return index, (json.dumps(payload) + "\n").encode("utf-8")
+
+    def collect(done: Set[asyncio.Task]) -> List[bytes]:
+        nonlocal next_to_emit
+        if not ordered:
+            return [task.result()[1] for task in done]
+
+        for task in done:
+            index, encoded = task.result()
+            reorder_buffer[index] = encoded
+        ready = []
+        while next_to_emit in reorder_buffer:
+            ready.append(reorder_buffer.pop(next_to_emit))
+            next_to_emit += 1
+        return ready
+
+    try:
+        index = 0
+        async for line in lines:
+            in_flight.add(asyncio.create_task(extract_line(index, line)))
+            index += 1
+            while in_flight and len(in_flight) + len(reorder_buffer) >= window:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for encoded in collect(done):
+                    yield encoded
+
+        while in_flight:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for encoded in collect(done):
+                yield encoded
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+@app.post("/extract/stream", tags=["Extraction"])
+async def extract_contact_info_stream(request: Request, use_cache: bool = True, ordered: bool = False):
+    """
+    Extract contact information from an NDJSON stream
+
+    The request body is read line by line; each line is a JSON string or an
+    object with ``text`` (and optional ``id`` / ``use_cache``). Each result is
+    written back as one NDJSON line as soon as it completes, tagged with the
+    input ``index``. Pass ``ordered=true`` to receive results in input order.
+    """
+    window = max(1, settings.stream_max_in_flight)
+    return BodyStreamingResponse(
+        stream_extractions(iter_ndjson_lines(request), use_cache, ordered, window),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/jobs", response_model=JobStatusResponse, status_code=202, tags=["Jobs"])
+async def create_job(request: JobCreateRequest):
+    """
+    Queue a bulk extraction job
+
+    Accepts either a list of texts or the path of a JSONL file on the server
+    (one JSON string, or one object with ``text_field``, per line). Items are
+    persisted and processed in the background; poll ``GET /jobs/{job_id}``.
+    """
+    if request.texts:
+        texts = iter(request.texts)
+        source = "request"
+    else:
+        texts = iter_jsonl_texts(request.path, request.text_field)
+        source = request.path
+
+    try:
+        job_id = await asyncio.to_thread(job_store.create_job, texts, source, request.use_cache)
+    except JobInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job_runner.notify()
+    return await asyncio.to_thread(job_store.get_job, job_id, 0, 0)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse, tags=["Jobs"])
+async def get_job(job_id: str, offset: int = 0, limit: int = 100):
+    """Report job progress and throughput, with a page of finished results."""
+    job = await asyncio.to_thread(job_store.get_job, job_id, max(0, offset), min(max(0, limit), 1000))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 
 @app.get("/stats", tags=["Statistics"])
 async def get_statistics():
     """Get extraction statistics"""
     try:
-        stats = chroma_manager.get_stats()
-        stats["local_cache"] = local_cache.get_stats()
+        stats = await asyncio.to_thread(chroma_manager.get_stats)
+        stats["local_cache"] = await asyncio.to_thread(local_cache.get_stats)
+        stats["extractor"] = extractor.get_stats()
+        stats["health"] = health_prober.get_stats()
         stats["llm_provider"] = settings.llm_provider
         return {
             "success": True,
@@ -199,6 +530,64 @@ async def get_statistics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Statistics"])
+async def get_metrics():
+    """Expose pipeline latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def check_admin_token(token: Optional[str]):
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if not token or not hmac.compare_digest(token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@app.get("/admin/cache/snapshot", tags=["Admin"])
+async def export_cache_snapshot(limit: Optional[int] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Download a snapshot of the hottest local cache entries
+
+    ``limit`` defaults to ``LOCAL_CACHE_SNAPSHOT_ENTRIES``; 0 exports every
+    entry. Load the file on another instance with ``POST`` to this path or
+    ``LOCAL_CACHE_SNAPSHOT_PATH``.
+    """
+    check_admin_token(x_admin_token)
+    buffer = io.BytesIO()
+    entries = await asyncio.to_thread(
+        local_cache.export_snapshot,
+        buffer,
+        settings.local_cache_snapshot_entries if limit is None else max(0, limit),
+    )
+    return Response(
+        buffer.getvalue(),
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": 'attachment; filename="cache-snapshot.bin"',
+            "X-Snapshot-Entries": str(entries),
+        },
+    )
+
+
+@app.post("/admin/cache/snapshot", tags=["Admin"])
+async def import_cache_snapshot(
+    request: Request, prime_memory: bool = True, x_admin_token: Optional[str] = Header(None)
+):
+    """Load a snapshot sent as the request body into the local cache."""
+    check_admin_token(x_admin_token)
+    body = await request.body()
+    try:
+        result = await asyncio.to_thread(local_cache.import_snapshot, io.BytesIO(body))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if prime_memory:
+        result["primed"] = await asyncio.to_thread(local_cache.prime_memory, extractor.fingerprint)
+    return {"success": True, **result}
+
+
 @app.post("/feedback", tags=["Feedback"])
 async def submit_feedback(extraction_id: str, corrections: dict):
     """Submit corrections for an extraction to improve future results"""
@@ -0,0 +1,89 @@
+"""
+An in-memory server speaking the Redis protocol, to try out the shared
+cache tier (L2_CACHE_URL) and to test it without Redis.
+
+    python cache_admin.py l2-standin --port 6379
+"""
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.cache_l2 import read_reply
+
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server: "RespStandInServer" = self.server
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+            if not isinstance(command, list) or not command:
+                self.wfile.write(b"-ERR expected a command array\r\n")
+                continue
+            if server.delay_seconds:
+                time.sleep(server.delay_seconds)
+            self.wfile.write(server.execute([part if isinstance(part, bytes) else b"" for part in command]))
+
+
+class RespStandInServer(socketserver.ThreadingTCPServer):
+    """A small in-memory server speaking the Redis protocol, for local testing.
+
+    Supports PING, AUTH, SELECT, GET, MGET, SET (with EX/PX), DEL, DBSIZE and
+    FLUSHDB. ``delay_seconds`` slows every reply down, to try out a slow
+    shared tier. Run one with ``python cache_admin.py l2-standin``.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 0), delay_seconds: float = 0.0):
+        super().__init__(address, _StandInHandler)
+        self.delay_seconds = delay_seconds
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._data_lock = threading.Lock()
+
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def execute(self, command: List[bytes]) -> bytes:
+        name, args = command[0].upper(), command[1:]
+        with self._data_lock:
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name in (b"AUTH", b"SELECT"):
+                return b"+OK\r\n"
+            if name == b"GET" and len(args) == 1:
+                return self._bulk(self._get(args[0]))
+            if name == b"MGET" and args:
+                return b"*%d\r\n" % len(args) + b"".join(self._bulk(self._get(key)) for key in args)
+            if name == b"SET" and len(args) >= 2:
+                expires_at = None
+                options = [arg.upper() for arg in args[2:]]
+                for option, value in zip(options, args[3:]):
+                    if option == b"EX":
+                        expires_at = time.monotonic() + int(value)
+                    elif option == b"PX":
+                        expires_at = time.monotonic() + int(value) / 1000
+                self._data[args[0]] = (args[1], expires_at)
+                return b"+OK\r\n"
+            if name == b"DEL":
+                return b":%d\r\n" % sum(1 for key in args if self._data.pop(key, None) is not None)
+            if name == b"DBSIZE":
+                return b":%d\r\n" % len(self._data)
+            if name == b"FLUSHDB":
+                self._data.clear()
+                return b"+OK\r\n"
+        return b"-ERR unsupported command '%s'\r\n" % name
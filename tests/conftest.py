@@ -0,0 +1,121 @@
+"""Shared fixtures: an isolated cache directory and a stub provider.
+
+Settings are read from the environment when ``app.config`` is imported,
+so it is configured here before any application module is loaded.
+"""
+import asyncio
+import os
+import re
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+import pytest
+
+_DATA_DIRECTORY = tempfile.mkdtemp(prefix="contact-info-tests-")
+
+os.environ.update(
+    CHROMA_DISABLE="1",
+    LLM_PROVIDER="ollama",
+    LLM_ENABLED="true",
+    # Nothing listens here; provider calls go through StubProvider.
+    OLLAMA_BASE_URL="http://127.0.0.1:9",
+    ENABLE_FAST_MODE="false",
+    LOCAL_CACHE_DB_PATH=os.path.join(_DATA_DIRECTORY, "extraction_cache.sqlite3"),
+    LOCAL_CACHE_MMAP_PATH="",
+    LOCAL_CACHE_SNAPSHOT_PATH="",
+    L2_CACHE_URL="",
+    JOBS_DB_PATH=os.path.join(_DATA_DIRECTORY, "jobs.sqlite3"),
+    JOBS_INPUT_DIRECTORY=os.path.join(_DATA_DIRECTORY, "jobs"),
+    CHROMA_SPILL_PATH=os.path.join(_DATA_DIRECTORY, "chroma_spill.jsonl"),
+    HEALTH_PROBE_INTERVAL_SECONDS="3600",
+    LOG_LEVEL="WARNING",
+)
+os.makedirs(os.environ["JOBS_INPUT_DIRECTORY"], exist_ok=True)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_PHONE = re.compile(r"\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})")
+_NAME = re.compile(r"(?:Customer|Name):\s*([A-Z][a-z]+ [A-Z][a-z]+)")
+
+
+def default_reply(text: str) -> Dict:
+    """What the stub provider answers: the labelled name and the phones in ``text``."""
+    name = _NAME.search(text)
+    return {
+        "client_name": name.group(1) if name else None,
+        "phone_numbers": [
+            {"number": "-".join(match.groups()), "type": "primary"} for match in _PHONE.finditer(text)
+        ],
+    }
+
+
+class StubProvider:
+    """Stands in for the Ollama client behind ``extractor._extract_with_ollama_async``.
+
+    Answers with ``reply(text)`` after ``delay`` seconds and records every
+    text it was called with.
+    """
+
+    def __init__(self, reply: Callable[[str], Optional[Dict]] = default_reply, delay: float = 0.0):
+        self.reply = reply
+        self.delay = delay
+        self.calls: List[str] = []
+
+    async def __call__(self, text: str) -> Optional[Dict]:
+        self.calls.append(text)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.reply(text)
+
+
+@pytest.fixture
+def stub_provider(monkeypatch):
+    from app.extractor import extractor
+    from app.health import health_prober
+    from app.similarity_cache import similarity_cache
+    from app.template_cache import template_cache
+
+    async def healthy() -> bool:
+        return True
+
+    stub = StubProvider()
+    monkeypatch.setattr(extractor, "_extract_with_ollama_async", stub)
+    # Both are off by default; test texts share one format, so they are kept
+    # off here even if the environment enables them. Their own tests turn
+    # them back on.
+    monkeypatch.setattr(template_cache, "enabled", False)
+    monkeypatch.setattr(similarity_cache, "enabled", False)
+    monkeypatch.setitem(health_prober._checks, "provider", healthy)
+    monkeypatch.setitem(health_prober._healthy, "provider", True)
+    return stub
+
+
+@pytest.fixture
+def client(stub_provider):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_cache(tmp_path, monkeypatch):
+    """Build a separate LocalExtractionCache in ``tmp_path`` with settings overridden."""
+    from app.cache_store import LocalExtractionCache
+    from app.config import settings
+
+    caches = []
+
+    def make(**overrides) -> LocalExtractionCache:
+        monkeypatch.setattr(settings, "local_cache_db_path", str(tmp_path / "cache.sqlite3"))
+        for name, value in overrides.items():
+            monkeypatch.setattr(settings, name, value)
+        cache = LocalExtractionCache()
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
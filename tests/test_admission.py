@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from app.admission import AdmissionRejected, ProviderLimiter
+from app.extractor import extractor
+
+
+def test_limiter_rejects_when_the_queue_is_full():
+    async def scenario():
+        limiter = ProviderLimiter("stub", max_concurrency=1, max_queue=1, max_wait_seconds=60, initial_service_seconds=1)
+        held = await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        limiter.release(held)
+        limiter.release(await waiting)
+        return limiter.get_stats(), rejected.value
+
+    stats, rejected = asyncio.run(scenario())
+
+    assert "queue is full" in rejected.reason
+    assert stats["admitted"] == 2
+    assert stats["rejected"] == 1
+    assert stats["active"] == 0
+
+
+def test_limiter_rejects_an_expected_wait_past_the_deadline():
+    async def scenario():
+        limiter = ProviderLimiter("stub", max_concurrency=1, max_queue=10, max_wait_seconds=1, initial_service_seconds=2)
+        held = await limiter.acquire()
+        try:
+            await limiter.acquire()
+        finally:
+            limiter.release(held)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(scenario())
+
+    assert rejected.value.retry_after == pytest.approx(2)
+    assert rejected.value.retry_after_header == "2"
+
+
+def test_saturated_provider_answers_429_with_retry_after(stub_provider, monkeypatch):
+    stub_provider.delay = 0.3
+
+    async def scenario():
+        monkeypatch.setattr(extractor, "limiter", ProviderLimiter(
+            "stub", max_concurrency=1, max_queue=0, max_wait_seconds=60, initial_service_seconds=1,
+        ))
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post("/extract", json={"text": f"Customer: Kim Reyes Phone: 239-555-05{index:02d}"})
+                for index in range(3)
+            ))
+
+    responses = asyncio.run(scenario())
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 429, 429]
+    rejected = next(response for response in responses if response.status_code == 429)
+    assert rejected.headers["Retry-After"] == "1"
+    assert len(stub_provider.calls) == 1
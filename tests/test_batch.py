@@ -0,0 +1,29 @@
+from app.config import settings
+
+
+def test_batch_extracts_duplicates_once_in_input_order(client, stub_provider):
+    texts = [
+        "Customer: Carol King Phone: 239-555-0201",
+        "Customer: Dan Brown Phone: 239-555-0202",
+        "Customer:  Carol King   Phone: 239-555-0201",
+    ]
+
+    response = client.post("/extract/batch", json={"texts": texts})
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["total_items"] == 3
+    assert body["unique_items"] == 2
+    assert [item["data"]["client_name"] for item in body["results"]] == [
+        "Carol King", "Dan Brown", "Carol King",
+    ]
+    assert len(stub_provider.calls) == 2
+
+
+def test_batch_over_the_item_limit_is_rejected(client, stub_provider, monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_items", 2)
+
+    response = client.post("/extract/batch", json={"texts": ["a 239-555-0203", "b", "c"]})
+
+    assert response.status_code == 413
+    assert stub_provider.calls == []
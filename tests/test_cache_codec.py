@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from app.cache_codec import (
+    LEGACY_FORMAT,
+    PAYLOAD_FORMAT,
+    decode_extraction,
+    encode_extraction,
+    payload_format,
+    schema_version,
+)
+from app.models import ExtractedContact
+
+TEXT = "Customer: Vera Wynn Phone: 239-555-1301 vera@gmail.com"
+
+
+def extraction_data() -> dict:
+    return ExtractedContact(
+        client_name="Vera Wynn",
+        email="vera@gmail.com",
+        phone_numbers=[{"number": "239-555-1301", "type": "primary"}],
+        raw_text=TEXT,
+    ).model_dump(mode="json")
+
+
+def test_round_trip_restores_the_model_and_takes_raw_text_from_the_lookup():
+    data = extraction_data()
+
+    payload = encode_extraction(data)
+    decoded = decode_extraction(payload, PAYLOAD_FORMAT, "the looked up text")
+
+    assert b"raw_text" not in payload
+    assert len(payload) < len(json.dumps(data))
+    assert ExtractedContact(**decoded) == ExtractedContact(**{**data, "raw_text": "the looked up text"})
+
+
+def test_legacy_json_and_unknown_formats():
+    data = extraction_data()
+
+    assert decode_extraction(json.dumps(data), LEGACY_FORMAT, TEXT) == data
+    with pytest.raises(ValueError):
+        decode_extraction(b"", "zd9", TEXT)
+    assert payload_format("v2") == LEGACY_FORMAT
+    assert payload_format(schema_version("v2")) == PAYLOAD_FORMAT
+
+
+def test_legacy_rows_are_re_encoded_in_place(make_cache):
+    cache = make_cache()
+    cache._connection().execute(
+        """
+        INSERT INTO extraction_cache
+            (cache_key, normalized_text, payload, provider, model, schema_version,
+             fingerprint, created_at, last_accessed_at)
+        VALUES (?, ?, ?, 'ollama', 'stub', 'v2', '', '2026-01-01T00:00:00', '2026-01-01T00:00:00')
+        """,
+        (cache.cache_key(TEXT), cache._normalize_text(TEXT), json.dumps(extraction_data())),
+    )
+    cache._connection().commit()
+    cache._payloads_migrated = False
+
+    assert cache.migrate_payloads() is False
+
+    version = cache._connection().execute("SELECT schema_version FROM extraction_cache").fetchone()[0]
+    assert version == schema_version("v2")
+    assert cache.lookup(TEXT)[0].client_name == "Vera Wynn"
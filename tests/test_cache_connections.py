@@ -0,0 +1,50 @@
+import multiprocessing
+import threading
+
+from app.cache_policy import make_policy
+from app.models import ExtractedContact
+
+
+def contact(text: str) -> ExtractedContact:
+    return ExtractedContact(client_name="Quin Rae", phone_numbers=[{"number": "239-555-0901"}], raw_text=text)
+
+
+def test_cache_runs_in_wal_mode_with_a_connection_per_thread(make_cache):
+    cache = make_cache()
+    connections = []
+
+    def open_connection():
+        connections.append(cache._connection())
+
+    thread = threading.Thread(target=open_connection)
+    thread.start()
+    thread.join()
+
+    assert cache._connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connections[0] is not cache._connection()
+    assert cache._connection() is cache._connection()
+
+
+def _read_in_child(cache, text, results):
+    found, tier = cache.lookup(text)
+    results.put((found.client_name if found else None, tier, cache._connection() is not None))
+
+
+def test_forked_worker_reconnects_and_reads_flushed_entries(make_cache):
+    cache = make_cache()
+    text = "Customer: Quin Rae Phone: 239-555-0901"
+    cache.set(text, contact(text), "ollama", "stub")
+    cache.flush()
+    cache._connection()
+    # A fresh memory tier, so the child has to read SQLite itself.
+    cache._memory = make_policy("lru", cache._memory.max_bytes)
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=_read_in_child, args=(cache, text, results))
+    child.start()
+    outcome = results.get(timeout=10)
+    child.join(timeout=10)
+
+    assert outcome == ("Quin Rae", "sqlite", True)
+    assert child.exitcode == 0
@@ -0,0 +1,71 @@
+import sqlite3
+import time
+
+from app.models import ExtractedContact
+
+
+def contact(text: str) -> ExtractedContact:
+    return ExtractedContact(client_name="Sam Tate", phone_numbers=[{"number": "239-555-1201"}], raw_text=text)
+
+
+def usage(cache, text):
+    return cache._connection().execute(
+        "SELECT hit_count, last_accessed_at FROM extraction_cache WHERE cache_key = ?",
+        (cache.cache_key(text),),
+    ).fetchone()
+
+
+def test_memory_hits_reach_sqlite_and_keep_hot_entries(make_cache):
+    cache = make_cache(local_cache_flush_interval_seconds=3600, local_cache_max_rows=1)
+    hot, cold = "Customer: Sam Tate Phone: 239-555-1201", "Customer: Uma Vance Phone: 239-555-1202"
+    cache.set(hot, contact(hot), "ollama", "stub")
+    time.sleep(0.01)
+    cache.set(cold, contact(cold), "ollama", "stub")
+    cache.flush()
+    _, written_at = usage(cache, hot)
+    time.sleep(0.01)
+
+    for _ in range(3):
+        assert cache.lookup(hot)[1] == "memory"
+    assert cache.get_many([hot])[cache.cache_key(hot)][1] == "memory"
+    assert cache.get_stats()["pending_writes"] == 1
+    cache.flush()
+
+    hit_count, accessed_at = usage(cache, hot)
+    assert hit_count == 4
+    assert accessed_at > written_at
+    assert cache.evict() is False
+    assert usage(cache, hot) is not None
+    assert usage(cache, cold) is None
+
+
+def test_eviction_never_runs_a_full_vacuum(make_cache, tmp_path):
+    legacy = sqlite3.connect(tmp_path / "cache.sqlite3")
+    legacy.execute("CREATE TABLE legacy (value TEXT)")
+    legacy.commit()
+    legacy.close()
+    cache = make_cache(local_cache_max_rows=1)
+    for index in range(3):
+        text = f"Customer: Sam Tate Phone: 239-555-12{index:02d}"
+        cache.set(text, contact(text), "ollama", "stub")
+    cache.flush()
+
+    assert cache.evict() is False
+    assert cache.get_stats()["evictions"] == 2
+    assert cache._connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    cache.vacuum()
+    assert cache._connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_entries_past_the_maximum_age_are_evicted(make_cache):
+    cache = make_cache(local_cache_max_age_days=1.0)
+    text = "Customer: Sam Tate Phone: 239-555-1299"
+    cache.set(text, contact(text), "ollama", "stub")
+    cache.flush()
+    cache._connection().execute("UPDATE extraction_cache SET last_accessed_at = '2000-01-01T00:00:00'")
+    cache._connection().commit()
+
+    cache.evict()
+
+    assert usage(cache, text) is None
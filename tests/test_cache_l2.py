@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from app.cache_l2 import L2Error, RedisBackend
+from app.models import ExtractedContact
+from resp_standin import RespStandInServer
+
+TEXT = "Customer: Wyn Xu Phone: 239-555-2001"
+
+
+@pytest.fixture
+def standin():
+    server = RespStandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url_of(server) -> str:
+    host, port = server.server_address[:2]
+    return f"redis://user:secret@{host}:{port}/2"
+
+
+def test_client_round_trip_against_the_standin(standin):
+    backend = RedisBackend(url_of(standin), timeout_seconds=1.0)
+
+    backend.set_many([("a", b"1"), ("b", b"\r\n binary \x00")], ttl_seconds=60)
+
+    assert backend.get_many(["a", "b", "missing"]) == [b"1", b"\r\n binary \x00", None]
+    assert standin.execute([b"DBSIZE"]) == b":2\r\n"
+    with pytest.raises(L2Error):
+        backend._execute([("HGET", "a", "b")])
+    assert backend.get_many(["a"]) == [b"1"]
+    backend.close()
+
+
+def test_entries_written_by_one_cache_are_read_by_another(standin, make_cache, tmp_path):
+    writer = make_cache(l2_cache_url=url_of(standin))
+    writer.set(TEXT, ExtractedContact(client_name="Wyn Xu", raw_text=TEXT), "ollama", "stub", "fp")
+    writer._l2.close()
+    deadline = time.time() + 5
+    while standin.execute([b"DBSIZE"]) == b":0\r\n" and time.time() < deadline:
+        time.sleep(0.01)
+
+    reader = make_cache(l2_cache_url=url_of(standin), local_cache_db_path=str(tmp_path / "reader.sqlite3"))
+    extraction, tier = reader.lookup(TEXT, "fp")
+
+    assert tier == "l2"
+    assert extraction.client_name == "Wyn Xu"
+    assert reader.lookup(TEXT, "fp")[1] == "memory"
+
+
+def test_an_unreachable_tier_is_a_miss(make_cache):
+    cache = make_cache(l2_cache_url="redis://127.0.0.1:9/0", l2_cache_retry_seconds=60)
+
+    assert cache.lookup(TEXT) == (None, None)
+    assert cache.lookup(TEXT) == (None, None)
+    assert cache._l2.get_stats()["errors"] == 1
@@ -0,0 +1,76 @@
+import time
+
+from app.cache_mmap import MappedSnapshot
+from app.models import ExtractedContact
+
+TEXT = "Customer: Xena Yost Phone: 239-555-2101"
+
+
+def contact(name: str) -> ExtractedContact:
+    return ExtractedContact(client_name=name, phone_numbers=[{"number": "239-555-2101"}], raw_text=TEXT)
+
+
+def mapped_cache(make_cache, tmp_path):
+    cache = make_cache(local_cache_mmap_path=str(tmp_path / "cache.mmap"))
+    cache._mapped = MappedSnapshot(cache._mapped.path, check_interval_seconds=0)
+    return cache
+
+
+def test_mapped_entries_are_served(make_cache, tmp_path):
+    cache = mapped_cache(make_cache, tmp_path)
+    cache.set(TEXT, contact("Xena Yost"), "ollama", "stub", "fp")
+    cache.flush()
+    assert cache.rebuild_mapped_snapshot(force=True) == 1
+    cache._memory.clear()
+
+    extraction, tier = cache.lookup(TEXT, "fp")
+
+    assert tier == "mmap"
+    assert extraction.client_name == "Xena Yost"
+
+
+def test_a_key_this_process_rewrote_is_read_from_sqlite_until_the_rebuild(make_cache, tmp_path):
+    cache = mapped_cache(make_cache, tmp_path)
+    cache.set(TEXT, contact("Old Name"), "ollama", "stub", "fp")
+    cache.flush()
+    cache.rebuild_mapped_snapshot(force=True)
+    time.sleep(0.001)
+    cache.set(TEXT, contact("New Name"), "ollama", "stub", "fp")
+    cache.flush()
+    cache._memory.clear()
+
+    extraction, tier = cache.lookup(TEXT, "fp")
+    cache._memory.clear()
+    batch = cache.get_many([TEXT], "fp")
+
+    assert (extraction.client_name, tier) == ("New Name", "sqlite")
+    assert batch[cache.cache_key(TEXT)][0].client_name == "New Name"
+    assert batch[cache.cache_key(TEXT)][1] == "sqlite"
+    assert cache.get_stats()["mmap"]["superseded"] == 2
+
+    cache.rebuild_mapped_snapshot(force=True)
+    cache._memory.clear()
+
+    assert cache.lookup(TEXT, "fp")[1] == "mmap"
+    assert cache.get_stats()["mmap"]["rewritten_keys"] == 0
+
+
+def test_another_process_rewrite_shows_after_the_next_rebuild(make_cache, tmp_path):
+    cache = mapped_cache(make_cache, tmp_path)
+    cache.set(TEXT, contact("Old Name"), "ollama", "stub", "fp")
+    cache.flush()
+    cache.rebuild_mapped_snapshot(force=True)
+    time.sleep(0.001)
+    other = make_cache()
+    other.set(TEXT, contact("New Name"), "ollama", "stub", "fp")
+    other.flush()
+    cache._memory.clear()
+
+    # Up to a rebuild interval stale: the snapshot is not checked against SQLite.
+    assert cache.lookup(TEXT, "fp")[0].client_name == "Old Name"
+
+    cache.rebuild_mapped_snapshot(force=True)
+    cache._memory.clear()
+
+    extraction, tier = cache.lookup(TEXT, "fp")
+    assert (extraction.client_name, tier) == ("New Name", "mmap")
@@ -0,0 +1,70 @@
+import pytest
+
+from app.cache_policy import FrequencySketch, LRUPolicy, WTinyLFUPolicy, make_policy
+
+
+def test_lru_keeps_recently_used_entries_within_the_budget():
+    policy = LRUPolicy(max_bytes=300)
+    for key in ("a", "b", "c"):
+        policy.put(key, key.upper(), 100)
+    policy.get("a")
+
+    policy.put("d", "D", 100)
+    policy.put("huge", "H", 301)
+
+    assert "b" not in policy and "huge" not in policy
+    assert [policy.get(key) for key in ("a", "c", "d")] == ["A", "C", "D"]
+    assert policy.get_stats() == {"policy": "lru", "entries": 3, "bytes": 300, "evictions": 2}
+
+
+def test_sketch_counts_and_ages():
+    sketch = FrequencySketch(16)
+    for _ in range(20):
+        sketch.increment("hot")
+    sketch.increment("warm")
+
+    assert sketch.frequency("hot") == 15
+    assert sketch.frequency("warm") >= 1
+    assert sketch.frequency("never") <= sketch.frequency("warm")
+
+    for index in range(10 * 16):
+        sketch.increment(f"filler-{index}")
+    assert sketch.frequency("hot") < 15
+
+
+def test_tinylfu_keeps_popular_entries_through_a_scan():
+    policy = WTinyLFUPolicy(max_bytes=100 * 100)
+    hot = [f"hot-{index}" for index in range(50)]
+    for key in hot:
+        policy.put(key, key, 100)
+    for _ in range(5):
+        for key in hot:
+            policy.get(key)
+
+    for index in range(2000):
+        key = f"scan-{index}"
+        policy.get(key)
+        policy.put(key, key, 100)
+
+    # The sketch is approximate, so a collision may cost one or two.
+    assert sum(key in policy for key in hot) >= len(hot) - 2
+    assert policy.bytes_used <= policy.max_bytes
+    assert policy.get_stats()["protected_entries"] > 0
+
+
+def test_lru_loses_them_to_the_same_scan():
+    policy = LRUPolicy(max_bytes=100 * 100)
+    for index in range(50):
+        policy.put(f"hot-{index}", index, 100)
+
+    for index in range(2000):
+        policy.put(f"scan-{index}", index, 100)
+
+    assert not any(f"hot-{index}" in policy for index in range(50))
+
+
+def test_policies_by_name():
+    assert make_policy("lru", 10).name == "lru"
+    assert make_policy("tinylfu", 10).name == "tinylfu"
+    with pytest.raises(ValueError):
+        make_policy("fifo", 10)
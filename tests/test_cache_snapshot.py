@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from app.config import settings
+from app.models import ExtractedContact
+
+
+def entry(index: int):
+    text = f"Customer: Val West Phone: 239-555-19{index:02d}"
+    return text, ExtractedContact(client_name="Val West", phone_numbers=[{"number": text[-12:]}], raw_text=text)
+
+
+def test_export_then_import_keeps_entries_and_hottest_first(make_cache, tmp_path):
+    source = make_cache()
+    for index in range(3):
+        source.set(*entry(index), "ollama", "stub", "fp")
+    source.flush()
+    source.lookup(entry(2)[0])
+    snapshot = io.BytesIO()
+
+    assert source.export_snapshot(snapshot, limit=2) == 2
+
+    target = make_cache(local_cache_db_path=str(tmp_path / "target.sqlite3"))
+    snapshot.seek(0)
+    assert target.import_snapshot(snapshot) == {"entries": 2, "imported": 2}
+    text, expected = entry(2)
+    extraction, tier = target.lookup(text, "fp")
+    assert tier == "sqlite"
+    assert extraction.phone_numbers == expected.phone_numbers
+    assert extraction.raw_text == text
+
+
+def test_existing_entries_are_kept_on_import(make_cache, tmp_path):
+    source = make_cache()
+    text, contact = entry(5)
+    source.set(text, contact, "ollama", "stub")
+    snapshot = io.BytesIO()
+    source.export_snapshot(snapshot)
+
+    target = make_cache(local_cache_db_path=str(tmp_path / "target.sqlite3"))
+    target.set(text, contact.model_copy(update={"client_name": "Newer"}), "ollama", "stub")
+    target.flush()
+    snapshot.seek(0)
+
+    assert target.import_snapshot(snapshot)["imported"] == 0
+    target._memory.clear()
+    assert target.lookup(text)[0].client_name == "Newer"
+
+
+def test_a_file_that_is_not_a_snapshot_is_rejected(make_cache):
+    with pytest.raises(ValueError):
+        make_cache().import_snapshot(io.BytesIO(b"not a snapshot"))
+
+
+def test_a_snapshot_from_another_normalization_version_is_skipped(make_cache, tmp_path, monkeypatch):
+    source = make_cache()
+    source.set(*entry(7), "ollama", "stub")
+    snapshot = io.BytesIO()
+    source.export_snapshot(snapshot)
+    monkeypatch.setattr(settings, "cache_normalization_version", "v1")
+
+    target = make_cache(local_cache_db_path=str(tmp_path / "target.sqlite3"))
+    snapshot.seek(0)
+    result = target.import_snapshot(snapshot)
+
+    assert result["imported"] == 0
+    assert "'v2'" in result["skipped"]
+    assert target.connection().execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0] == 0
@@ -0,0 +1,58 @@
+import sqlite3
+
+from app.models import ExtractedContact
+
+TEXT = "Customer: Rita Sol Phone: 239-555-1101"
+
+
+def contact(text: str = TEXT) -> ExtractedContact:
+    return ExtractedContact(client_name="Rita Sol", phone_numbers=[{"number": "239-555-1101"}], raw_text=text)
+
+
+def stored_rows(cache) -> int:
+    return cache._connection().execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+
+
+def test_inserts_are_served_before_they_are_flushed(make_cache):
+    cache = make_cache(local_cache_flush_interval_seconds=3600)
+
+    cache.set(TEXT, contact(), "ollama", "stub")
+
+    assert stored_rows(cache) == 0
+    assert cache.get_stats()["pending_writes"] == 1
+    assert cache.lookup(TEXT)[1] == "memory"
+    assert cache.flush() >= 1
+    assert stored_rows(cache) == 1
+
+
+def test_buffered_statements_run_in_order_in_the_flush(make_cache):
+    cache = make_cache(local_cache_flush_interval_seconds=3600)
+    cache.ensure_table("notes", ["CREATE TABLE IF NOT EXISTS notes (key TEXT PRIMARY KEY, value TEXT)"])
+
+    cache.buffer_write("INSERT INTO notes (key, value) VALUES (?, ?)", ("a", "first"))
+    cache.buffer_write("UPDATE notes SET value = ? WHERE key = ?", ("second", "a"))
+    cache.set(TEXT, contact(), "ollama", "stub")
+
+    assert cache.flush() == 3
+    assert cache._connection().execute("SELECT value FROM notes").fetchall() == [("second",)]
+    assert stored_rows(cache) == 1
+
+
+def test_writes_are_kept_while_the_database_is_locked(make_cache):
+    cache = make_cache(local_cache_flush_interval_seconds=3600, local_cache_busy_timeout_ms=0)
+    cache.ensure_table("notes", ["CREATE TABLE IF NOT EXISTS notes (key TEXT PRIMARY KEY, value TEXT)"])
+    cache.set(TEXT, contact(), "ollama", "stub")
+    cache.buffer_write("INSERT INTO notes (key, value) VALUES (?, ?)", ("a", "kept"))
+
+    blocker = sqlite3.connect(cache._db_path)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        assert cache.flush() == 0
+        assert cache.get_stats()["write_failures"] == 1
+    finally:
+        blocker.rollback()
+        blocker.close()
+
+    assert cache.flush() == 2
+    assert cache._connection().execute("SELECT value FROM notes").fetchall() == [("kept",)]
+    assert stored_rows(cache) == 1
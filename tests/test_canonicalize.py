@@ -0,0 +1,43 @@
+import pytest
+
+from app.canonicalize import canonicalize, canonicalize_v2
+from app.models import ExtractedContact
+
+BASE = "Customer: Zoe Baker Phone: (239) 555-1501 email zoe@gmail.com"
+
+
+@pytest.mark.parametrize("variant", [
+    "customer:   zoe baker phone: 239.555.1501 email zoe@gmail.com",
+    "Customer: Zoe Baker Phone: +1 239-555-1501 email mailto:zoe@gmail.com!!",
+    "Customer: Zoe Baker Phone: 2395551501 email zoe@gmail.com\n\nSent from my iPhone",
+    "Ｃustomer: Zoe Baker Phone: (239) 555–1501 email zoe@gmail.com​",
+])
+def test_equivalent_texts_share_a_canonical_form(variant):
+    assert canonicalize_v2(variant) == canonicalize_v2(BASE)
+
+
+@pytest.mark.parametrize("different", [
+    "Customer: Zoe Baker Phone: (239) 555-1502 email zoe@gmail.com",
+    "Customer: Zoe Baker Phone: (239) 555-1501 x12 email zoe@gmail.com",
+    "Customer: Zoe Baker Phone: (239) 555-1501 email zoe@gmail.com Sent from my office, call 555-0000",
+])
+def test_differences_that_matter_are_kept(different):
+    assert canonicalize_v2(different) != canonicalize_v2(BASE)
+
+
+def test_unknown_versions_are_rejected():
+    assert canonicalize("  a   b ", "v1") == "a b"
+    with pytest.raises(ValueError):
+        canonicalize(BASE, "v9")
+
+
+def test_v2_variants_share_one_cache_entry(make_cache):
+    cache = make_cache(cache_normalization_version="v2")
+    variant = "customer: zoe baker phone: 239.555.1501 email zoe@gmail.com."
+    cache.set(BASE, ExtractedContact(client_name="Zoe Baker", raw_text=BASE), "ollama", "stub")
+
+    extraction, tier = cache.lookup(variant)
+
+    assert tier == "memory"
+    assert extraction.raw_text == variant
+    assert cache.get(BASE).raw_text == BASE
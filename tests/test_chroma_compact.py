@@ -0,0 +1,134 @@
+import json
+
+from app.cache_policy import LRUPolicy, WTinyLFUPolicy
+from app.cache_store import local_cache
+from app.database import ChromaDBManager
+from app.models import ExtractedContact
+
+
+class FakeCollection:
+    """An in-memory collection with the calls compact() makes, in insertion order."""
+
+    def __init__(self, documents):
+        # id -> (document, metadata, embedding)
+        self.documents = dict(documents)
+
+    def get(self, ids=None, include=(), limit=None, offset=0):
+        keys = list(self.documents) if ids is None else [doc_id for doc_id in ids if doc_id in self.documents]
+        keys = keys[offset:offset + limit] if limit else keys
+        rows = [self.documents[doc_id] for doc_id in keys]
+        return {
+            "ids": keys,
+            "documents": [row[0] for row in rows],
+            "metadatas": [row[1] for row in rows],
+            "embeddings": [row[2] for row in rows],
+        }
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        for row in zip(ids, documents, metadatas, embeddings):
+            self.documents[row[0]] = row[1:]
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.documents.pop(doc_id, None)
+
+    def query(self, query_texts, n_results):
+        keys = list(self.documents)[:n_results]
+        return {
+            "ids": [keys],
+            "documents": [[self.documents[doc_id][0] for doc_id in keys]],
+            "metadatas": [[self.documents[doc_id][1] for doc_id in keys]],
+            "distances": [[0.0 for _ in keys]],
+        }
+
+    def count(self):
+        return len(self.documents)
+
+
+def contact(text: str) -> ExtractedContact:
+    return ExtractedContact(client_name="Cy Dunn", raw_text=text)
+
+
+def hit_count(text: str) -> int:
+    local_cache.flush()
+    row = local_cache.connection().execute(
+        "SELECT hit_count FROM extraction_cache WHERE cache_key = ?", (local_cache.cache_key(text),)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def test_peek_records_nothing(make_cache):
+    cache = make_cache(local_cache_memory_policy="lru")
+    text = "Customer: Cy Dunn Phone: 239-555-2401"
+    cache.set(text, contact(text), "ollama", "stub", "fp")
+    cache.flush()
+    stats = cache.get_stats()
+
+    assert cache.peek(text, "fp").client_name == "Cy Dunn"
+    assert cache.get_stats() == stats
+
+    cache._memory.clear()
+    stats = cache.get_stats()
+    assert cache.peek(text, "fp").client_name == "Cy Dunn"
+    assert cache.peek(text, "another-fingerprint") is None
+    assert cache.get_stats() == stats
+    assert len(cache._memory) == 0
+    assert cache.flush() == 0
+
+
+def test_policies_peek_without_promoting():
+    lru = LRUPolicy(max_bytes=200)
+    lru.put("old", 1, 100)
+    lru.put("new", 2, 100)
+    assert lru.peek("old") == 1
+    lru.put("newest", 3, 100)
+    assert "old" not in lru
+
+    tinylfu = WTinyLFUPolicy(max_bytes=10000)
+    tinylfu.put("key", 1, 100)
+    assert tinylfu.peek("key") == 1
+    assert tinylfu._sketch.frequency("key") == 0
+
+
+def test_compact_collapses_copies_without_counting_cache_hits():
+    text = "Customer: Cy Dunn Phone: 239-555-2402 compact"
+    extraction = contact(text)
+    local_cache.set(text, extraction, "ollama", "stub", "fp")
+    before = hit_count(text)
+    full = json.dumps(extraction.model_dump(mode="json"))
+    collection = FakeCollection({
+        "extraction_1": (text, {"extracted_at": "2026-01-01", "full_extraction": full}, [0.1]),
+        "extraction_2": (text, {"extracted_at": "2026-02-01", "full_extraction": full}, [0.2]),
+    })
+    manager = ChromaDBManager()
+    manager.collection = collection
+
+    result = manager.compact(page_size=1, fingerprint="fp")
+
+    key = local_cache.cache_key(text)
+    assert result == {"documents": 2, "unique": 1, "removed": 2}
+    assert list(collection.documents) == [key]
+    assert collection.documents[key] == (text, {"extracted_at": "2026-02-01"}, [0.2])
+    assert hit_count(text) == before
+
+
+def test_a_match_evicted_from_the_local_cache_is_counted_and_left_out():
+    kept = "Customer: Cy Dunn Phone: 239-555-2403 kept"
+    evicted = "Customer: Cy Dunn Phone: 239-555-2404 evicted"
+    for text in (kept, evicted):
+        local_cache.set(text, contact(text), "ollama", "stub", "fp")
+    local_cache.flush()
+    local_cache.connection().execute(
+        "DELETE FROM extraction_cache WHERE cache_key = ?", (local_cache.cache_key(evicted),)
+    )
+    local_cache.connection().commit()
+    local_cache._memory.clear()
+    manager = ChromaDBManager()
+    manager.collection = FakeCollection({
+        local_cache.cache_key(text): (text, {"extracted_at": "2026-03-01"}, [0.1]) for text in (kept, evicted)
+    })
+
+    similar = manager.find_similar(evicted, fingerprint="fp")
+
+    assert [match["text"] for match in similar] == [kept]
+    assert manager.get_stats()["extraction_misses"] == 1
@@ -0,0 +1,88 @@
+import os
+import time
+
+import pytest
+
+from app.cache_store import local_cache
+from app.config import settings
+from app.database import ChromaDBManager
+from app.models import ExtractedContact
+
+
+class FakeCollection:
+    """Records upserts instead of embedding anything."""
+
+    def __init__(self):
+        self.upserts = []
+        self.documents = {}
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.upserts.append(list(ids))
+        self.documents.update(zip(ids, documents))
+
+    def count(self):
+        return len(self.documents)
+
+
+def contact(text: str) -> ExtractedContact:
+    return ExtractedContact(client_name="Ann Bell", raw_text=text)
+
+
+@pytest.fixture
+def manager(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "chroma_write_queue_size", 3)
+    monkeypatch.setattr(settings, "chroma_spill_path", str(tmp_path / "spill.jsonl"))
+    chroma = ChromaDBManager()
+    chroma.collection = FakeCollection()
+    yield chroma
+    chroma.close()
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def fill_queue(manager, count: int = 3):
+    """Queue extractions directly, without starting the writer thread."""
+    for index in range(count):
+        text = f"Customer: Ann Bell ref {index}"
+        manager._queue.put_nowait((text, contact(text), None))
+
+
+def test_queued_extractions_are_upserted_in_one_batch_by_cache_key(manager):
+    texts = ["Call Ann Bell 239-555-2301", "call ann bell  239-555-2301", "Call Bo Cruz 239-555-2302"]
+    for text in texts:
+        manager._queue.put_nowait((text, contact(text), None))
+
+    manager.close()
+
+    keys = [local_cache.cache_key(texts[0]), local_cache.cache_key(texts[2])]
+    assert local_cache.cache_key(texts[1]) == keys[0]
+    assert manager.collection.upserts == [keys]
+    assert manager.collection.documents[keys[0]] == texts[1]
+    assert manager.get_stats()["writes"]["written"] == 2
+
+
+def test_a_full_queue_drops_writes(manager):
+    fill_queue(manager)
+
+    assert manager.add_extraction("one too many", contact("one too many")) is False
+    assert manager.get_stats()["writes"]["dropped"] == 1
+
+
+def test_spilled_writes_are_added_once_the_queue_drains(manager, monkeypatch):
+    monkeypatch.setattr(settings, "chroma_write_overflow", "spill")
+    fill_queue(manager)
+
+    assert manager.add_extraction("spilled text", contact("spilled text")) is True
+    assert os.path.exists(settings.chroma_spill_path)
+    manager._write_batch(manager._next_batch(timeout=0))
+    manager.add_extraction("later text", contact("later text"))
+
+    wait_for(lambda: manager.collection.count() == 5)
+    wait_for(lambda: not os.path.exists(settings.chroma_spill_path))
+    assert local_cache.cache_key("spilled text") in manager.collection.documents
+    assert manager.get_stats()["writes"]["spilled"] == 1
@@ -0,0 +1,46 @@
+import asyncio
+
+from app.extractor import extractor
+
+
+def test_concurrent_identical_texts_share_one_provider_call(stub_provider):
+    stub_provider.delay = 0.3
+    text = "Customer: Hana Cole Phone: 239-555-0401"
+    coalesced_before = extractor.get_stats()["coalesced_requests"]
+
+    async def scenario():
+        return await asyncio.gather(*(extractor.extract_async(text) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert stub_provider.calls == [text]
+    assert {contact.client_name for contact, _ in results} == {"Hana Cole"}
+    assert extractor.get_stats()["coalesced_requests"] - coalesced_before == 4
+    assert extractor.get_stats()["in_flight_provider_calls"] == 0
+
+
+def test_different_texts_are_not_coalesced(stub_provider):
+    texts = ["Customer: Ian Moss Phone: 239-555-0402", "Customer: Jo Park Phone: 239-555-0403"]
+
+    async def scenario():
+        return await asyncio.gather(*(extractor.extract_async(text) for text in texts))
+
+    asyncio.run(scenario())
+
+    assert sorted(stub_provider.calls) == sorted(texts)
+
+
+def test_coalesced_callers_each_get_their_own_raw_text(stub_provider):
+    stub_provider.delay = 0.3
+    texts = ["Customer: Kai Ward Phone: 239-555-0404", "customer:  KAI WARD\nPhone: 239-555-0404 "]
+
+    async def scenario():
+        return await asyncio.gather(*(extractor.extract_async(text) for text in texts))
+
+    (first, _), (second, _) = asyncio.run(scenario())
+
+    assert len(stub_provider.calls) == 1
+    assert [first.raw_text, second.raw_text] == texts
+    assert first is not second
+    first.phone_numbers.clear()
+    assert second.phone_numbers
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+import main
+
+
+def test_extract_calls_provider_once_then_serves_cache(client, stub_provider):
+    text = "Customer: Alice Walker Phone: (239) 555-0101 needs a quote"
+
+    first = client.post("/extract", json={"text": text})
+    second = client.post("/extract", json={"text": text})
+
+    assert first.status_code == 200
+    assert first.json()["status"] == "found"
+    assert first.json()["data"]["client_name"] == "Alice Walker"
+    assert first.json()["cache_hit"] is False
+    assert second.json()["cache_hit"] is True
+    assert second.json()["data"]["phone_numbers"] == first.json()["data"]["phone_numbers"]
+    assert stub_provider.calls == [text]
+
+
+def test_slow_provider_call_does_not_block_other_requests(stub_provider):
+    stub_provider.delay = 0.5
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            extraction = asyncio.create_task(
+                http.post("/extract", json={"text": "Customer: Bob Stone Phone: 239-555-0102"})
+            )
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            root = await http.get("/")
+            root_seconds = time.perf_counter() - started
+            return (await extraction), root, root_seconds
+
+    extraction, root, root_seconds = asyncio.run(scenario())
+
+    assert extraction.json()["data"]["client_name"] == "Bob Stone"
+    assert root.status_code == 200
+    assert root_seconds < 0.25
+
+
+def test_every_endpoint_keeps_the_sent_text_as_raw_text(client, stub_provider):
+    sent = "  Customer: Ivy Park\n\tPhone: 239-555-0104  "
+
+    single = client.post("/extract", json={"text": sent}).json()
+    batch = client.post("/extract/batch", json={"texts": [sent]}).json()
+    stream = client.post("/extract/stream", content=json.dumps(sent).encode())
+    job_id = client.post("/jobs", json={"texts": [sent]}).json()["job_id"]
+    deadline = time.time() + 10
+    job = client.get(f"/jobs/{job_id}").json()
+    while job["status"] != "completed" and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/jobs/{job_id}").json()
+
+    assert single["data"]["raw_text"] == sent
+    assert batch["results"][0]["data"]["raw_text"] == sent
+    assert json.loads(stream.text.splitlines()[0])["data"]["raw_text"] == sent
+    assert job["results"][0]["result"]["data"]["raw_text"] == sent
+    assert len(stub_provider.calls) == 1
+
+
+def test_blank_text_is_rejected(client, stub_provider):
+    assert client.post("/extract", json={"text": " \n "}).status_code == 422
+    assert client.post("/extract/batch", json={"texts": ["ok 239-555-0105", "  "]}).status_code == 422
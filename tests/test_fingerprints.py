@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from app.cache_store import local_cache
+from app.extractor import extractor
+from app.models import ExtractedContact
+
+
+def contact(text: str, name: str = "Xia Zhou") -> ExtractedContact:
+    return ExtractedContact(client_name=name, phone_numbers=[{"number": "239-555-1401"}], raw_text=text)
+
+
+def written_under(cache, text: str, fingerprint: str, name: str = "Xia Zhou"):
+    """Store an entry in SQLite only, as an earlier process would have."""
+    cache.set(text, contact(text, name), "ollama", "stub", fingerprint)
+    cache.flush()
+    cache._memory.clear()
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("strict", None),
+    ("stale_while_revalidate", "stale"),
+    ("any", "sqlite"),
+])
+def test_policy_decides_what_another_fingerprint_gets(make_cache, policy, expected):
+    text = "Customer: Xia Zhou Phone: 239-555-1401"
+    cache = make_cache(cache_fingerprint_policy=policy)
+    written_under(cache, text, "old")
+
+    assert cache.lookup(text, "new")[1] == expected
+    assert cache.lookup(text, "old")[1] in ("sqlite", "memory")
+
+
+def test_accepted_fingerprints_count_as_current(make_cache):
+    text = "Customer: Xia Zhou Phone: 239-555-1402"
+    cache = make_cache(cache_fingerprint_policy="strict", cache_accepted_fingerprints=" old , older")
+    written_under(cache, text, "older")
+
+    assert cache.lookup(text, "new")[1] == "sqlite"
+    assert cache.get_stats()["fingerprint_rejects"] == 0
+
+
+def test_fingerprint_follows_the_provider_request(monkeypatch):
+    before = extractor._compute_fingerprint()
+    monkeypatch.setattr(extractor, "model", "another-model")
+
+    assert extractor._compute_fingerprint() != before
+
+
+def test_stale_entries_are_served_and_refreshed(stub_provider, monkeypatch):
+    text = f"Customer: Yves Abel Phone: 239-555-1403 ref {time.time()}"
+    monkeypatch.setattr(local_cache, "_fingerprint_policy", "stale_while_revalidate")
+    written_under(local_cache, text, "an-older-fingerprint", name="Old Name")
+
+    async def scenario():
+        served, _ = await extractor.extract_async(text)
+        await asyncio.gather(*extractor._background_tasks)
+        return served
+
+    served = asyncio.run(scenario())
+
+    assert served.client_name == "Old Name"
+    assert stub_provider.calls == [text]
+    assert local_cache.lookup(text, extractor.fingerprint)[0].client_name == "Yves Abel"
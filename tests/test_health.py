@@ -0,0 +1,49 @@
+import asyncio
+
+from app.health import HealthProber
+
+
+def test_failed_probe_is_retried_sooner_with_backoff():
+    results = [False, False, True]
+    prober = HealthProber(interval_seconds=60, failure_interval_seconds=2)
+
+    async def check():
+        return results.pop(0)
+
+    prober.register("provider", check)
+
+    async def scenario():
+        delays = []
+        for _ in range(3):
+            await prober.probe("provider")
+            delays.append(prober._next_probe_at["provider"] - prober._checked_at["provider"])
+        return delays
+
+    delays = asyncio.run(scenario())
+
+    assert [round(delay) for delay in delays] == [2, 4, 60]
+    assert prober.is_healthy("provider") is True
+    assert prober.get_stats()["checks"]["provider"]["consecutive_failures"] == 0
+
+
+def test_raising_check_counts_as_unhealthy_and_report_failure_pulls_the_probe_forward():
+    prober = HealthProber(interval_seconds=60, failure_interval_seconds=2)
+
+    def check():
+        raise ConnectionError("down")
+
+    prober.register("chromadb", check)
+    asyncio.run(prober.probe("chromadb"))
+    prober._next_probe_at["chromadb"] = prober._checked_at["chromadb"] + 60
+
+    prober.report_failure("chromadb")
+
+    assert prober.is_healthy("chromadb") is False
+    assert prober._next_probe_at["chromadb"] == prober._checked_at["chromadb"] + 2
+
+
+def test_health_endpoint_reads_the_probed_state(client, stub_provider):
+    body = client.get("/health").json()
+
+    assert body["llm_status"] == "healthy"
+    assert body["local_cache_status"] == "healthy"
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+
+from app.jobs import JobStore
+
+
+def test_store_creates_nothing_until_used(tmp_path):
+    path = tmp_path / "jobs" / "jobs.sqlite3"
+
+    store = JobStore(str(path))
+    assert not path.exists()
+
+    store.create_job(iter(["a"]), "request", True)
+    assert path.exists()
+
+
+def test_each_job_is_claimed_by_one_runner(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create_job(iter(["a", "b"]), "request", True)
+    claims = []
+    start = threading.Barrier(8)
+
+    def claim(owner):
+        start.wait()
+        claims.append((owner, JobStore(str(tmp_path / "jobs.sqlite3")).claim_next_job(owner, 60)))
+
+    threads = [threading.Thread(target=claim, args=(f"worker-{index}",)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [owner for owner, job in claims if job is not None]
+    assert len(winners) == 1
+    assert store.claim_next_job("late", 60) is None
+    assert store.renew_lease(job_id, winners[0], 60)
+    assert not store.renew_lease(job_id, "late", 60)
+
+
+def test_a_lapsed_lease_is_claimed_again(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create_job(iter(["a"]), "request", False)
+
+    assert store.claim_next_job("dead-worker", 0.05) == (job_id, False)
+    time.sleep(0.1)
+
+    assert store.claim_next_job("next-worker", 60) == (job_id, False)
+    assert not store.renew_lease(job_id, "dead-worker", 60)
+
+
+def test_job_runs_to_completion_and_keeps_raw_text(client, stub_provider):
+    texts = ["Customer: Lou Diaz\nPhone: 239-555-0601", "Customer: Mae Ortiz Phone: 239-555-0602"]
+
+    created = client.post("/jobs", json={"texts": texts})
+    job_id = created.json()["job_id"]
+    deadline = time.time() + 10
+    job = created.json()
+    while job["status"] != "completed" and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/jobs/{job_id}").json()
+
+    assert created.status_code == 202
+    assert job["status"] == "completed"
+    assert job["completed_items"] == 2
+    assert [item["result"]["data"]["raw_text"] for item in job["results"]] == texts
+
+
+def test_job_input_must_be_inside_the_input_directory(client):
+    response = client.post("/jobs", json={"path": "../" + os.path.basename(os.environ["JOBS_DB_PATH"])})
+
+    assert response.status_code == 400
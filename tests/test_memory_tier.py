@@ -0,0 +1,41 @@
+from app.models import ExtractedContact
+
+TEXT = "Customer: Sue Tran Phone: 239-555-1801 12 Palm Ave"
+
+
+def contact() -> ExtractedContact:
+    return ExtractedContact(
+        client_name="Sue Tran",
+        phone_numbers=[{"number": "239-555-1801"}],
+        address={"street": "12 Palm Ave"},
+        raw_text=TEXT,
+    )
+
+
+def test_changing_a_served_contact_does_not_change_the_cache(make_cache):
+    cache = make_cache()
+    stored = contact()
+    cache.set(TEXT, stored, "ollama", "stub")
+    stored.client_name = "Changed by the writer"
+
+    served, tier = cache.lookup(TEXT)
+    served.client_name = "Changed"
+    served.phone_numbers[0].number = "239-555-0000"
+    served.phone_numbers.append(served.phone_numbers[0])
+    served.address.street = "1 Other St"
+
+    again, again_tier = cache.lookup(TEXT)
+    assert tier == again_tier == "memory"
+    assert again.model_dump(exclude={"extracted_at"}) == contact().model_dump(exclude={"extracted_at"})
+
+
+def test_response_is_the_model_json(client, stub_provider):
+    text = "Customer: Tom Ueda Phone: 239-555-1802"
+
+    client.post("/extract", json={"text": text})
+    response = client.post("/extract", json={"text": text})
+
+    body = response.json()
+    assert body["cache_hit"] is True
+    assert body["data"]["client_name"] == "Tom Ueda"
+    assert body["data"]["raw_text"] == text
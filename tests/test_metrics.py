@@ -0,0 +1,38 @@
+from app.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time.", ("stage",), buckets=(0.1, 1.0))
+
+    histogram.observe("parse", value=0.05)
+    histogram.observe("parse", value=0.5)
+    histogram.observe("parse", value=5.0)
+
+    lines = registry.render().splitlines()
+    assert 'stage_seconds_bucket{stage="parse",le="0.1"} 1.0' in lines
+    assert 'stage_seconds_bucket{stage="parse",le="1.0"} 2.0' in lines
+    assert 'stage_seconds_bucket{stage="parse",le="+Inf"} 3.0' in lines
+    assert 'stage_seconds_count{stage="parse"} 3.0' in lines
+    assert 'stage_seconds_sum{stage="parse"} 5.55' in lines
+
+
+def test_counter_escapes_label_values():
+    registry = MetricsRegistry()
+    counter = registry.counter("lookups_total", "Lookups.", ("model",))
+
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+
+    assert 'lookups_total{model="a\\"b"} 3.0' in registry.render().splitlines()
+
+
+def test_metrics_endpoint_reports_pipeline_stages(client, stub_provider):
+    client.post("/extract", json={"text": "Customer: Ned Fox Phone: 239-555-0701"})
+
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE contact_extractor_stage_duration_seconds histogram" in response.text
+    assert 'contact_extractor_stage_duration_seconds_count{stage="provider_queue"' in response.text
+    assert 'contact_extractor_cache_lookups_total{result="miss"' in response.text
@@ -0,0 +1,50 @@
+import time
+
+from app.models import ExtractedContact
+
+TEXT = "please call me back about the gutters"
+
+
+def test_nothing_found_is_answered_from_the_cache(client, stub_provider):
+    stub_provider.reply = lambda text: {}
+    text = f"{TEXT} {time.time()}"
+
+    first = client.post("/extract", json={"text": text})
+    second = client.post("/extract", json={"text": text, "include_timings": True})
+
+    assert first.status_code == second.status_code
+    assert second.json()["timings"]["served_by"] == "negative_cache"
+    assert stub_provider.calls == [text]
+
+
+def test_negative_entries_are_read_back_from_sqlite(make_cache):
+    cache = make_cache()
+    partial = ExtractedContact(client_name="Wes Young", raw_text=TEXT)
+    cache.set_negative(TEXT, partial, "ollama", "stub", "fp-1")
+    cache.flush()
+    cache._negative.clear()
+
+    extraction, tier = cache.lookup(TEXT, "fp-1")
+
+    assert tier == "negative"
+    assert extraction.client_name == "Wes Young"
+    cache._negative.clear()
+    assert cache.lookup(TEXT, "fp-2") == (None, None)
+
+
+def test_negative_entries_expire(make_cache):
+    cache = make_cache(local_cache_negative_ttl_seconds=0.05)
+    cache.set_negative(TEXT, None, "ollama", "stub")
+    cache.flush()
+
+    assert cache.lookup(TEXT) == (None, "negative")
+    time.sleep(0.1)
+    assert cache.lookup(TEXT) == (None, None)
+
+
+def test_a_positive_entry_is_never_shadowed(make_cache):
+    cache = make_cache()
+    cache.set(TEXT, ExtractedContact(client_name="Wes Young", raw_text=TEXT), "ollama", "stub")
+
+    assert cache.set_negative(TEXT, None, "ollama", "stub") is False
+    assert cache.lookup(TEXT)[1] == "memory"
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from app.cache_codec import encode_extraction
+from app.cache_store import local_cache
+from app.models import ExtractedContact
+from app.similarity_cache import similarity_cache, vectorize
+
+BASE = (
+    "Hi, this is Dana Reyes. Could someone come out tomorrow between 2-4pm to look at a leaking "
+    "roof? The house is at 1423 Gulf Shore Blvd, Naples FL 34102. My cell is 239-555-2201."
+)
+FINGERPRINT = "similarity-test"
+
+
+def extraction(text: str) -> ExtractedContact:
+    return ExtractedContact(
+        client_name="Dana Reyes",
+        phone_numbers=[{"number": "239-555-2201", "type": "mobile"}],
+        address={"street": "1423 Gulf Shore Blvd", "city": "Naples", "state": "FL", "postal_code": "34102"},
+        job_type="roof leak",
+        scheduled_date="2026-10-18",
+        appointment_time="14:00-16:00",
+        raw_text=text,
+    )
+
+
+@pytest.fixture
+def learned(monkeypatch):
+    monkeypatch.setattr(similarity_cache, "enabled", True)
+    assert similarity_cache.learn(BASE, extraction(BASE), FINGERPRINT)
+
+
+def distance(text: str) -> float:
+    dimensions = similarity_cache._dimensions
+    return 1.0 - float(np.dot(vectorize(BASE, dimensions), vectorize(text, dimensions)))
+
+
+@pytest.mark.parametrize("old, new", [
+    ("tomorrow", "friday"),
+    ("2-4pm", "3-5pm"),
+    ("1423 Gulf", "1432 Gulf"),
+    ("34102", "34108"),
+])
+def test_edits_below_the_threshold_are_not_served(learned, old, new):
+    edited = BASE.replace(old, new)
+    assert distance(edited) < similarity_cache._threshold
+
+    assert similarity_cache.lookup(edited, FINGERPRINT) == (None, "rejected")
+
+
+def test_a_resend_with_the_same_details_is_served(learned):
+    resent = "FW: " + BASE.replace("Hi, this is", "Hello, this is")
+
+    contact, result = similarity_cache.lookup(resent, FINGERPRINT)
+
+    assert result == "hit"
+    assert contact.address.postal_code == "34102"
+    assert contact.raw_text == resent
+
+
+def test_relative_dates_are_only_reused_on_the_same_day(learned):
+    row = similarity_cache._rows[local_cache.cache_key(BASE)]
+    cache_key, verification, fingerprint, _ = similarity_cache._entries[row]
+    yesterday = extraction(BASE)
+    yesterday.extracted_at = yesterday.extracted_at.replace(year=2020)
+    payload = encode_extraction(yesterday.model_dump(mode="json"))
+    similarity_cache._entries[row] = (cache_key, verification, fingerprint, payload)
+
+    assert similarity_cache.lookup("FW: " + BASE, FINGERPRINT) == (None, "rejected")
+
+
+def test_learning_is_written_by_the_flush(learned):
+    count = "SELECT COUNT(*) FROM similarity_index WHERE cache_key = ?"
+    key = local_cache.cache_key(BASE)
+
+    local_cache.flush()
+
+    assert local_cache.connection().execute(count, (key,)).fetchone()[0] == 1
+
+
+def test_disabled_by_default():
+    from app.config import Settings
+
+    assert Settings().similarity_cache_enabled is False
+
+
+def test_relearning_a_text_retires_its_row_instead_of_overwriting_it(learned):
+    row = similarity_cache._rows[local_cache.cache_key(BASE)]
+    entries = similarity_cache._entries
+    relearned = extraction(BASE).model_copy(update={"job_type": "roof repair"})
+
+    assert similarity_cache.learn(BASE, relearned, FINGERPRINT)
+
+    # A lookup that already scored the old row finds no entry for it.
+    assert entries[row] is None
+    assert not similarity_cache._vectors[row].any()
+    assert similarity_cache._rows[local_cache.cache_key(BASE)] != row
+    contact, result = similarity_cache.lookup("FW: " + BASE, FINGERPRINT)
+    assert (result, contact.job_type) == ("hit", "roof repair")
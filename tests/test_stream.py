@@ -0,0 +1,35 @@
+import json
+
+
+def read_lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_returns_one_line_per_item_in_order(client, stub_provider):
+    body = "\n".join([
+        json.dumps("Customer: Erin Hall Phone: 239-555-0301"),
+        "not json",
+        json.dumps({"text": "Customer: Finn Lee Phone: 239-555-0302", "id": "b"}),
+    ])
+
+    response = client.post("/extract/stream?ordered=true", content=body.encode())
+
+    items = read_lines(response)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [item["index"] for item in items] == [0, 1, 2]
+    assert items[0]["data"]["client_name"] == "Erin Hall"
+    assert items[1]["status"] == "error"
+    assert items[2]["id"] == "b"
+    assert items[2]["data"]["client_name"] == "Finn Lee"
+
+
+def test_stream_keeps_the_sent_text_as_raw_text(client, stub_provider):
+    sent = "Customer: Gail Ross\n  Phone: 239-555-0303  "
+
+    items = read_lines(client.post("/extract/stream", content=json.dumps(sent).encode()))
+    again = client.post("/extract", json={"text": "Customer: Gail Ross Phone: 239-555-0303"})
+
+    assert items[0]["data"]["raw_text"] == sent
+    # Whitespace still does not matter for the cache key.
+    assert again.json()["cache_hit"] is True
+    assert len(stub_provider.calls) == 1
@@ -0,0 +1,65 @@
+from app.cache_store import local_cache
+from app.extractor import extractor
+from app.models import ExtractedContact
+from app.template_cache import template_cache
+
+
+def stored_template(template_key):
+    local_cache.flush()
+    return local_cache.connection().execute(
+        "SELECT disabled FROM extraction_templates WHERE template_key = ?", (template_key,)
+    ).fetchone()
+
+
+def test_texts_of_a_learned_format_skip_the_provider(client, stub_provider, monkeypatch):
+    monkeypatch.setattr(template_cache, "enabled", True)
+    monkeypatch.setattr(template_cache, "_verify_rate", 0.0)
+    first = "Gutter quote. Customer: Lena Marsh Phone: 239-555-1701"
+    second = "Gutter quote. Customer: Omar Nash Phone: 239-555-1702"
+
+    client.post("/extract", json={"text": first})
+    response = client.post("/extract", json={"text": second})
+
+    assert stub_provider.calls == [first]
+    data = response.json()["data"]
+    assert data["client_name"] == "Omar Nash"
+    assert data["phone_numbers"][0]["number"].endswith("555-1702")
+    filled, template_key = template_cache.lookup(second, extractor.fingerprint)
+    assert stored_template(template_key) == (0,)
+
+
+def test_computed_dates_are_not_learned(monkeypatch):
+    monkeypatch.setattr(template_cache, "enabled", True)
+    text = "Roof visit tomorrow. Customer: Pia Lund Phone: 239-555-1703"
+    computed = ExtractedContact(client_name="Pia Lund", scheduled_date="2026-10-18", raw_text=text)
+    verbatim_text = "Roof visit 2026-10-18. Customer: Pia Lund Phone: 239-555-1703"
+    verbatim = ExtractedContact(client_name="Pia Lund", scheduled_date="2026-10-18", raw_text=verbatim_text)
+
+    assert template_cache.learn(text, computed, "fp") is False
+    assert template_cache.lookup(text, "fp") == (None, None)
+    assert template_cache.learn(verbatim_text, verbatim, "fp") is True
+    filled, _ = template_cache.lookup("Roof visit 2026-11-02. Customer: Pia Lund Phone: 239-555-1703", "fp")
+    assert filled["scheduled_date"] == "2026-11-02"
+
+
+def test_a_disagreeing_verification_disables_the_template(monkeypatch):
+    monkeypatch.setattr(template_cache, "enabled", True)
+    text = "Fence repair. Customer: Rae Quinn Phone: 239-555-1704"
+    template_cache.learn(text, ExtractedContact(client_name="Rae Quinn", raw_text=text), "fp")
+    filled, template_key = template_cache.lookup(text, "fp")
+
+    matched = template_cache.record_verification(template_key, "fp", filled, {**filled, "client_name": "Quinn"})
+
+    assert matched is False
+    assert template_cache.lookup(text, "fp") == (None, None)
+    assert stored_template(template_key) == (1,)
+
+
+def test_templates_are_trimmed_by_an_indexed_column():
+    template_cache._ensure_table()
+
+    plan = local_cache.connection().execute(
+        "EXPLAIN QUERY PLAN SELECT template_key FROM extraction_templates ORDER BY created_at DESC LIMIT 1"
+    ).fetchall()
+
+    assert any("idx_extraction_templates_created" in row[-1] for row in plan)
@@ -0,0 +1,25 @@
+def test_timings_show_the_path_that_served_each_request(client, stub_provider):
+    text = "Customer: Olga Penn Phone: 239-555-0801"
+
+    first = client.post("/extract", json={"text": text, "include_timings": True})
+    second = client.post("/extract", json={"text": text, "include_timings": True})
+
+    first_timings = first.json()["timings"]
+    assert first_timings["served_by"] == "provider"
+    assert {"cache_lookup", "provider_queue", "parse_extraction", "cache_write"} <= {
+        stage["stage"] for stage in first_timings["stages"]
+    }
+    assert second.json()["timings"]["served_by"] == "memory_cache"
+    assert [stage["stage"] for stage in second.json()["timings"]["stages"]] == ["memory_lookup"]
+
+
+def test_server_timing_header_is_only_sent_when_asked_for(client, stub_provider):
+    text = "Customer: Pia Quinn Phone: 239-555-0802"
+
+    plain = client.post("/extract", json={"text": text})
+    timed = client.post("/extract", json={"text": text, "include_timings": True})
+
+    assert plain.json()["timings"] is None
+    assert "server-timing" not in plain.headers
+    assert "memory_lookup;dur=" in timed.headers["server-timing"]
+    assert 'desc="memory_cache"' in timed.headers["server-timing"]